@@ -0,0 +1,175 @@
+import numpy as np
+
+# "sector" is an alias of "lba"; every conversion goes through LBA
+ADDRESS_SPACES = ("chs", "lba", "sector", "cluster", "byte")
+
+
+def _as_int_array(values):
+    # Generators and other one-shot iterables have to be materialised first
+    if not hasattr(values, "__len__"):
+        values = list(values)
+    return np.asarray(values, dtype=np.int64)
+
+
+def chs_to_lba_array(cylinders, heads, sectors, hpc=255, spt=63):
+    """
+    Vectorized chs_to_lba().
+
+    :param cylinders: Cylinder numbers (C).
+    :param heads: Head numbers (H).
+    :param sectors: Sector numbers (S, starting at 1).
+    :param hpc: Heads per cylinder (default 255).
+    :param spt: Sectors per track (default 63).
+    :return: A tuple (lba, valid) of int64 arrays and a boolean mask.
+    """
+    cylinders = _as_int_array(cylinders)
+    heads = _as_int_array(heads)
+    sectors = _as_int_array(sectors)
+
+    valid = (cylinders >= 0) & (heads >= 0) & (heads < hpc) & (sectors >= 1) & (sectors <= spt)
+    lba = (cylinders * hpc + heads) * spt + (sectors - 1)
+    return lba, valid
+
+
+def lba_to_chs_array(lba, hpc=255, spt=63):
+    """
+    Converts LBAs back to CHS tuples.
+
+    :param lba: Logical block addresses.
+    :param hpc: Heads per cylinder (default 255).
+    :param spt: Sectors per track (default 63).
+    :return: A tuple (chs, valid) where chs is an (N, 3) array of cylinder, head, sector.
+    """
+    lba = _as_int_array(lba)
+
+    valid = lba >= 0
+    cylinders = lba // (hpc * spt)
+    heads = (lba // spt) % hpc
+    sectors = lba % spt + 1
+    return np.stack([cylinders, heads, sectors], axis=-1), valid
+
+
+def cluster_to_lba_array(cluster_numbers, first_data_sector, sectors_per_cluster):
+    """
+    Vectorized cluster_to_lba(); clusters below 2 are flagged instead of raising.
+
+    :return: A tuple (lba, valid).
+    """
+    cluster_numbers = _as_int_array(cluster_numbers)
+
+    # FAT cluster numbering starts from 2
+    valid = cluster_numbers >= 2
+    lba = first_data_sector + (cluster_numbers - 2) * sectors_per_cluster
+    return lba, valid
+
+
+def lba_to_cluster_array(lba, first_data_sector, sectors_per_cluster):
+    """
+    Vectorized sector_to_cluster(); sectors before the data region are flagged instead of raising.
+
+    :return: A tuple (cluster_numbers, valid).
+    """
+    lba = _as_int_array(lba)
+
+    valid = lba >= first_data_sector
+    cluster_numbers = (lba - first_data_sector) // sectors_per_cluster + 2
+    return cluster_numbers, valid
+
+
+def lba_to_byte_offset_array(lba, sector_size=512):
+    """
+    Vectorized calculate_offset() / calculate_byte_offset().
+
+    :return: A tuple (byte_offsets, valid).
+    """
+    lba = _as_int_array(lba)
+    return lba * sector_size, lba >= 0
+
+
+def byte_offset_to_lba_array(byte_offsets, sector_size=512):
+    """
+    Converts byte offsets to the LBA of the sector that contains them.
+
+    :return: A tuple (lba, valid).
+    """
+    byte_offsets = _as_int_array(byte_offsets)
+    return byte_offsets // sector_size, byte_offsets >= 0
+
+
+def convert_addresses(values, from_space, to_space, sector_size=512, sectors_per_cluster=8,
+                      first_data_sector=0, hpc=255, spt=63, profile=None):
+    """
+    Converts an array of addresses between any two address spaces.
+
+    Invalid inputs (for example a cluster number below 2 or a sector before the
+    data region) never raise; they are reported in the returned mask and their
+    result is set to -1. A byte offset converts to the sector (CHS, LBA) or
+    cluster that contains it; byte to byte keeps the offset inside the sector.
+
+    :param values: Addresses to convert (NumPy array or any iterable); CHS input is an (N, 3) array.
+    :param from_space: One of "chs", "lba", "sector", "cluster", "byte".
+    :param to_space: One of "chs", "lba", "sector", "cluster", "byte".
+    :param sector_size: Bytes per sector (default 512).
+    :param sectors_per_cluster: Sectors per cluster (default 8).
+    :param first_data_sector: First sector of the data region (default 0).
+    :param hpc: Heads per cylinder (default 255).
+    :param spt: Sectors per track (default 63).
+    :param profile: Optional VolumeProfile; when given, it supplies all of the parameters above.
+    :return: A tuple (converted, valid).
+    """
+    if profile is not None:
+        sector_size, hpc, spt = profile.sector_size, profile.hpc, profile.spt
+        if profile.has_fat32:
+            sectors_per_cluster, first_data_sector = profile.sectors_per_cluster, profile.first_data_sector
+
+    if from_space not in ADDRESS_SPACES or to_space not in ADDRESS_SPACES:
+        raise ValueError(f"Invalid address space. Must be one of {', '.join(ADDRESS_SPACES)}")
+
+    # Step 1: bring everything to LBA
+    if from_space == "chs":
+        chs = _as_int_array(values).reshape(-1, 3)
+        lba, valid = chs_to_lba_array(chs[:, 0], chs[:, 1], chs[:, 2], hpc, spt)
+    elif from_space == "cluster":
+        lba, valid = cluster_to_lba_array(values, first_data_sector, sectors_per_cluster)
+    elif from_space == "byte":
+        byte_offsets = _as_int_array(values)
+        lba, valid = byte_offset_to_lba_array(byte_offsets, sector_size)
+    else:
+        lba = _as_int_array(values)
+        valid = lba >= 0
+
+    # Step 2: go from LBA to the requested space
+    if to_space == "chs":
+        converted, to_valid = lba_to_chs_array(lba, hpc, spt)
+    elif to_space == "cluster":
+        converted, to_valid = lba_to_cluster_array(lba, first_data_sector, sectors_per_cluster)
+    elif to_space == "byte":
+        converted, to_valid = lba_to_byte_offset_array(lba, sector_size)
+        if from_space == "byte":
+            # The LBA only locates the sector; add back the position inside it
+            converted = converted + byte_offsets % sector_size
+    else:
+        converted, to_valid = lba, lba >= 0
+
+    valid = valid & to_valid
+    if to_space == "chs":
+        converted[~valid] = -1
+    else:
+        converted = np.where(valid, converted, -1)
+    return converted, valid
+
+
+# Example usage
+if __name__ == "__main__":
+    from_space = input(f"Enter the address space to convert from ({', '.join(ADDRESS_SPACES)}): ").strip().lower()
+    to_space = input(f"Enter the address space to convert to ({', '.join(ADDRESS_SPACES)}): ").strip().lower()
+    values_input = input("Enter the addresses, comma separated (C/H/S for CHS, e.g. 0/32/33): ")
+
+    if from_space == "chs":
+        values = [[int(part) for part in value.split("/")] for value in values_input.split(",")]
+    else:
+        values = [int(value) for value in values_input.split(",")]
+
+    converted, valid = convert_addresses(values, from_space, to_space)
+    for value, result, is_valid in zip(values, converted, valid):
+        print(f"{value} -> {result.tolist() if is_valid else 'invalid'}")
@@ -0,0 +1,430 @@
+import argparse
+import asyncio
+import hashlib
+import importlib
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from DiskImageScanner import GPT_SIGNATURE, MBR_BOOT_SIGNATURE, read_mbr_partition_entries
+from DiskStructures import FAT_ENTRY_STRUCT
+from Fat32DirectoryWalker import (ATTR_DIRECTORY, ATTR_VOLUME_ID, FAT32_CLUSTER_MASK, FAT32_FILESYSTEM_TYPE, LongNameAssembler,
+                                  cluster_offset, decode_directory_cluster, parse_fat32_boot_sector)
+from GPTEntryArrayDecoder import decode_gpt_entry_array, iter_gpt_entry_dicts
+from ImageHasher import DEFAULT_ALGORITHMS
+
+parse_gpt_header = importlib.import_module("GPTHeaderParser(WithCRCVerify)").parse_gpt_header
+
+DEFAULT_BLOCK_SIZE = 64 * 1024  # Unit of caching and of every read issued to the storage
+DEFAULT_READAHEAD_BLOCKS = 4  # Blocks fetched past the end of each cached read
+DEFAULT_MAX_OUTSTANDING = 8  # Reads in flight at the same time
+DEFAULT_CACHE_BLOCKS = 1024  # 64 MiB of cached blocks with the default block size
+MAX_COALESCED_BLOCKS = 256  # Upper bound of blocks merged into one read
+
+
+class AsyncBlockDevice:
+    """
+    Asynchronous, block-cached reader for images on high-latency storage (NFS, SAN).
+
+    Reads are aligned to blocks. Missing blocks of a request are merged into
+    as few large pread() calls as possible and run on a thread pool, with at
+    most `max_outstanding` of them in flight. Every cached read also fetches
+    `readahead_blocks` blocks past its end in the background, and an LRU keeps
+    the hot blocks (boot sector, FAT, directory clusters) in memory. Concurrent
+    requests for a block that is already being read share that read.
+    """
+
+    def __init__(self, image_path, block_size=DEFAULT_BLOCK_SIZE, readahead_blocks=DEFAULT_READAHEAD_BLOCKS,
+                 max_outstanding=DEFAULT_MAX_OUTSTANDING, cache_blocks=DEFAULT_CACHE_BLOCKS):
+        """
+        :param image_path: Path to the raw image (or block device).
+        :param block_size: Bytes per block (a multiple of 4096 keeps reads sector-aligned).
+        :param readahead_blocks: Blocks prefetched after each cached read (0 disables readahead).
+        :param max_outstanding: Maximum number of reads in flight.
+        :param cache_blocks: Number of blocks kept in the LRU.
+        """
+        self.image_path = image_path
+        self.block_size = block_size
+        self.readahead_blocks = readahead_blocks
+        self.max_outstanding = max_outstanding
+        self.cache_blocks = cache_blocks
+        self.size = None
+
+        self._fd = None
+        self._executor = None
+        self._semaphore = None
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._readahead_tasks = set()
+
+        self.reads_issued = 0
+        self.bytes_read = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def open(self):
+        self._fd = os.open(self.image_path, os.O_RDONLY)
+        self.size = os.fstat(self._fd).st_size
+        if self.size == 0:
+            # Block devices report a size of 0; ask for their end instead
+            self.size = os.lseek(self._fd, 0, os.SEEK_END)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_outstanding)
+        self._semaphore = asyncio.Semaphore(self.max_outstanding)
+        return self
+
+    async def close(self):
+        for task in list(self._readahead_tasks):
+            task.cancel()
+        await asyncio.gather(*self._readahead_tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._cache.clear()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _pread(self, offset, length):
+        async with self._semaphore:
+            data = await asyncio.get_running_loop().run_in_executor(self._executor, os.pread, self._fd, length, offset)
+        self.reads_issued += 1
+        self.bytes_read += len(data)
+        return data
+
+    def _remember(self, block_index, data):
+        self._cache[block_index] = data
+        self._cache.move_to_end(block_index)
+        while len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+
+    async def _fetch_run(self, first_block, block_count, futures):
+        # One read for a run of consecutive missing blocks
+        try:
+            data = await self._pread(first_block * self.block_size, block_count * self.block_size)
+            for index in range(block_count):
+                block = data[index * self.block_size:(index + 1) * self.block_size]
+                self._remember(first_block + index, block)
+                futures[index].set_result(block)
+        except asyncio.CancelledError:
+            # close() cancelled the read; nothing awaits readahead futures, so do not hand them an error
+            for future in futures:
+                future.cancel()
+            raise
+        except BaseException as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+                    # Readahead futures past the requested range are never awaited; awaited ones still raise
+                    future.exception()
+            raise
+        finally:
+            for index in range(block_count):
+                self._inflight.pop(first_block + index, None)
+
+    def _schedule(self, block_indexes, cached=None):
+        """
+        Starts reads for the blocks that are neither cached nor in flight.
+
+        :param cached: Optional dictionary filled with the bytes of the requested blocks that are
+                       cached. They are taken before any await, since a concurrent read can evict them.
+        :return: A dictionary of block index -> future for every requested block that is not cached.
+        """
+        last_block = (self.size - 1) // self.block_size if self.size else -1
+        futures = {}
+        missing = []
+        for block_index in block_indexes:
+            if block_index > last_block:
+                break
+            block = self._cache.get(block_index)
+            if block is not None:
+                if cached is not None:
+                    cached[block_index] = block
+                    self._cache.move_to_end(block_index)
+                continue
+            if block_index in self._inflight:
+                futures[block_index] = self._inflight[block_index]
+                continue
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[block_index] = futures[block_index] = future
+            missing.append(block_index)
+
+        # Merge consecutive missing blocks into runs
+        run_start = 0
+        while run_start < len(missing):
+            run_end = run_start + 1
+            while (run_end < len(missing) and missing[run_end] == missing[run_end - 1] + 1
+                   and run_end - run_start < MAX_COALESCED_BLOCKS):
+                run_end += 1
+            run = missing[run_start:run_end]
+            task = asyncio.ensure_future(self._fetch_run(run[0], len(run), [futures[block] for block in run]))
+            self._readahead_tasks.add(task)
+            task.add_done_callback(self._task_done)
+            run_start = run_end
+        return futures
+
+    def _task_done(self, task):
+        self._readahead_tasks.discard(task)
+        if not task.cancelled():
+            # Errors are delivered through the block futures; only retrieve them here
+            task.exception()
+
+    async def read(self, offset, length):
+        """
+        Reads `length` bytes at `offset` through the block cache.
+
+        :return: The bytes read (shorter than `length` at the end of the image).
+        """
+        if offset >= self.size or length <= 0:
+            return b""
+        length = min(length, self.size - offset)
+
+        first_block = offset // self.block_size
+        last_block = (offset + length - 1) // self.block_size
+        wanted = range(first_block, last_block + 1)
+
+        cached = {}
+        futures = self._schedule(wanted, cached)
+        if self.readahead_blocks:
+            self._schedule(range(last_block + 1, last_block + 1 + self.readahead_blocks))
+
+        blocks = []
+        for block_index in wanted:
+            future = futures.get(block_index)
+            if future is None:
+                block = cached[block_index]
+                self.cache_hits += 1
+            else:
+                block = await future
+                self.cache_misses += 1
+            blocks.append(block)
+
+        start = offset - first_block * self.block_size
+        if len(blocks) == 1:
+            return blocks[0][start:start + length]
+        return b"".join(blocks)[start:start + length]
+
+    async def read_uncached(self, offset, length):
+        """
+        Reads a byte range straight from the storage, bypassing the cache (for bulk reads such as hashing).
+        """
+        return await self._pread(offset, length)
+
+    def stats(self):
+        return {
+            "reads_issued": self.reads_issued,
+            "bytes_read": self.bytes_read,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cached_blocks": len(self._cache),
+        }
+
+
+async def read_partition_tables_async(device, sector_size=512):
+    """
+    Reads the MBR, the primary GPT header and the whole GPT partition entry array.
+
+    The entry array is fetched with one read and decoded in one pass. Logical
+    partitions of extended MBR partitions are not followed.
+
+    :return: A dictionary with the "mbr_partitions", "gpt_header" and "gpt_partitions".
+    """
+    head = await device.read(0, sector_size * 2)
+    mbr_partitions = read_mbr_partition_entries(memoryview(head)) if head[510:512] == MBR_BOOT_SIGNATURE else []
+
+    gpt_header = None
+    gpt_partitions = []
+    header_bytes = head[sector_size:sector_size * 2]
+    if len(header_bytes) >= 92 and header_bytes[0:8] == GPT_SIGNATURE:
+        gpt_header = parse_gpt_header(header_bytes)
+        entry_size = gpt_header["Partition Entry Size"]
+        if entry_size < 128:
+            raise ValueError(f"Invalid GPT partition entry size: {entry_size}")
+
+        # Hostile headers can declare far more entries than the image holds
+        array_offset = gpt_header["Partition Entry LBA"] * sector_size
+        available = max(device.size - array_offset, 0) // entry_size
+        num_entries = min(gpt_header["Number of Partition Entries"], available)
+
+        array_bytes = await device.read(array_offset, num_entries * entry_size)
+        entries, indexes, sizes = decode_gpt_entry_array(array_bytes, num_entries, entry_size, sector_size)
+        for index, entry in zip(indexes, iter_gpt_entry_dicts(entries, sizes)):
+            entry["Index"] = int(index)
+            gpt_partitions.append(entry)
+
+    return {"mbr_partitions": mbr_partitions, "gpt_header": gpt_header, "gpt_partitions": gpt_partitions}
+
+
+async def open_fat32_volume_async(device, volume_offset):
+    """
+    Reads and parses the FAT32 boot sector of a volume.
+
+    :return: See parse_fat32_boot_sector().
+    """
+    return parse_fat32_boot_sector(await device.read(volume_offset, 512), volume_offset)
+
+
+async def iter_cluster_chain_async(device, volume, start_cluster):
+    """
+    Lazily follows a cluster chain through the first FAT.
+
+    FAT sectors come from the device's block cache, so a chain usually costs
+    one read per block of the FAT rather than one per cluster.
+
+    :return: Yields the clusters of the chain; raises ValueError on the first cluster seen twice.
+    """
+    fat_offset = volume["volume_offset"] + volume["reserved_sectors"] * volume["bytes_per_sector"]
+    last_cluster = volume["cluster_count"] + 1
+
+    visited = set()
+    cluster = start_cluster
+    while 2 <= cluster <= last_cluster:
+        if cluster in visited:
+            raise ValueError(f"Cluster chain starting at {start_cluster} loops")
+        visited.add(cluster)
+        yield cluster
+        cluster = FAT_ENTRY_STRUCT.unpack(await device.read(fat_offset + cluster * 4, 4))[0] & FAT32_CLUSTER_MASK
+
+
+async def walk_fat32_volume_async(device, volume, start_cluster=None, path="", include_deleted=False, _ancestors=None):
+    """
+    Recursively walks a FAT32 directory tree over an AsyncBlockDevice.
+
+    Directories are read and decoded one cluster at a time with the same code as
+    walk_fat32_volume(), so entries are yielded as soon as their cluster arrives;
+    the device's readahead fetches the following clusters meanwhile.
+
+    :param device: An open AsyncBlockDevice.
+    :param volume: The volume returned by open_fat32_volume_async().
+    :param start_cluster: First cluster of the directory (default is the root directory).
+    :param path: Path of the directory, used as a prefix for the yielded paths.
+    :param include_deleted: Also yield deleted (0xE5) entries.
+    :return: Yields (path, Fat32DirectoryRecord) tuples.
+    """
+    if start_cluster is None:
+        start_cluster = volume["root_cluster"]
+    ancestors = (_ancestors or set()) | {start_cluster}
+
+    long_names = LongNameAssembler()
+    async for cluster in iter_cluster_chain_async(device, volume, start_cluster):
+        cluster_bytes = await device.read(cluster_offset(volume, cluster), volume["cluster_size"])
+        entries, reached_end = decode_directory_cluster(memoryview(cluster_bytes), long_names, include_deleted)
+
+        for name, entry in entries:
+            if entry.attributes & ATTR_VOLUME_ID or name in (".", ".."):
+                continue
+
+            entry_path = f"{path}/{name}"
+            yield entry_path, entry
+
+            if entry.attributes & ATTR_DIRECTORY and not entry.deleted and entry.starting_cluster not in ancestors:
+                async for item in walk_fat32_volume_async(device, volume, entry.starting_cluster, entry_path, include_deleted, ancestors):
+                    yield item
+
+        if reached_end:
+            break
+
+
+async def find_fat32_volumes_async(device, tables, sector_size=512):
+    """
+    Returns the starting LBA of every partition that holds a FAT32 boot sector.
+
+    :param tables: The tables returned by read_partition_tables_async().
+    """
+    start_lbas = [entry["Starting LBA"] for entry in tables["gpt_partitions"]]
+    if tables["gpt_header"] is None:
+        start_lbas += [entry["starting_lba"] for entry in tables["mbr_partitions"]]
+
+    boot_sectors = await asyncio.gather(*(device.read(start_lba * sector_size, 512) for start_lba in start_lbas))
+    return [start_lba for start_lba, boot_sector in zip(start_lbas, boot_sectors) if boot_sector[0x52:0x5A] == FAT32_FILESYSTEM_TYPE]
+
+
+async def hash_device_async(device, offset=0, length=None, algorithms=DEFAULT_ALGORITHMS, chunk_size=8 * 1024 * 1024):
+    """
+    Hashes a byte range with several algorithms, keeping up to `max_outstanding` chunk reads in flight.
+
+    Chunks bypass the block cache. The digests are updated in order on worker
+    threads while the following chunks are still being read.
+
+    :return: A dictionary with one hex digest per algorithm, the byte count and the elapsed time.
+    """
+    if length is None:
+        length = max(device.size - offset, 0)
+    digests = {name: hashlib.new(name) for name in algorithms}
+    loop = asyncio.get_running_loop()
+    start_time = time.perf_counter()
+
+    chunk_offsets = range(offset, offset + length, chunk_size)
+    pending = []
+    bytes_done = 0
+    with ThreadPoolExecutor(max_workers=len(digests)) as digest_executor:
+        for chunk_offset in chunk_offsets:
+            pending.append(asyncio.ensure_future(device.read_uncached(chunk_offset, min(chunk_size, offset + length - chunk_offset))))
+            if len(pending) < device.max_outstanding:
+                continue
+            data = await pending.pop(0)
+            await asyncio.gather(*(loop.run_in_executor(digest_executor, digest.update, data) for digest in digests.values()))
+            bytes_done += len(data)
+
+        for future in pending:
+            data = await future
+            await asyncio.gather(*(loop.run_in_executor(digest_executor, digest.update, data) for digest in digests.values()))
+            bytes_done += len(data)
+
+    result = {name: digest.hexdigest() for name, digest in digests.items()}
+    result["bytes_hashed"] = bytes_done
+    result["elapsed_seconds"] = time.perf_counter() - start_time
+    return result
+
+
+async def _main(args):
+    async with AsyncBlockDevice(args.image, args.block_size, args.readahead, args.max_outstanding, args.cache_blocks) as device:
+        tables = await read_partition_tables_async(device, args.sector_size)
+        for entry in tables["mbr_partitions"]:
+            print(f"MBR partition {entry['index']}: {entry['partition_type']} at LBA {entry['starting_lba']}")
+        for entry in tables["gpt_partitions"]:
+            print(f"GPT partition {entry['Index']}: {entry['Partition Type']} at LBA {entry['Starting LBA']} ({entry['Partition Name']})")
+
+        for start_lba in await find_fat32_volumes_async(device, tables, args.sector_size):
+            volume = await open_fat32_volume_async(device, start_lba * args.sector_size)
+            count = 0
+            async for entry_path, entry in walk_fat32_volume_async(device, volume):
+                count += 1
+                if not args.quiet:
+                    print(f"{entry_path}  (cluster {entry.starting_cluster}, {entry.file_size} bytes)")
+            print(f"FAT32 volume at LBA {start_lba}: {count} entries")
+
+        if args.hash:
+            result = await hash_device_async(device, algorithms=args.hash)
+            for name in args.hash:
+                print(f"{name}: {result[name]}")
+
+        stats = device.stats()
+        print(f"{stats['reads_issued']} read(s), {stats['bytes_read']} bytes read, "
+              f"{stats['cache_hits']} cache hit(s), {stats['cache_misses']} miss(es)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read partition tables and walk FAT32 volumes with asynchronous, cached block reads.")
+    parser.add_argument("image", help="Path to the raw image")
+    parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Bytes per cached block (default is 64 KiB)")
+    parser.add_argument("--readahead", type=int, default=DEFAULT_READAHEAD_BLOCKS, help="Blocks read ahead (default is 4)")
+    parser.add_argument("--max-outstanding", type=int, default=DEFAULT_MAX_OUTSTANDING, help="Reads in flight (default is 8)")
+    parser.add_argument("--cache-blocks", type=int, default=DEFAULT_CACHE_BLOCKS, help="Blocks kept in the cache (default is 1024)")
+    parser.add_argument("--hash", nargs="*", metavar="ALGORITHM", help="Also hash the whole image (e.g. --hash md5 sha256)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print totals")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
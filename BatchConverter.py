@@ -0,0 +1,307 @@
+import argparse
+import sys
+
+import numpy as np
+
+from MemoryTypeConverter import SIZE_UNITS
+
+READ_CHUNK_SIZE = 1024 * 1024  # Bytes of input converted at a time
+MAX_VECTORIZED_DIGITS = 16  # Hex values up to 8 bytes are decoded as uint64 with NumPy
+INVALID_VALUE = "invalid"  # Printed for values that cannot be converted, so output lines stay aligned with input lines
+CENTS_DIGITS = 16  # Decimal digits of the largest exact cent count, in groups of 4
+MAX_EXACT_CENTS = 2 ** 52  # Beyond this, a float no longer holds every cent exactly
+
+# ASCII code -> value of the hex digit, 0xFF for anything that is not a hex digit
+_NIBBLE_VALUES = np.full(256, 0xFF, dtype=np.uint8)
+for _digit, _character in enumerate(b"0123456789abcdef"):
+    _NIBBLE_VALUES[_character] = _digit
+    _NIBBLE_VALUES[ord(chr(_character).upper())] = _digit
+
+# 0..9999 -> its 4 ASCII digits, so that numbers are printed 4 digits per division
+_DIGIT_GROUPS = np.array([[ord(digit) for digit in f"{group:04d}"] for group in range(10000)], dtype=np.uint8)
+
+
+def iter_value_blocks(input_stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Reads newline-delimited values from a binary stream in large blocks.
+
+    :param input_stream: A binary file object (e.g. sys.stdin.buffer).
+    :param chunk_size: Bytes read per call.
+    :return: Yields blocks of whole lines; every block ends with a newline and has no carriage returns.
+    """
+    remainder = b""
+    while True:
+        block = input_stream.read(chunk_size)
+        if not block:
+            break
+        if b"\r" in block:
+            block = block.replace(b"\r", b"")
+
+        # The last line of a block may continue in the next one
+        block = remainder + block
+        last_newline = block.rfind(b"\n")
+        remainder = block[last_newline + 1:]
+        if last_newline >= 0:
+            yield block[:last_newline + 1]
+
+    if remainder:
+        yield remainder + b"\n"
+
+
+def _line_bounds(block_array):
+    ends = np.flatnonzero(block_array == ord("\n")).astype(np.int32)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    return starts, ends
+
+
+def _decode_hex_value(line, byteorder):
+    try:
+        byte_data = bytes.fromhex(line.decode("ascii"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return int.from_bytes(byte_data, byteorder) if byte_data else None
+
+
+def decode_hex_block(block, byteorder="big"):
+    """
+    Converts every line of a block of hex values to an integer.
+
+    Every value of up to 16 digits is gathered into a fixed-width character
+    matrix, padded with "0" on the side that keeps its value (the left for
+    big-endian, the right for little-endian), and decoded as uint64 in one
+    pass. When all lines have the same width, the block itself is viewed as
+    that matrix without gathering anything. Other lines (longer values, spaces between the bytes, invalid input)
+    go through bytes.fromhex() and int.from_bytes().
+
+    :param block: Newline-terminated lines of hex values, as returned by iter_value_blocks().
+    :param byteorder: "big" (like convert_bytes_to_decimal()) or "little" (like hex_to_decimal_and_binary()).
+    :return: A tuple (values, vectorized, others): a uint64 array, a mask of the lines decoded into it,
+             and a dictionary of line index -> int (or None when invalid) for the other lines.
+    """
+    block_array = np.frombuffer(block, dtype=np.uint8)
+    starts, ends = _line_bounds(block_array)
+    lengths = ends - starts
+    width = int(lengths[0]) if len(lengths) else 0
+
+    if 0 < width <= MAX_VECTORIZED_DIGITS and width % 2 == 0 and (lengths == width).all():
+        # Fixed-width lines: each row of the block is one value followed by its newline
+        nibbles = _NIBBLE_VALUES[block_array.reshape(-1, width + 1)[:, :width]]
+        vectorized = (nibbles != 0xFF).all(axis=1)
+        value_bytes = np.zeros((len(lengths), 8), dtype=np.uint8)
+        if byteorder == "big":
+            value_bytes[:, 8 - width // 2:] = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+        else:
+            value_bytes[:, :width // 2] = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    else:
+        columns = np.arange(MAX_VECTORIZED_DIGITS, dtype=np.int32)
+        if byteorder == "big":
+            positions = ends[:, None] - MAX_VECTORIZED_DIGITS + columns
+            inside = positions >= starts[:, None]
+        else:
+            positions = starts[:, None] + columns
+            inside = positions < ends[:, None]
+        characters = np.take(block_array, positions, mode="clip")
+        characters[~inside] = ord("0")
+
+        nibbles = _NIBBLE_VALUES[characters]
+        vectorized = (lengths > 0) & (lengths <= MAX_VECTORIZED_DIGITS) & (lengths % 2 == 0) & (nibbles != 0xFF).all(axis=1)
+        value_bytes = np.ascontiguousarray((nibbles[:, 0::2] << 4) | nibbles[:, 1::2])
+
+    values = value_bytes.view(">u8" if byteorder == "big" else "<u8").ravel().astype(np.uint64)
+
+    others = {}
+    for index in np.flatnonzero(~vectorized).tolist():
+        others[index] = _decode_hex_value(block[starts[index]:ends[index]], byteorder)
+    return values, vectorized, others
+
+
+def hex_values_to_ints(lines, byteorder="big"):
+    """
+    Converts a list of hex values (bytes or str) to integers, with None for invalid values.
+    """
+    if not lines:
+        return []
+    block = b"\n".join(line.encode("ascii", errors="replace") if isinstance(line, str) else line for line in lines) + b"\n"
+    values, vectorized, others = decode_hex_block(block, byteorder)
+    results = values.tolist()
+    for index, value in others.items():
+        results[index] = value
+    return results
+
+
+def _digit_columns(values, width, min_digits=1):
+    # Decimal digits of unsigned integers, right-aligned, with a mask that drops the leading zeros
+    characters = np.empty((len(values), width), dtype=np.uint8)
+    remaining = values.copy()
+    group_size = np.uint64(10000)
+    for column in range(width - 4, -1, -4):
+        characters[:, column:column + 4] = _DIGIT_GROUPS[remaining % group_size]
+        remaining //= group_size
+    mask = np.maximum.accumulate(characters != ord("0"), axis=1)
+    mask[:, width - min_digits:] = True
+    return characters, mask
+
+
+def _constant_column(count, character):
+    return np.full((count, 1), ord(character), dtype=np.uint8), np.ones((count, 1), dtype=bool)
+
+
+def _join_rows(columns, vectorized, other_text):
+    """
+    Lays out one output line per row without a Python loop over the rows.
+
+    :param columns: (characters, mask) pairs laid side by side for the vectorized rows.
+    :param vectorized: Mask of the rows formatted by the columns.
+    :param other_text: Dictionary of row index -> text for the remaining rows.
+    :return: The newline-terminated lines as bytes.
+    """
+    count = len(vectorized)
+    characters = [column_characters for column_characters, _ in columns]
+    masks = [column_mask & vectorized[:, None] for _, column_mask in columns]
+
+    if other_text:
+        encoded = {index: text.encode("ascii") for index, text in other_text.items()}
+        other_characters = np.zeros((count, max(map(len, encoded.values()))), dtype=np.uint8)
+        for index, text in encoded.items():
+            other_characters[index, :len(text)] = np.frombuffer(text, dtype=np.uint8)
+        characters.append(other_characters)
+        masks.append(other_characters != 0)
+
+    newline_characters, newline_mask = _constant_column(count, "\n")
+    characters.append(newline_characters)
+    masks.append(newline_mask)
+    return np.concatenate(characters, axis=1)[np.concatenate(masks, axis=1)].tobytes()
+
+
+def format_hex_block(block, byteorder="big", with_binary=False):
+    """
+    Converts a block of hex values to decimal (and binary) output lines.
+
+    :return: A tuple (output bytes, number of values).
+    """
+    values, _, others = decode_hex_block(block, byteorder)
+
+    results = values.tolist()
+    for index, value in others.items():
+        results[index] = value
+    if with_binary:
+        lines = [INVALID_VALUE if value is None else f"{value}\t{value:b}" for value in results]
+    else:
+        lines = map(str, results) if not others else [INVALID_VALUE if value is None else str(value) for value in results]
+    return ("\n".join(lines) + "\n").encode("ascii"), len(results)
+
+
+def format_size_block(block, from_unit):
+    """
+    Converts a block of sizes in one unit to B, KB, MB, GB and TB lines (tab separated, two decimals).
+
+    The values are computed with the same float operations as convert_size_to_all(),
+    and printed from their rounded cents. Rows where that rounding could differ
+    from "%.2f" (ties, huge or non-finite values) are formatted by Python instead.
+
+    :return: A tuple (output bytes, number of values).
+    """
+    lines = block.split(b"\n")[:-1]
+    try:
+        sizes = np.array(lines).astype(np.float64)
+        invalid = np.zeros(len(lines), dtype=bool)
+    except ValueError:
+        # At least one value is not a number; parse them one by one
+        sizes = np.zeros(len(lines))
+        invalid = np.zeros(len(lines), dtype=bool)
+        for index, line in enumerate(lines):
+            try:
+                sizes[index] = float(line)
+            except ValueError:
+                invalid[index] = True
+
+    divisors = np.array(list(SIZE_UNITS.values()), dtype=np.float64)
+
+    # Huge inputs overflow to inf, as they do in convert_size_to_all()
+    with np.errstate(invalid="ignore", over="ignore"):
+        table = (sizes * SIZE_UNITS[from_unit])[:, None] / divisors
+        scaled = np.abs(table) * 100
+        cents = np.rint(scaled)
+        exact = np.isfinite(scaled) & (scaled < MAX_EXACT_CENTS) & (np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) > scaled * 4e-16 + 1e-9)
+    vectorized = exact.all(axis=1) & ~invalid
+
+    columns = []
+    for unit_index in range(len(SIZE_UNITS)):
+        if unit_index:
+            columns.append(_constant_column(len(lines), "\t"))
+        sign_characters, _ = _constant_column(len(lines), "-")
+        columns.append((sign_characters, np.signbit(table[:, unit_index])[:, None]))
+
+        digit_characters, digit_mask = _digit_columns(np.where(vectorized, cents[:, unit_index], 0).astype(np.uint64), CENTS_DIGITS, min_digits=3)
+        columns.append((digit_characters[:, :-2], digit_mask[:, :-2]))
+        columns.append(_constant_column(len(lines), "."))
+        columns.append((digit_characters[:, -2:], digit_mask[:, -2:]))
+
+    row_format = "\t".join(["%.2f"] * len(SIZE_UNITS))
+    other_text = {}
+    for index in np.flatnonzero(~vectorized).tolist():
+        other_text[index] = INVALID_VALUE if invalid[index] else row_format % tuple(table[index].tolist())
+    return _join_rows(columns, vectorized, other_text), len(lines)
+
+
+def convert_hex_stream(input_stream, output_stream, byteorder="big", with_binary=False, chunk_size=READ_CHUNK_SIZE):
+    """
+    Converts a stream of hex values to decimal, one output line per input line.
+
+    :param byteorder: "big" for HexToBytes semantics, "little" for HexToWhatever semantics.
+    :param with_binary: Also print the binary digits, tab separated.
+    :return: The number of values converted.
+    """
+    count = 0
+    for block in iter_value_blocks(input_stream, chunk_size):
+        output, block_count = format_hex_block(block, byteorder, with_binary)
+        output_stream.write(output)
+        count += block_count
+    return count
+
+
+def convert_size_stream(input_stream, output_stream, from_unit, chunk_size=READ_CHUNK_SIZE):
+    """
+    Converts a stream of sizes in one unit to B, KB, MB, GB and TB, one output line per input line.
+
+    :return: The number of values converted.
+    """
+    from_unit = from_unit.upper()
+    if from_unit not in SIZE_UNITS:
+        raise ValueError("Invalid unit. Must be one of 'B', 'KB', 'MB', 'GB', 'TB'")
+
+    count = 0
+    for block in iter_value_blocks(input_stream, chunk_size):
+        output, block_count = format_size_block(block, from_unit)
+        output_stream.write(output)
+        count += block_count
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert newline-delimited values from stdin or a file, one output line per value.")
+    parser.add_argument("mode", choices=("hex", "hex-le", "size"),
+                        help="hex: big-endian hex to decimal (HexToBytes); hex-le: little-endian hex to decimal and binary "
+                             "(HexToWhatever); size: sizes to B/KB/MB/GB/TB (MemoryTypeConverter)")
+    parser.add_argument("input", nargs="?", default="-", help="Input file (default is stdin)")
+    parser.add_argument("--unit", default="B", help="Unit of the input sizes in size mode (default is B)")
+    parser.add_argument("--chunk-size", type=int, default=READ_CHUNK_SIZE, help="Bytes of input converted at a time (default is 1 MiB)")
+    args = parser.parse_args(argv)
+
+    input_stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        if args.mode == "size":
+            convert_size_stream(input_stream, sys.stdout.buffer, args.unit, args.chunk_size)
+        else:
+            byteorder = "big" if args.mode == "hex" else "little"
+            convert_hex_stream(input_stream, sys.stdout.buffer, byteorder, args.mode == "hex-le", args.chunk_size)
+    finally:
+        if input_stream is not sys.stdin.buffer:
+            input_stream.close()
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
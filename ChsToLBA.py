@@ -1,4 +1,4 @@
-def chs_to_lba(cylinder, head, sector, hpc=255, spt=63):
+def chs_to_lba(cylinder, head, sector, hpc=255, spt=63, profile=None):
     """
     Converts CHS (Cylinder, Head, Sector) to LBA (Logical Block Address).
 
@@ -7,8 +7,12 @@ def chs_to_lba(cylinder, head, sector, hpc=255, spt=63):
     :param sector: The sector number (S).
     :param hpc: Heads per cylinder (default 255).
     :param spt: Sectors per track (default 63).
+    :param profile: Optional VolumeProfile; when given, its detected geometry is used.
     :return: The corresponding LBA (Logical Block Address).
     """
+    if profile is not None:
+        hpc, spt = profile.hpc, profile.spt
+
     # Calculate LBA using the formula
     lba = (cylinder * hpc + head) * spt + (sector - 1)
     return lba
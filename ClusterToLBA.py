@@ -1,13 +1,19 @@
-def cluster_to_lba(cluster_number, first_data_sector, sectors_per_cluster):
+def cluster_to_lba(cluster_number, first_data_sector=None, sectors_per_cluster=None, profile=None):
     """
     Convert cluster number to LBA (Logical Block Address).
     
     :param cluster_number: The cluster number to convert.
     :param first_data_sector: The first data sector (start of the data region).
     :param sectors_per_cluster: The number of sectors per cluster.
+    :param profile: Optional VolumeProfile; when given, its first data sector and sectors per cluster are used.
     
     :return: The corresponding LBA.
     """
+    if profile is not None:
+        if not profile.has_fat32:
+            raise ValueError("The profile has no FAT32 volume, so it has no data region.")
+        first_data_sector, sectors_per_cluster = profile.first_data_sector, profile.sectors_per_cluster
+
     if cluster_number < 2:
         raise ValueError("Cluster number should be >= 2 (FAT cluster numbering starts from 2).")
     
@@ -0,0 +1,221 @@
+import importlib
+import mmap
+from contextlib import contextmanager
+
+from ExtendedPartitionWalker import EXTENDED_PARTITION_TYPES, walk_ebr_chain
+from MBRPartitionEntryParser import parse_mbr_partition_entry
+from GPTPartitionEntryParser import parse_gpt_partition_entry
+from SplitImage import SplitImage, is_split_image
+
+# The header parser's file name is not a valid identifier, so it has to be loaded by name
+parse_gpt_header = importlib.import_module("GPTHeaderParser(WithCRCVerify)").parse_gpt_header
+
+MBR_PARTITION_TABLE_OFFSET = 0x1BE
+MBR_PARTITION_ENTRY_SIZE = 16
+MBR_BOOT_SIGNATURE = b"\x55\xaa"
+GPT_SIGNATURE = b"EFI PART"
+GPT_PROTECTIVE_TYPE = 0xEE
+
+
+@contextmanager
+def open_image(image_path):
+    """
+    Memory-maps a raw disk image (dd/.img) read-only.
+
+    A split image is opened from its first segment (e.g. "disk.001") as a
+    SplitImage, which maps its segments on demand and slices like a memoryview.
+
+    :param image_path: Path to the raw image file, or to the first segment of a split image.
+    :return: A memoryview over the whole image (a SplitImage for split images); slicing it never copies the image.
+    """
+    if is_split_image(image_path):
+        with SplitImage.from_first_segment(image_path) as split_image:
+            yield split_image
+        return
+
+    with open(image_path, "rb") as image_file:
+        try:
+            image_map = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"Cannot map {image_path}: the image is empty")
+
+        image_view = memoryview(image_map)
+        try:
+            yield image_view
+        finally:
+            # The view has to be released before the map can be closed; a slice still
+            # held by a traceback keeps the map alive until it is garbage collected
+            try:
+                image_view.release()
+                image_map.close()
+            except BufferError:
+                pass
+
+
+def read_mbr_partition_entries(image_view, parse_cache=None):
+    """
+    Parses the four primary partition entries of the MBR at LBA 0.
+
+    :param image_view: A memoryview over the image.
+    :param parse_cache: Optional ParseCache used instead of parsing every entry.
+    :return: A list of parsed entries (empty if the boot signature is missing).
+    """
+    if len(image_view) < 512 or image_view[510:512] != MBR_BOOT_SIGNATURE:
+        return []
+
+    entries = []
+    for index in range(4):
+        offset = MBR_PARTITION_TABLE_OFFSET + index * MBR_PARTITION_ENTRY_SIZE
+        entry_view = image_view[offset:offset + MBR_PARTITION_ENTRY_SIZE]
+
+        # Skip unused slots (partition type 0x00)
+        if entry_view[4] == 0x00:
+            continue
+
+        if parse_cache is not None:
+            entry = parse_cache.parse_mbr_partition_entry(entry_view)
+        else:
+            entry = parse_mbr_partition_entry(entry_view)
+        entry["index"] = index
+        entry["partition_type_code"] = entry_view[4]
+        entries.append(entry)
+    return entries
+
+
+def read_gpt_header(image_view, sector_size=512, parse_cache=None):
+    """
+    Parses the primary GPT header at LBA 1.
+
+    :param image_view: A memoryview over the image.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param parse_cache: Optional ParseCache used instead of parsing the header.
+    :return: The parsed header, or None if there is no "EFI PART" signature.
+    """
+    header_view = image_view[sector_size:sector_size * 2]
+    if len(header_view) < 92 or header_view[0:8] != GPT_SIGNATURE:
+        return None
+    if parse_cache is not None:
+        return parse_cache.parse_gpt_header(header_view)
+    return parse_gpt_header(header_view)
+
+
+def read_gpt_partition_entries(image_view, gpt_header, sector_size=512, parse_cache=None):
+    """
+    Parses the used entries of the GPT partition entry array.
+
+    :param image_view: A memoryview over the image.
+    :param gpt_header: The header returned by read_gpt_header().
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param parse_cache: Optional ParseCache used instead of parsing every entry.
+    :return: A list of parsed entries; empty slots are skipped.
+    """
+    entry_size = gpt_header["Partition Entry Size"]
+    if entry_size < 128:
+        raise ValueError(f"Invalid GPT partition entry size: {entry_size}")
+
+    array_offset = gpt_header["Partition Entry LBA"] * sector_size
+
+    # Hostile headers can declare far more entries than the image holds
+    available = max(len(image_view) - array_offset, 0) // entry_size
+    num_entries = min(gpt_header["Number of Partition Entries"], available)
+
+    entries = []
+    for index in range(num_entries):
+        offset = array_offset + index * entry_size
+        entry_view = image_view[offset:offset + 128]
+
+        # An all-zero partition type GUID marks an unused slot
+        if not any(entry_view[0x00:0x10]):
+            continue
+
+        if parse_cache is not None:
+            entry = parse_cache.parse_gpt_partition_entry(entry_view, sector_size)
+        else:
+            entry = parse_gpt_partition_entry(entry_view, sector_size)
+        entry["Index"] = index
+        entries.append(entry)
+    return entries
+
+
+def parse_partition_layout(image_view, sector_size=512, parse_cache=None):
+    """
+    Reads the full partition layout (MBR with its logical partitions, and GPT when present) from an image.
+
+    :param image_view: A memoryview over the image.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param parse_cache: Optional ParseCache used instead of parsing every structure.
+    :return: A dictionary with the MBR entries, the logical partitions, the GPT header and the GPT entries.
+    """
+    mbr_entries = read_mbr_partition_entries(image_view, parse_cache)
+
+    # Follow the EBR chain of every extended partition
+    logical_entries = []
+    ebr_chain_errors = []
+    for entry in mbr_entries:
+        if entry["partition_type_code"] in EXTENDED_PARTITION_TYPES:
+            chain = walk_ebr_chain(image_view, entry["starting_lba"], sector_size)
+            logical_entries.extend(chain["logical_partitions"])
+            if chain["chain_error"]:
+                ebr_chain_errors.append(chain["chain_error"])
+
+    gpt_header = read_gpt_header(image_view, sector_size, parse_cache)
+
+    gpt_entries = []
+    if gpt_header is not None:
+        gpt_entries = read_gpt_partition_entries(image_view, gpt_header, sector_size, parse_cache)
+
+    return {
+        "sector_size": sector_size,
+        "image_size": len(image_view),
+        "mbr_partitions": mbr_entries,
+        "logical_partitions": logical_entries,
+        "ebr_chain_errors": ebr_chain_errors,
+        "is_protective_mbr": any(entry["partition_type_code"] == GPT_PROTECTIVE_TYPE for entry in mbr_entries),
+        "gpt_header": gpt_header,
+        "gpt_partitions": gpt_entries,
+    }
+
+
+def scan_partition_table(image_path, sector_size=512):
+    """
+    Opens a raw image and returns its full partition layout.
+
+    :param image_path: Path to the raw image file.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :return: See parse_partition_layout().
+    """
+    with open_image(image_path) as image_view:
+        return parse_partition_layout(image_view, sector_size)
+
+
+if __name__ == "__main__":
+    image_path = input("Enter the path to the raw disk image: ").strip()
+
+    sector_size_input = input("Enter sector size in bytes (default is 512): ").strip()
+    sector_size = int(sector_size_input) if sector_size_input.isdigit() else 512
+
+    layout = scan_partition_table(image_path, sector_size)
+
+    print("\nMBR Partition Entries:")
+    for entry in layout["mbr_partitions"]:
+        print(f"\nEntry {entry['index']}:")
+        for key, value in entry.items():
+            print(f"  {key}: {value}")
+
+    for entry in layout["logical_partitions"]:
+        print(f"\nLogical partition (EBR at LBA {entry['ebr_lba']}):")
+        for key, value in entry.items():
+            print(f"  {key}: {value}")
+    for chain_error in layout["ebr_chain_errors"]:
+        print(f"\nWarning: {chain_error}")
+
+    if layout["gpt_header"] is not None:
+        print("\nGPT Header:")
+        for key, value in layout["gpt_header"].items():
+            print(f"  {key}: {value}")
+
+        print("\nGPT Partition Entries:")
+        for entry in layout["gpt_partitions"]:
+            print(f"\nEntry {entry['Index']}:")
+            for key, value in entry.items():
+                print(f"  {key}: {value}")
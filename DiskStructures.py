@@ -0,0 +1,61 @@
+import struct
+
+# Precompiled layouts of the on-disk records, all little-endian. Each record is
+# decoded with a single unpack_from() against the image's memoryview, without
+# slicing out copies of the individual fields first.
+
+# MBR/EBR partition entry (16 bytes):
+# boot indicator, starting CHS, partition type, ending CHS, starting LBA, total sectors
+MBR_ENTRY_STRUCT = struct.Struct("<B3sB3sII")
+
+# GPT header (the 92 bytes covered by the header CRC32):
+# signature, revision, header size, header CRC32, (reserved), current LBA, backup LBA,
+# first usable LBA, last usable LBA, disk GUID, partition entry LBA, number of partition
+# entries, partition entry size, partition array CRC32
+GPT_HEADER_STRUCT = struct.Struct("<8sIII4xQQQQ16sQIII")
+
+# GPT partition entry (128 bytes):
+# partition type GUID, unique partition GUID, starting LBA, ending LBA, attribute flags, name (UTF-16LE)
+GPT_ENTRY_STRUCT = struct.Struct("<16s16sQQQ72s")
+
+# FAT short directory entry (32 bytes):
+# 8.3 name, attributes, NT reserved, creation time tenths, creation time, creation date,
+# access date, first cluster (high word), modification time, modification date,
+# first cluster (low word), file size
+FAT_DIRENT_STRUCT = struct.Struct("<11sBBBHHHHHHHI")
+
+# FAT32 boot sector / BPB (the first 90 bytes):
+# jump, OEM name, bytes per sector, sectors per cluster, reserved sectors, number of FATs,
+# root entries (0 on FAT32), total sectors (16-bit), media, sectors per FAT (16-bit),
+# sectors per track, heads, hidden sectors, total sectors (32-bit), sectors per FAT (32-bit),
+# extended flags, FS version, root cluster, FSInfo sector, backup boot sector, (reserved),
+# drive number, (reserved), boot signature, volume ID, volume label, file system type
+FAT32_BPB_STRUCT = struct.Struct("<3s8sHBHBHHBHHHIIIHHIHH12xBxBI11s8s")
+
+# One FAT32 table entry
+FAT_ENTRY_STRUCT = struct.Struct("<I")
+
+# Mixed-endian GUID (16 bytes): the first three groups are little-endian, the last two are stored as-is
+GUID_STRUCT = struct.Struct("<IHH2s6s")
+
+
+def iter_records(record_struct, buffer, count=None, offset=0, stride=None):
+    """
+    Decodes an array of records with one iter_unpack() pass.
+
+    :param record_struct: One of the *_STRUCT layouts.
+    :param buffer: The image (or any buffer) holding the array.
+    :param count: Number of records (default is as many as fit).
+    :param offset: Byte offset of the first record.
+    :param stride: Distance between two records when it is larger than the record
+                   (e.g. GPT entries bigger than 128 bytes).
+    :return: An iterator of tuples of raw field values.
+    """
+    stride = stride or record_struct.size
+    available = max(len(buffer) - offset, 0) // stride
+    count = available if count is None else min(count, available)
+
+    if stride == record_struct.size:
+        # A memoryview slice is not a copy
+        return record_struct.iter_unpack(memoryview(buffer)[offset:offset + count * stride])
+    return (record_struct.unpack_from(buffer, offset + index * stride) for index in range(count))
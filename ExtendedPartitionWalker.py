@@ -0,0 +1,86 @@
+from MBRPartitionEntryParser import parse_mbr_partition_entry
+
+EXTENDED_PARTITION_TYPES = (0x05, 0x0F, 0x85)  # Extended, W95 Extended (LBA), Linux extended
+MAX_LOGICAL_PARTITIONS = 1024  # Longer EBR chains are treated as corrupt or hostile
+
+
+def walk_ebr_chain(image_view, extended_start_lba, sector_size=512, max_ebrs=MAX_LOGICAL_PARTITIONS):
+    """
+    Follows the chain of Extended Boot Records (EBRs) of an extended partition.
+
+    In every EBR the first entry describes one logical partition, relative to
+    that EBR, and the second entry points to the next EBR, relative to the start
+    of the extended partition. Each EBR sector is read at most once: a chain that
+    comes back to an EBR it has already visited, or that is longer than
+    `max_ebrs`, is cut there and reported in "chain_error".
+
+    :param image_view: A memoryview over the image.
+    :param extended_start_lba: Starting LBA of the extended partition (from the MBR).
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param max_ebrs: Maximum number of EBRs to follow.
+    :return: A dictionary with the logical partitions, the EBR LBAs visited and any chain error.
+    """
+    logical_partitions = []
+    visited = set()
+    ebr_lbas = []
+    chain_error = None
+
+    ebr_lba = extended_start_lba
+    while True:
+        if ebr_lba in visited:
+            chain_error = f"EBR chain loops back to LBA {ebr_lba}"
+            break
+        if len(visited) >= max_ebrs:
+            chain_error = f"EBR chain is longer than {max_ebrs} entries"
+            break
+        visited.add(ebr_lba)
+
+        offset = ebr_lba * sector_size
+        ebr_view = image_view[offset:offset + sector_size]
+        if len(ebr_view) < 512 or ebr_view[510:512] != b"\x55\xaa":
+            chain_error = f"No valid EBR at LBA {ebr_lba}"
+            break
+        ebr_lbas.append(ebr_lba)
+
+        # Entry 1: the logical partition, relative to this EBR
+        logical_view = ebr_view[0x1BE:0x1CE]
+        if logical_view[4] != 0x00:
+            entry = parse_mbr_partition_entry(logical_view)
+            entry["partition_type_code"] = logical_view[4]
+            entry["ebr_lba"] = ebr_lba
+            entry["relative_starting_lba"] = entry["starting_lba"]
+            entry["starting_lba"] = ebr_lba + entry["relative_starting_lba"]
+            logical_partitions.append(entry)
+
+        # Entry 2: the next EBR, relative to the start of the extended partition
+        next_view = ebr_view[0x1CE:0x1DE]
+        if next_view[4] not in EXTENDED_PARTITION_TYPES:
+            break
+        ebr_lba = extended_start_lba + int.from_bytes(next_view[8:12], byteorder="little")
+
+    return {
+        "logical_partitions": logical_partitions,
+        "ebr_lbas": ebr_lbas,
+        "chain_error": chain_error,
+    }
+
+
+# Main function
+if __name__ == "__main__":
+    from DiskImageScanner import open_image, read_mbr_partition_entries
+
+    image_path = input("Enter the path to the raw disk image: ").strip()
+
+    with open_image(image_path) as image_view:
+        for mbr_entry in read_mbr_partition_entries(image_view):
+            if mbr_entry["partition_type_code"] not in EXTENDED_PARTITION_TYPES:
+                continue
+
+            chain = walk_ebr_chain(image_view, mbr_entry["starting_lba"])
+            print(f"\nExtended partition at LBA {mbr_entry['starting_lba']} ({len(chain['ebr_lbas'])} EBRs):")
+            for entry in chain["logical_partitions"]:
+                print(f"\nLogical partition (EBR at LBA {entry['ebr_lba']}):")
+                for key, value in entry.items():
+                    print(f"  {key}: {value}")
+            if chain["chain_error"]:
+                print(f"\nWarning: {chain['chain_error']}")
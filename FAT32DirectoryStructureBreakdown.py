@@ -1,4 +1,4 @@
-import struct
+from DiskStructures import FAT_DIRENT_STRUCT
 
 def parse_fat32_directory_entry(hex_string):
     # Convert the hex string to bytes
@@ -17,24 +17,12 @@ def parse_fat32_directory_entry(hex_string):
     # Reserved byte (offset 0x0c)
     reserved = directory_entry[0x0c]
 
-    # File creation timestamp (offsets 0x0e-0x0f for time, 0x0d for millisecond, 0x10-0x11 for date)
-    creation_time = struct.unpack("<H", directory_entry[0x0e:0x10])[0]
-    creation_millisecond = directory_entry[0x0d]
-    creation_date = struct.unpack("<H", directory_entry[0x10:0x12])[0]
-
-    # Last access date (offset 0x12-0x13)
-    last_access_date = struct.unpack("<H", directory_entry[0x12:0x14])[0]
-
-    # First cluster of entry (offsets 0x14-0x15 for high word, 0x1a-0x1b for low word)
-    first_cluster_high = struct.unpack("<H", directory_entry[0x14:0x16])[0]
-    first_cluster_low = struct.unpack("<H", directory_entry[0x1a:0x1c])[0]
-
-    # Last write timestamp (offsets 0x16-0x17 for time, 0x18-0x19 for date)
-    last_write_time = struct.unpack("<H", directory_entry[0x16:0x18])[0]
-    last_write_date = struct.unpack("<H", directory_entry[0x18:0x1a])[0]
-
-    # File size in bytes (offset 0x1c-0x1f)
-    file_size = struct.unpack("<I", directory_entry[0x1c:0x20])[0]
+    # The numeric fields in one pass: creation timestamp (0x0d for millisecond, 0x0e-0x0f for time,
+    # 0x10-0x11 for date), last access date (0x12-0x13), first cluster (0x14-0x15 for high word,
+    # 0x1a-0x1b for low word), last write timestamp (0x16-0x17 for time, 0x18-0x19 for date) and
+    # file size in bytes (0x1c-0x1f)
+    (_, _, _, creation_millisecond, creation_time, creation_date, last_access_date, first_cluster_high,
+     last_write_time, last_write_date, first_cluster_low, file_size) = FAT_DIRENT_STRUCT.unpack_from(directory_entry)
 
     # Decode time and date for creation and last write
     creation_time_str = decode_fat32_time(creation_time)
@@ -42,6 +30,10 @@ def parse_fat32_directory_entry(hex_string):
     last_write_time_str = decode_fat32_time(last_write_time)
     last_write_date_str = decode_fat32_date(last_write_date)
 
+    # Status markers in the first byte: 0xE5 = deleted, 0x00 = end of directory (no further entries)
+    deleted = directory_entry[0x00] == 0xE5
+    end_of_directory = directory_entry[0x00] == 0x00
+
     # Return the parsed information in a dictionary
     return {
         "short_filename": short_filename,
@@ -56,7 +48,9 @@ def parse_fat32_directory_entry(hex_string):
         "first_cluster_low": first_cluster_low,
         "last_write_time": last_write_time_str,
         "last_write_date": last_write_date_str,
-        "file_size": file_size
+        "file_size": file_size,
+        "deleted": deleted,
+        "end_of_directory": end_of_directory
     }
 
 def decode_fat32_attributes(attr_byte):
@@ -77,13 +71,10 @@ def decode_fat32_attributes(attr_byte):
     return ", ".join(attributes)
 
 def decode_fat32_date(date_value):
-    # Convert the 16-bit date value to binary (keeping leading zeros if necessary)
-    date_binary = f"{date_value:016b}"
-
-    # Extract the fields from the binary string
-    day = int(date_binary[-5:], 2)  # Bits 0-4: Day of the month (binary digits 11-15 in a 16-bit date field)
-    month = int(date_binary[-9:-5], 2)  # Bits 5-8: Month of the year (binary digits 7-10)
-    year = int(date_binary[:-9], 2) + 1980  # Bits 9-15: Year since 1980 (binary digits 0-6)
+    # Extract the components from the 16-bit date value
+    day = date_value & 0x1F  # Bits 0-4: Day of the month
+    month = (date_value >> 5) & 0x0F  # Bits 5-8: Month of the year
+    year = ((date_value >> 9) & 0x7F) + 1980  # Bits 9-15: Year since 1980
 
     # Return the decoded date in the format "YYYY-MM-DD"
     return f"{year:04d}-{month:02d}-{day:02d}"
@@ -98,9 +89,10 @@ def decode_fat32_time(time_value):
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 # Example usage
-hex_input = input("Enter a 32-byte hex string: ")  # You will input the hex string here
-parsed_entry = parse_fat32_directory_entry(hex_input)
+if __name__ == "__main__":
+    hex_input = input("Enter a 32-byte hex string: ")  # You will input the hex string here
+    parsed_entry = parse_fat32_directory_entry(hex_input)
 
-# Display the parsed FAT32 directory entry
-for key, value in parsed_entry.items():
-    print(f"{key}: {value}")
+    # Display the parsed FAT32 directory entry
+    for key, value in parsed_entry.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,335 @@
+from ClusterToLBA import cluster_to_lba
+from DiskStructures import FAT32_BPB_STRUCT, FAT_DIRENT_STRUCT, FAT_ENTRY_STRUCT, iter_records
+from ForensicRecords import Fat32DirectoryRecord
+
+DIRECTORY_ENTRY_SIZE = 32
+FAT32_CLUSTER_MASK = 0x0FFFFFFF  # The top 4 bits of a FAT32 entry are reserved
+END_OF_DIRECTORY = 0x00
+DELETED_ENTRY = 0xE5
+ATTR_VOLUME_ID = 0x08
+ATTR_DIRECTORY = 0x10
+ATTR_LONG_NAME = 0x0F
+LFN_LAST_ENTRY = 0x40  # Set in the sequence number of the first physical (last logical) LFN entry
+LFN_MAX_ENTRIES = 20  # 20 entries * 13 characters covers the 255 character limit
+FAT_WINDOW_SIZE = 64 * 1024  # Bytes of the FAT sliced at a time when following a chain
+FAT32_FILESYSTEM_TYPE = b"FAT32   "  # BPB offset 0x52
+
+
+def parse_fat32_boot_sector(boot_sector, volume_offset=0):
+    """
+    Parses the fields of the FAT32 boot sector (BPB) needed to walk the volume.
+
+    :param boot_sector: The first 512 bytes of the FAT32 volume.
+    :param volume_offset: Byte offset of the volume inside the image.
+    :return: A dictionary describing the volume layout.
+    """
+    if len(boot_sector) < 512 or boot_sector[510:512] != b"\x55\xaa":
+        raise ValueError("Missing boot sector signature (0x55AA)")
+
+    (_, _, bytes_per_sector, sectors_per_cluster, reserved_sectors, num_fats, _, _, _, _, sectors_per_track, num_heads, _,
+     total_sectors, sectors_per_fat, _, _, root_cluster, _, _, _, _, _, _, _) = FAT32_BPB_STRUCT.unpack_from(boot_sector)
+
+    if bytes_per_sector not in (512, 1024, 2048, 4096):
+        raise ValueError(f"Invalid bytes per sector: {bytes_per_sector}")
+    if sectors_per_cluster == 0 or sectors_per_cluster & (sectors_per_cluster - 1):
+        raise ValueError(f"Invalid sectors per cluster: {sectors_per_cluster}")
+    if num_fats == 0 or sectors_per_fat == 0:
+        raise ValueError("Not a FAT32 boot sector (no FAT32 FAT size)")
+
+    # The data region starts right after the reserved area and all FAT copies
+    first_data_sector = reserved_sectors + num_fats * sectors_per_fat
+    cluster_count = max(total_sectors - first_data_sector, 0) // sectors_per_cluster
+
+    return {
+        "volume_offset": volume_offset,
+        "bytes_per_sector": bytes_per_sector,
+        "sectors_per_cluster": sectors_per_cluster,
+        "reserved_sectors": reserved_sectors,
+        "num_fats": num_fats,
+        "total_sectors": total_sectors,
+        "sectors_per_fat": sectors_per_fat,
+        "root_cluster": root_cluster,
+        "first_data_sector": first_data_sector,
+        "cluster_count": cluster_count,
+        "cluster_size": bytes_per_sector * sectors_per_cluster,
+        "sectors_per_track": sectors_per_track,
+        "num_heads": num_heads,
+    }
+
+
+def open_fat32_volume(image_view, volume_offset=0):
+    """
+    Reads the boot sector of a FAT32 volume inside an image.
+
+    :param image_view: A memoryview over the image.
+    :param volume_offset: Byte offset of the volume (partition start LBA * sector size).
+    :return: See parse_fat32_boot_sector().
+    """
+    return parse_fat32_boot_sector(image_view[volume_offset:volume_offset + 512], volume_offset)
+
+
+def cluster_offset(volume, cluster_number):
+    """
+    Converts a cluster number to a byte offset inside the image.
+
+    :param volume: The volume returned by open_fat32_volume().
+    :param cluster_number: The cluster number (>= 2).
+    :return: The byte offset of the first byte of the cluster.
+    """
+    lba = cluster_to_lba(cluster_number, volume["first_data_sector"], volume["sectors_per_cluster"])
+    return volume["volume_offset"] + lba * volume["bytes_per_sector"]
+
+
+def iter_cluster_chain(image_view, volume, start_cluster, fat_table=None):
+    """
+    Follows a cluster chain through the first FAT, one cluster at a time.
+
+    :param image_view: A memoryview over the image.
+    :param volume: The volume returned by open_fat32_volume().
+    :param start_cluster: First cluster of the chain.
+    :param fat_table: Optional Fat32Table; its cached chains are used instead of reading the FAT.
+    :return: Yields the clusters of the chain; raises ValueError on the first cluster seen twice.
+    """
+    if fat_table is not None:
+        yield from fat_table.chain(start_cluster)
+        return
+
+    fat_offset = volume["volume_offset"] + volume["reserved_sectors"] * volume["bytes_per_sector"]
+    last_cluster = volume["cluster_count"] + 1
+    fat_size = (last_cluster + 1) * 4
+
+    # The FAT is sliced one aligned window at a time, so a split image only copies
+    # the windows the chain touches when they cross a segment boundary
+    window_start = window_end = 0
+    fat_window = None
+
+    cluster = start_cluster
+    visited = set()
+    # Free (0), bad (0x0FFFFFF7) and end-of-chain (>= 0x0FFFFFF8) values all fall outside this range
+    while 2 <= cluster <= last_cluster:
+        # A cluster reached twice means the chain loops; stop before yielding it again
+        if cluster in visited:
+            raise ValueError(f"Cluster chain starting at {start_cluster} loops")
+        visited.add(cluster)
+        yield cluster
+
+        entry_offset = cluster * 4
+        if not window_start <= entry_offset < window_end:
+            window_start = entry_offset - entry_offset % FAT_WINDOW_SIZE
+            window_end = min(window_start + FAT_WINDOW_SIZE, fat_size)
+            fat_window = image_view[fat_offset + window_start:fat_offset + window_end]
+        cluster = FAT_ENTRY_STRUCT.unpack_from(fat_window, entry_offset - window_start)[0] & FAT32_CLUSTER_MASK
+
+
+def format_short_name(entry_bytes):
+    """
+    Builds the displayed "NAME.EXT" form of an 8.3 short name.
+    """
+    name = str(entry_bytes[0:8], "ascii", errors="ignore").rstrip()
+    extension = str(entry_bytes[8:11], "ascii", errors="ignore").rstrip()
+
+    # 0x05 in the first byte stands for a real 0xE5 character, and a deleted
+    # entry has lost its first character, which is shown as "_"
+    if entry_bytes[0] == 0x05:
+        name = "\xe5" + name[1:]
+    elif entry_bytes[0] == DELETED_ENTRY:
+        name = "_" + str(entry_bytes[1:8], "ascii", errors="ignore").rstrip()
+
+    return f"{name}.{extension}" if extension else name
+
+
+def short_name_checksum(entry_bytes):
+    """
+    Computes the checksum of an 8.3 short name that every LFN entry of the same file stores at offset 0x0D.
+    """
+    checksum = 0
+    for byte in entry_bytes[0:11]:
+        checksum = (((checksum & 1) << 7) + (checksum >> 1) + byte) & 0xFF
+    return checksum
+
+
+class LongNameAssembler:
+    """
+    Single-pass state machine that rebuilds VFAT long file names.
+
+    LFN entries precede their short entry on disk in reverse order: the entry
+    flagged with 0x40 comes first and carries the highest sequence number, and
+    sequence 1 sits right before the short entry. Only the fragments of the
+    name being assembled are kept, so the state never grows with the size of
+    the directory.
+    """
+
+    __slots__ = ("_fragments", "_next_sequence", "_checksum")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._fragments = None
+        self._next_sequence = 0
+        self._checksum = None
+
+    def feed(self, entry_bytes):
+        """
+        Consumes one LFN entry (attribute 0x0F).
+        """
+        sequence = entry_bytes[0] & 0x1F
+        checksum = entry_bytes[13]
+
+        if entry_bytes[0] & LFN_LAST_ENTRY:
+            # Start of a new name; anything half-assembled before it was orphaned
+            if not 1 <= sequence <= LFN_MAX_ENTRIES:
+                self.reset()
+                return
+            self._fragments = [None] * sequence
+            self._checksum = checksum
+        elif sequence != self._next_sequence or checksum != self._checksum:
+            # Out-of-order or foreign fragment
+            self.reset()
+            return
+
+        # 13 UTF-16LE characters spread over offsets 0x01-0x0A, 0x0E-0x19 and 0x1C-0x1F
+        characters = bytes(entry_bytes[1:11]) + bytes(entry_bytes[14:26]) + bytes(entry_bytes[28:32])
+        self._fragments[sequence - 1] = characters
+        self._next_sequence = sequence - 1
+
+    def take(self, entry_bytes):
+        """
+        Returns the long name belonging to a short entry, or None if there is no
+        complete name or its checksum does not match. The state is reset either way.
+        """
+        long_name = None
+        if self._fragments is not None and self._next_sequence == 0 and short_name_checksum(entry_bytes) == self._checksum:
+            long_name = str(b"".join(self._fragments), "utf-16le", errors="replace")
+
+            # The name ends at a NUL character and is padded with 0xFFFF
+            long_name = long_name.split("\x00", 1)[0].rstrip("\uffff")
+        self.reset()
+        return long_name or None
+
+
+def decode_directory_cluster(cluster_view, long_names, include_deleted=False, parse_cache=None):
+    """
+    Decodes the entries of one directory cluster.
+
+    Shared by the memory-mapped walker below and the asyncio walker in
+    AsyncBlockReader, which fetch the clusters in different ways.
+
+    :param cluster_view: The bytes of the cluster (memoryview or bytes).
+    :param long_names: The LongNameAssembler of the directory; LFN fragments can span clusters.
+    :param include_deleted: Also return deleted (0xE5) entries.
+    :param parse_cache: Optional ParseCache used instead of parsing every entry.
+    :return: A tuple (entries, reached_end) where entries is a list of (name, Fat32DirectoryRecord)
+             tuples and reached_end tells whether the end-of-directory marker was found.
+    """
+    entries = []
+    records = iter_records(FAT_DIRENT_STRUCT, cluster_view)
+    for offset, fields in zip(range(0, len(cluster_view), DIRECTORY_ENTRY_SIZE), records):
+        short_name = fields[0]
+        first_byte = short_name[0]
+        is_long_name = fields[1] & ATTR_LONG_NAME == ATTR_LONG_NAME
+
+        if first_byte == END_OF_DIRECTORY:
+            return entries, True
+        if first_byte == DELETED_ENTRY:
+            # The sequence numbers of deleted LFN entries are overwritten, so their names are lost
+            long_names.reset()
+            if not include_deleted or is_long_name:
+                continue
+        elif is_long_name:
+            long_names.feed(cluster_view[offset:offset + DIRECTORY_ENTRY_SIZE])
+            continue
+
+        if parse_cache is not None:
+            entry = parse_cache.parse_fat32_directory_record(cluster_view[offset:offset + DIRECTORY_ENTRY_SIZE])
+        else:
+            entry = Fat32DirectoryRecord.from_fields(fields)
+        long_name = long_names.take(short_name)
+        if long_name is not None:
+            entry = entry._replace(long_name=long_name)
+        entries.append((long_name or format_short_name(short_name), entry))
+    return entries, False
+
+
+def iter_directory_entries(image_view, volume, start_cluster, fat_table=None, include_deleted=False, parse_cache=None):
+    """
+    Lazily yields the entries of one directory, cluster by cluster.
+
+    Long file name fragments are reassembled on the fly and attached to their
+    short entry as `long_name`; the yielded name is the long name when there
+    is one. Deleted entries are skipped unless `include_deleted` is set (recovery
+    mode; their `deleted` property is True). The walk stops at the end-of-directory marker.
+
+    :param image_view: A memoryview over the image.
+    :param volume: The volume returned by open_fat32_volume().
+    :param start_cluster: First cluster of the directory.
+    :param fat_table: Optional Fat32Table used to resolve the cluster chain.
+    :param include_deleted: Also yield deleted (0xE5) entries.
+    :param parse_cache: Optional ParseCache used instead of parsing every entry.
+    :return: Yields (name, Fat32DirectoryRecord) tuples.
+    """
+    cluster_size = volume["cluster_size"]
+    long_names = LongNameAssembler()
+
+    for cluster in iter_cluster_chain(image_view, volume, start_cluster, fat_table):
+        base = cluster_offset(volume, cluster)
+
+        # Each entry of the cluster is decoded once, straight from the image
+        entries, reached_end = decode_directory_cluster(image_view[base:base + cluster_size], long_names, include_deleted, parse_cache)
+        yield from entries
+        if reached_end:
+            return
+
+
+def walk_fat32_volume(image_view, volume, start_cluster=None, path="", fat_table=None, include_deleted=False, parse_cache=None,
+                      _ancestors=None):
+    """
+    Recursively walks a FAT32 directory tree as a generator.
+
+    Memory use only grows with the directory depth, never with the number of
+    files, and entries are yielded as soon as they are read.
+
+    :param image_view: A memoryview over the image.
+    :param volume: The volume returned by open_fat32_volume().
+    :param start_cluster: First cluster of the directory (default is the root directory).
+    :param path: Path of the directory, used as a prefix for the yielded paths.
+    :param fat_table: Optional Fat32Table used to resolve the cluster chains.
+    :param include_deleted: Also yield deleted (0xE5) entries; deleted directories are listed but
+                            not entered, since their cluster chain is gone.
+    :param parse_cache: Optional ParseCache used instead of parsing every entry.
+    :return: Yields (path, Fat32DirectoryRecord) tuples.
+    """
+    if start_cluster is None:
+        start_cluster = volume["root_cluster"]
+
+    # Directories that point back at one of their ancestors would recurse forever
+    ancestors = (_ancestors or set()) | {start_cluster}
+
+    for name, entry in iter_directory_entries(image_view, volume, start_cluster, fat_table, include_deleted, parse_cache):
+        # Skip the volume label and the "." and ".." links of subdirectories
+        if entry.attributes & ATTR_VOLUME_ID or name in (".", ".."):
+            continue
+
+        entry_path = f"{path}/{name}"
+        yield entry_path, entry
+
+        is_directory = entry.attributes & ATTR_DIRECTORY
+        if is_directory and not entry.deleted and entry.starting_cluster not in ancestors:
+            yield from walk_fat32_volume(image_view, volume, entry.starting_cluster, entry_path, fat_table, include_deleted,
+                                         parse_cache, ancestors)
+
+
+# Main function
+if __name__ == "__main__":
+    from DiskImageScanner import open_image
+
+    image_path = input("Enter the path to the raw disk image: ").strip()
+    start_lba_input = input("Enter the starting LBA of the FAT32 partition (default is 0): ").strip()
+    start_lba = int(start_lba_input) if start_lba_input.isdigit() else 0
+
+    with open_image(image_path) as image_view:
+        volume = open_fat32_volume(image_view, start_lba * 512)
+
+        # Entries are printed as they are found
+        for entry_path, entry in walk_fat32_volume(image_view, volume):
+            print(f"{entry_path}  (cluster {entry.starting_cluster}, {entry.file_size} bytes)")
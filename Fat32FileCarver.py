@@ -0,0 +1,211 @@
+import argparse
+import errno
+import os
+import sys
+
+from DiskImageScanner import open_image
+from Fat32DirectoryWalker import cluster_offset, open_fat32_volume, walk_fat32_volume
+from Fat32TableIndex import Fat32Table
+from SplitImage import SplitImage
+
+COPY_CHUNK_SIZE = 64 * 1024 * 1024  # Upper bound of bytes moved per system call
+UNSAFE_NAME_CHARACTERS = {code: "_" for code in (*range(0x20), 0x7F)}  # NUL and control characters, replaced in output names
+
+
+def file_byte_extents(fat_table, entry):
+    """
+    Finds the byte ranges of the image that hold a file's contents.
+
+    Allocated files follow their FAT chain. The FAT chain of a deleted file has
+    been cleared, so its contents are assumed to be contiguous from the starting
+    cluster (rebuilt from the high and low words) for `file_size` bytes.
+
+    :param fat_table: A Fat32Table of the volume.
+    :param entry: A Fat32DirectoryRecord yielded by walk_fat32_volume().
+    :return: A tuple (extents, clusters_free) where extents is a list of (byte offset, length)
+             pairs; clusters_free tells whether a deleted file's clusters are still unallocated
+             (None for allocated files).
+    """
+    volume = fat_table.volume
+    file_size = entry.file_size
+    start_cluster = entry.starting_cluster
+    if file_size == 0 or start_cluster < 2:
+        return [], None
+
+    if not entry.deleted:
+        return fat_table.byte_extents(start_cluster, file_size), None
+
+    cluster_count = (file_size + volume["cluster_size"] - 1) // volume["cluster_size"]
+    if start_cluster + cluster_count - 1 > fat_table.last_cluster:
+        return [], False
+
+    # Clusters that were reallocated since the deletion hold another file's data
+    clusters_free = fat_table.is_free(start_cluster, cluster_count)
+    return [(cluster_offset(volume, start_cluster), file_size)], clusters_free
+
+
+def copy_image_range(image_fd, output_fd, offset, length):
+    """
+    Copies a byte range of the image into an output file inside the kernel.
+
+    Uses copy_file_range(), then sendfile(), and falls back to pread()/write()
+    when neither is supported for the two files.
+    """
+    remaining = length
+    while remaining:
+        count = min(remaining, COPY_CHUNK_SIZE)
+        try:
+            copied = os.copy_file_range(image_fd, output_fd, count, offset)
+        except (AttributeError, OSError) as e:
+            if isinstance(e, OSError) and e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+            break
+        if copied == 0:
+            raise ValueError(f"Image ends before offset {offset + count}")
+        offset += copied
+        remaining -= copied
+    else:
+        return
+
+    while remaining:
+        count = min(remaining, COPY_CHUNK_SIZE)
+        try:
+            copied = os.sendfile(output_fd, image_fd, offset, count)
+        except (AttributeError, OSError) as e:
+            if isinstance(e, OSError) and e.errno not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                raise
+            break
+        if copied == 0:
+            raise ValueError(f"Image ends before offset {offset + count}")
+        offset += copied
+        remaining -= copied
+    else:
+        return
+
+    while remaining:
+        data = os.pread(image_fd, min(remaining, COPY_CHUNK_SIZE), offset)
+        if not data:
+            raise ValueError(f"Image ends before offset {offset}")
+        os.write(output_fd, data)
+        offset += len(data)
+        remaining -= len(data)
+
+
+def image_file_ranges(image_view, image_fd, offset, length):
+    """
+    Maps a byte range of the image to the files that hold it.
+
+    A split image is cut at its segment boundaries; any other image is one file.
+
+    :return: Yields (file descriptor, offset in that file, length) tuples.
+    """
+    if isinstance(image_view, SplitImage):
+        for index, local_offset, count in image_view.segment_ranges(offset, length):
+            yield image_view.segment_fd(index), local_offset, count
+    else:
+        yield image_fd, offset, length
+
+
+def output_path_for(output_dir, entry_path):
+    # Keep the directory structure, but never let a crafted name escape the output directory
+    # or carry a NUL byte (which os.open() rejects) or control characters into the file system
+    parts = [part.translate(UNSAFE_NAME_CHARACTERS) for part in entry_path.split("/")]
+    parts = [part for part in parts if part not in ("", ".", "..")]
+    output_path = os.path.join(output_dir, *parts)
+
+    # A deleted file can have the same name as a live one (or another deleted one)
+    candidate = output_path
+    suffix = 1
+    while os.path.exists(candidate):
+        candidate = f"{output_path}.{suffix}"
+        suffix += 1
+    return candidate
+
+
+def recover_files(image_path, output_dir, volume_offset=0, deleted_only=True):
+    """
+    Walks a FAT32 volume in recovery mode and carves file contents out of the image.
+
+    Each contiguous run of a file is copied with a single kernel-side copy, so
+    the work stays I/O-bound even for tens of thousands of files.
+
+    :param image_path: Path to the raw image.
+    :param output_dir: Directory that receives the carved files.
+    :param volume_offset: Byte offset of the FAT32 volume in the image.
+    :param deleted_only: Only carve deleted files (default); otherwise carve every file.
+    :return: Yields one result dictionary per file; a file that could not be carved has its
+             reason in "error" and the carve goes on with the next one.
+    """
+    image_fd = os.open(image_path, os.O_RDONLY)
+    try:
+        with open_image(image_path) as image_view:
+            volume = open_fat32_volume(image_view, volume_offset)
+            fat_table = Fat32Table(image_view, volume)
+            try:
+                for entry_path, entry in walk_fat32_volume(image_view, volume, fat_table=fat_table, include_deleted=True):
+                    if entry.is_directory or (deleted_only and not entry.deleted):
+                        continue
+
+                    result = {
+                        "path": entry_path,
+                        "output_path": None,
+                        "deleted": entry.deleted,
+                        "starting_cluster": entry.starting_cluster,
+                        "file_size": entry.file_size,
+                        "bytes_carved": 0,
+                        "runs": 0,
+                        "clusters_free": None,
+                        "error": None,
+                    }
+                    # One bad entry (a looping chain, an unwritable name) must not end the carve
+                    try:
+                        extents, clusters_free = file_byte_extents(fat_table, entry)
+                        result["output_path"] = output_path = output_path_for(output_dir, entry_path)
+                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+                        output_fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                        try:
+                            for offset, length in extents:
+                                for file_descriptor, file_offset, count in image_file_ranges(image_view, image_fd, offset, length):
+                                    copy_image_range(file_descriptor, output_fd, file_offset, count)
+                        finally:
+                            os.close(output_fd)
+
+                        result["bytes_carved"] = sum(length for _, length in extents)
+                        result["runs"] = len(extents)
+                        result["clusters_free"] = clusters_free
+                    except (OSError, ValueError) as e:
+                        result["error"] = str(e)
+                    yield result
+            finally:
+                fat_table.close()
+    finally:
+        os.close(image_fd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recover deleted files (or all files) from a FAT32 volume of a raw image.")
+    parser.add_argument("image", help="Path to the raw image")
+    parser.add_argument("output_dir", help="Directory that receives the carved files")
+    parser.add_argument("--start-lba", type=int, default=0, help="Starting LBA of the FAT32 partition (default is 0)")
+    parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    parser.add_argument("--all", action="store_true", help="Carve every file, not only the deleted ones")
+    args = parser.parse_args(argv)
+
+    count = 0
+    failed = 0
+    for result in recover_files(args.image, args.output_dir, args.start_lba * args.sector_size, not args.all):
+        if result["error"]:
+            failed += 1
+            print(f"{result['path']}: not carved ({result['error']})", file=sys.stderr)
+            continue
+        count += 1
+        status = "deleted" if result["deleted"] else "allocated"
+        if result["clusters_free"] is False:
+            status += ", clusters reallocated since deletion"
+        print(f"{result['path']} -> {result['output_path']} ({result['bytes_carved']} bytes, {result['runs']} run(s), {status})")
+    print(f"{count} file(s) carved, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from functools import lru_cache
+
+import numpy as np
+
+from Fat32DirectoryWalker import FAT32_CLUSTER_MASK, cluster_offset
+
+
+class Fat32Table:
+    """
+    Index over the first FAT of a FAT32 volume.
+
+    The FAT is viewed in place as a little-endian uint32 array, so the table is
+    never copied out of the image. Contiguous runs are precomputed once, and
+    resolved chains are kept in an LRU cache as lists of extents.
+    """
+
+    def __init__(self, image_view, volume, chain_cache_size=4096):
+        """
+        :param image_view: A memoryview over the image.
+        :param volume: The volume returned by open_fat32_volume().
+        :param chain_cache_size: Number of resolved chains to keep cached.
+        """
+        self.volume = volume
+        fat_offset = volume["volume_offset"] + volume["reserved_sectors"] * volume["bytes_per_sector"]
+        fat_entries = volume["sectors_per_fat"] * volume["bytes_per_sector"] // 4
+
+        # Entries past the last data cluster are padding and never part of a chain
+        num_entries = min(fat_entries, volume["cluster_count"] + 2)
+        self.fat = np.frombuffer(image_view[fat_offset:fat_offset + num_entries * 4], dtype="<u4", count=num_entries)
+        self.last_cluster = num_entries - 1
+
+        self._run_end = None
+        self._resolve_extents = lru_cache(maxsize=chain_cache_size)(self._walk_extents)
+
+    def next_cluster(self, cluster_number):
+        """
+        Returns the FAT value of a cluster (the next cluster, 0 if free, >= 0x0FFFFFF8 at the end of a chain).
+        """
+        return int(self.fat[cluster_number]) & FAT32_CLUSTER_MASK
+
+    @property
+    def run_end(self):
+        """
+        For every cluster, the last cluster of the contiguous run it belongs to.
+        """
+        if self._run_end is None:
+            clusters = np.arange(len(self.fat), dtype=np.uint32)
+            contiguous = (self.fat & FAT32_CLUSTER_MASK) == clusters + 1
+
+            # Each cluster takes the index of the first non-contiguous link at or after it
+            breaks = np.where(contiguous, np.uint32(self.last_cluster), clusters)
+            self._run_end = np.minimum.accumulate(breaks[::-1])[::-1]
+        return self._run_end
+
+    def _walk_extents(self, start_cluster):
+        run_end = self.run_end
+        extents = []
+
+        cluster = start_cluster
+        visited = set()
+        while 2 <= cluster <= self.last_cluster:
+            # A loop always comes back to the start of a run it already took
+            if cluster in visited:
+                raise ValueError(f"Cluster chain starting at {start_cluster} loops")
+            visited.add(cluster)
+
+            end = int(run_end[cluster])
+            extents.append((cluster, end - cluster + 1))
+            cluster = self.next_cluster(end)
+        return tuple(extents)
+
+    def extents(self, start_cluster):
+        """
+        Resolves a chain into contiguous runs.
+
+        :param start_cluster: First cluster of the chain.
+        :return: A tuple of (first cluster, cluster count) pairs.
+        """
+        return self._resolve_extents(start_cluster)
+
+    def chain(self, start_cluster):
+        """
+        Resolves a chain into the list of its clusters.
+
+        :param start_cluster: First cluster of the chain.
+        :return: The clusters of the chain, in order.
+        """
+        clusters = []
+        for first_cluster, cluster_count in self.extents(start_cluster):
+            clusters.extend(range(first_cluster, first_cluster + cluster_count))
+        return clusters
+
+    def byte_extents(self, start_cluster, file_size=None):
+        """
+        Resolves a chain into byte ranges of the image, one per contiguous run.
+
+        :param start_cluster: First cluster of the chain.
+        :param file_size: Optional file size; the ranges are trimmed to it.
+        :return: A list of (byte offset, length) pairs.
+        """
+        cluster_size = self.volume["cluster_size"]
+        remaining = file_size
+
+        ranges = []
+        for first_cluster, cluster_count in self.extents(start_cluster):
+            length = cluster_count * cluster_size
+            if remaining is not None:
+                length = min(length, remaining)
+                remaining -= length
+            ranges.append((cluster_offset(self.volume, first_cluster), length))
+            if remaining == 0:
+                break
+        return ranges
+
+    def is_free(self, start_cluster, cluster_count=1):
+        """
+        Checks whether a run of clusters is unallocated (used when recovering deleted files).
+        """
+        if start_cluster < 2 or start_cluster + cluster_count - 1 > self.last_cluster:
+            return False
+        run = self.fat[start_cluster:start_cluster + cluster_count] & FAT32_CLUSTER_MASK
+        return not run.any()
+
+    def cache_info(self):
+        """
+        Returns the hit/miss statistics of the chain cache.
+        """
+        return self._resolve_extents.cache_info()
+
+    def close(self):
+        """
+        Drops the arrays that reference the image so that it can be unmapped.
+        """
+        self._resolve_extents.cache_clear()
+        self.fat = None
+        self._run_end = None
+
+
+# Main function
+if __name__ == "__main__":
+    from DiskImageScanner import open_image
+    from Fat32DirectoryWalker import open_fat32_volume
+
+    image_path = input("Enter the path to the raw disk image: ").strip()
+    start_lba_input = input("Enter the starting LBA of the FAT32 partition (default is 0): ").strip()
+    start_lba = int(start_lba_input) if start_lba_input.isdigit() else 0
+    start_cluster = int(input("Enter the first cluster of the chain: ").strip())
+
+    with open_image(image_path) as image_view:
+        fat_table = Fat32Table(image_view, open_fat32_volume(image_view, start_lba * 512))
+
+        extents = fat_table.extents(start_cluster)
+        print(f"Cluster chain starting at {start_cluster} has {len(extents)} contiguous run(s):")
+        for first_cluster, cluster_count in extents:
+            print(f"  Clusters {first_cluster}-{first_cluster + cluster_count - 1} ({cluster_count} clusters)")
+
+        fat_table.close()
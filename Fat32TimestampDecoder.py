@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+FAT_EPOCH_YEAR = 1980
+SECONDS_PER_DAY = 86400
+
+# 65536-entry lookup tables, built on first use
+_date_table = None
+_time_table = None
+
+
+def decode_fat32_datetime(date_value, time_value=0, centiseconds=0):
+    """
+    Decodes a FAT32 date/time pair with bit shifts only.
+
+    :param date_value: The 16-bit date word.
+    :param time_value: The 16-bit time word (2-second resolution).
+    :param centiseconds: The creation time refinement byte (10 ms units, 0-199).
+    :return: A naive datetime (FAT stores local time), or None for an invalid date or time.
+    """
+    day = date_value & 0x1F  # Bits 0-4: Day of the month
+    month = (date_value >> 5) & 0x0F  # Bits 5-8: Month of the year
+    year = ((date_value >> 9) & 0x7F) + FAT_EPOCH_YEAR  # Bits 9-15: Year since 1980
+
+    seconds = (time_value & 0x1F) * 2  # Bits 0-4 (2-second count)
+    minutes = (time_value >> 5) & 0x3F  # Bits 5-10 (minutes)
+    hours = (time_value >> 11) & 0x1F  # Bits 11-15 (hours)
+
+    try:
+        timestamp = datetime(year, month, day, hours, minutes, seconds)
+    except ValueError:
+        return None
+    return timestamp + timedelta(milliseconds=centiseconds * 10)
+
+
+def fat32_date_table():
+    """
+    Returns the days since 1970-01-01 for every possible date word (-1 where the date is invalid).
+    """
+    global _date_table
+    if _date_table is None:
+        date_values = np.arange(65536, dtype=np.int64)
+        day = date_values & 0x1F
+        month = (date_values >> 5) & 0x0F
+        year = (date_values >> 9) + FAT_EPOCH_YEAR
+
+        # Build the first day of each month, then check that adding the day stays in that month
+        month_start = ((year - 1970) * 12 + (np.clip(month, 1, 12) - 1)).astype("datetime64[M]")
+        dates = month_start.astype("datetime64[D]") + (day - 1)
+        valid = (month >= 1) & (month <= 12) & (day >= 1) & (dates.astype("datetime64[M]") == month_start)
+
+        _date_table = np.where(valid, dates.astype(np.int64), -1)
+    return _date_table
+
+
+def fat32_time_table():
+    """
+    Returns the seconds since midnight for every possible time word (-1 where the time is invalid).
+    """
+    global _time_table
+    if _time_table is None:
+        time_values = np.arange(65536, dtype=np.int64)
+        seconds = (time_values & 0x1F) * 2
+        minutes = (time_values >> 5) & 0x3F
+        hours = time_values >> 11
+
+        valid = (hours < 24) & (minutes < 60) & (seconds < 60)
+        _time_table = np.where(valid, hours * 3600 + minutes * 60 + seconds, -1)
+    return _time_table
+
+
+def decode_fat32_timestamps(date_values, time_values=None, centiseconds=None):
+    """
+    Decodes arrays of FAT32 date/time words into epoch seconds in one pass.
+
+    :param date_values: Array of 16-bit date words.
+    :param time_values: Optional array of 16-bit time words (midnight if omitted, e.g. for last access dates).
+    :param centiseconds: Optional array of creation time refinement bytes (10 ms units).
+    :return: A tuple (epoch_seconds, valid) of an int64 array (-1 where invalid) and a boolean mask.
+    """
+    date_values = np.asarray(date_values, dtype=np.uint16)
+    days = fat32_date_table()[date_values]
+    valid = days >= 0
+
+    epoch_seconds = days * SECONDS_PER_DAY
+    if time_values is not None:
+        seconds = fat32_time_table()[np.asarray(time_values, dtype=np.uint16)]
+        valid &= seconds >= 0
+        epoch_seconds += seconds
+    if centiseconds is not None:
+        epoch_seconds += np.asarray(centiseconds, dtype=np.int64) // 100
+
+    return np.where(valid, epoch_seconds, -1), valid
+
+
+def epoch_to_datetimes(epoch_seconds, valid):
+    """
+    Converts the output of decode_fat32_timestamps() to a list of naive datetimes (None where invalid).
+    """
+    timestamps = np.where(valid, epoch_seconds, np.iinfo(np.int64).min).astype("datetime64[s]")
+    return timestamps.tolist()
+
+
+# Example usage
+if __name__ == "__main__":
+    date_input = input("Enter FAT32 date words in hex, comma separated (e.g. 5A21,4B3C): ")
+    time_input = input("Enter the matching time words in hex (leave empty for midnight): ").strip()
+
+    date_values = [int(value, 16) for value in date_input.split(",")]
+    time_values = [int(value, 16) for value in time_input.split(",")] if time_input else None
+
+    epoch_seconds, valid = decode_fat32_timestamps(date_values, time_values)
+    for date_value, timestamp in zip(date_values, epoch_to_datetimes(epoch_seconds, valid)):
+        print(f"0x{date_value:04x}: {timestamp if timestamp is not None else 'invalid'}")
@@ -0,0 +1,219 @@
+import argparse
+import importlib
+import os
+import sys
+
+# Subcommands served by the main() of another module: name -> (module, help).
+# A module is only imported when its subcommand runs, so NumPy, hashlib, sqlite3
+# and the process pools are never loaded for the conversions below.
+DELEGATED_COMMANDS = {
+    "triage": ("ImageTriage", "Parse the partition tables and FAT32 volumes of many images"),
+    "hash": ("ImageHasher", "Hash a whole image, or each of its partitions"),
+    "piecewise-hash": ("PiecewiseHasher", "Hash partitions block by block into a resumable manifest"),
+    "verify-gpt": ("GPTCrcVerifier", "Verify the CRC32s of the primary and backup GPT"),
+    "carve": ("Fat32FileCarver", "Recover deleted (or all) files from a FAT32 volume"),
+    "scan-signatures": ("SignatureScanner", "Scan an image for file signatures"),
+    "index": ("MetadataIndex", "Build or query the SQLite metadata index"),
+    "async-walk": ("AsyncBlockReader", "Walk FAT32 volumes with asynchronous, cached block reads"),
+    "profile": ("VolumeProfile", "Detect the sector size, FAT32 layout and geometry of images"),
+    "synth": ("SyntheticImageGenerator", "Generate a synthetic MBR/GPT image with a FAT32 volume"),
+    "bench": ("ParserBenchmark", "Run the parser benchmarks"),
+    "batch": ("BatchConverter", "Convert a stream of hex strings or sizes, one per line"),
+}
+
+
+def load_profile(args):
+    """
+    Returns the VolumeProfile of --image (from the --profiles store when it is up to date), or None.
+    """
+    if args.image is None:
+        return None
+    from VolumeProfile import get_volume_profile
+    return get_volume_profile(args.image, args.profiles, args.start_lba)
+
+
+def require(parser, args, profile, *names):
+    # Without a profile, the layout has to be given on the command line
+    if profile is None and any(getattr(args, name) is None for name in names):
+        options = ", ".join("--" + name.replace("_", "-") for name in names)
+        parser.error(f"{options} or --image is required")
+
+
+def command_partitions(parser, args):
+    import json
+    from DiskImageScanner import scan_partition_table
+
+    print(json.dumps(scan_partition_table(args.image, args.sector_size), indent=2, default=str))
+
+
+def command_walk(parser, args):
+    from DiskImageScanner import open_image
+    from Fat32DirectoryWalker import open_fat32_volume, walk_fat32_volume
+
+    profile = load_profile(args) if args.start_lba is None else None
+    if profile is not None and not profile.has_fat32:
+        parser.error(f"No FAT32 volume found in {args.image}")
+    start_lba = profile.partition_start_lba if profile is not None else args.start_lba
+    sector_size = profile.sector_size if profile is not None else args.sector_size
+
+    with open_image(args.image) as image_view:
+        volume = open_fat32_volume(image_view, start_lba * sector_size)
+        for entry_path, entry in walk_fat32_volume(image_view, volume, include_deleted=args.deleted):
+            status = "deleted" if entry.deleted else "allocated"
+            print(f"{entry_path}\t{entry.starting_cluster}\t{entry.file_size}\t{status}")
+
+
+def command_cluster_to_lba(parser, args):
+    from ClusterToLBA import cluster_to_lba
+
+    profile = load_profile(args)
+    require(parser, args, profile, "first_data_sector", "sectors_per_cluster")
+    for cluster_number in args.clusters:
+        print(cluster_to_lba(cluster_number, args.first_data_sector, args.sectors_per_cluster, profile))
+
+
+def command_sector_to_cluster(parser, args):
+    from SectorToCluster import sector_to_cluster
+
+    profile = load_profile(args)
+    require(parser, args, profile, "first_data_sector", "sectors_per_cluster")
+    for sector_number in args.sectors:
+        print(sector_to_cluster(sector_number, args.first_data_sector, args.sectors_per_cluster, profile))
+
+
+def command_lba_to_cluster(parser, args):
+    from LbaToCluster import lba_to_cluster
+
+    profile = load_profile(args)
+    for lba in args.lbas:
+        print(lba_to_cluster(lba, args.sector_size, args.cluster_size, profile=profile))
+
+
+def command_chs_to_lba(parser, args):
+    from ChsToLBA import chs_to_lba
+
+    profile = load_profile(args)
+    for chs in args.chs:
+        try:
+            cylinder, head, sector = (int(part) for part in chs.split("/"))
+        except ValueError:
+            parser.error(f"Invalid CHS address: {chs} (expected C/H/S)")
+        print(chs_to_lba(cylinder, head, sector, args.hpc, args.spt, profile))
+
+
+def command_lba_to_offset(parser, args):
+    from SectorToByte import calculate_byte_offset
+
+    profile = load_profile(args)
+    sector_size = profile.sector_size if profile is not None else args.sector_size
+    for lba in args.lbas:
+        print(calculate_byte_offset(lba, sector_size))
+
+
+def command_size(parser, args):
+    from MemoryTypeConverter import convert_size_to_all
+
+    for unit, converted_value in convert_size_to_all(args.value, args.unit.upper()).items():
+        print(f"{converted_value:.2f} {unit}")
+
+
+def command_hex(parser, args):
+    from HexToWhatever import hex_to_decimal_and_binary
+
+    for hex_string in args.hex_strings:
+        decimal_value, binary_value = hex_to_decimal_and_binary(hex_string)
+        print(f"{decimal_value}\t{binary_value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ForensicCli.py", description="Disk image forensics tools.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    # Shown in the help only; the arguments are parsed by the module's own main()
+    for name, (_, help_text) in DELEGATED_COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+
+    # --image takes the layout from a detected (or stored) VolumeProfile
+    profile_options = argparse.ArgumentParser(add_help=False)
+    profile_options.add_argument("--image", help="Detect the layout from this image instead of passing it")
+    profile_options.add_argument("--profiles", metavar="PATH", help="JSON profile store reused between runs")
+    profile_options.add_argument("--start-lba", type=int, help="Starting LBA of the FAT32 partition (default is the first one found)")
+
+    command = subparsers.add_parser("partitions", help="Print the MBR/EBR/GPT layout of an image as JSON")
+    command.add_argument("image", help="Path to the raw image")
+    command.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    command.set_defaults(handler=command_partitions)
+
+    command = subparsers.add_parser("walk", help="List the files of a FAT32 volume")
+    command.add_argument("image", help="Path to the raw image")
+    command.add_argument("--start-lba", type=int, help="Starting LBA of the FAT32 partition (default is detected)")
+    command.add_argument("--sector-size", type=int, default=512, help="Bytes per sector with --start-lba (default is 512)")
+    command.add_argument("--profiles", metavar="PATH", help="JSON profile store reused between runs")
+    command.add_argument("--deleted", action="store_true", help="Also list deleted entries")
+    command.set_defaults(handler=command_walk)
+
+    command = subparsers.add_parser("cluster-to-lba", parents=[profile_options], help="Convert cluster numbers to LBAs")
+    command.add_argument("clusters", type=int, nargs="+", metavar="CLUSTER")
+    command.add_argument("--first-data-sector", type=int, help="First sector of the data region")
+    command.add_argument("--sectors-per-cluster", type=int, help="Sectors per cluster")
+    command.set_defaults(handler=command_cluster_to_lba)
+
+    command = subparsers.add_parser("sector-to-cluster", parents=[profile_options], help="Convert sector numbers to cluster numbers")
+    command.add_argument("sectors", type=int, nargs="+", metavar="SECTOR")
+    command.add_argument("--first-data-sector", type=int, help="First sector of the data region")
+    command.add_argument("--sectors-per-cluster", type=int, help="Sectors per cluster")
+    command.set_defaults(handler=command_sector_to_cluster)
+
+    command = subparsers.add_parser("lba-to-cluster", parents=[profile_options], help="Convert data region LBAs (disk LBAs with --image) to cluster numbers")
+    command.add_argument("lbas", type=int, nargs="+", metavar="LBA")
+    command.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    command.add_argument("--cluster-size", type=int, default=4096, help="Bytes per cluster (default is 4096)")
+    command.set_defaults(handler=command_lba_to_cluster)
+
+    command = subparsers.add_parser("chs-to-lba", parents=[profile_options], help="Convert C/H/S addresses to LBAs")
+    command.add_argument("chs", nargs="+", metavar="C/H/S")
+    command.add_argument("--hpc", type=int, default=255, help="Heads per cylinder (default is 255)")
+    command.add_argument("--spt", type=int, default=63, help="Sectors per track (default is 63)")
+    command.set_defaults(handler=command_chs_to_lba)
+
+    command = subparsers.add_parser("lba-to-offset", parents=[profile_options], help="Convert LBAs to byte offsets")
+    command.add_argument("lbas", type=int, nargs="+", metavar="LBA")
+    command.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    command.set_defaults(handler=command_lba_to_offset)
+
+    command = subparsers.add_parser("size", help="Convert a size to B, KB, MB, GB and TB")
+    command.add_argument("value", type=float)
+    command.add_argument("unit", help="B, KB, MB, GB or TB")
+    command.set_defaults(handler=command_size)
+
+    command = subparsers.add_parser("hex", help="Read big-endian hex strings as little-endian decimal and binary")
+    command.add_argument("hex_strings", nargs="+", metavar="HEX")
+    command.set_defaults(handler=command_hex)
+
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Delegated subcommands skip building the parser below altogether
+    if argv and argv[0] in DELEGATED_COMMANDS:
+        module_name, _ = DELEGATED_COMMANDS[argv[0]]
+        return importlib.import_module(module_name).main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        args.handler(parser, args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # The reader of a pipeline (e.g. head) stopped early; silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
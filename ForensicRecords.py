@@ -0,0 +1,199 @@
+from collections import namedtuple
+
+from DiskStructures import FAT_DIRENT_STRUCT, GPT_ENTRY_STRUCT, GPT_HEADER_STRUCT, MBR_ENTRY_STRUCT, iter_records
+from GuidFormatter import format_guid, get_gpt_partition_type
+from MBRPartitionEntryParser import get_partition_type
+
+# Compact, immutable records for the on-disk structures. They keep the raw
+# integers and bytes exactly as found on disk; names, GUID strings and hex
+# renderings are only produced when a property is read or to_dict() is called.
+# Subclasses declare empty __slots__ so that no per-record __dict__ is created.
+
+
+class MbrPartitionRecord(namedtuple("MbrPartitionRecord", "boot_indicator starting_chs partition_type ending_chs starting_lba total_sectors")):
+    """
+    One 16-byte MBR (or EBR) partition table entry.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(cls, entry_bytes):
+        return cls._make(MBR_ENTRY_STRUCT.unpack_from(entry_bytes))
+
+    @property
+    def bootable(self):
+        return self.boot_indicator == 0x80
+
+    @property
+    def partition_type_name(self):
+        return get_partition_type(self.partition_type)
+
+    def to_dict(self):
+        """
+        Returns the same dictionary as parse_mbr_partition_entry().
+        """
+        return {
+            "boot_status": "Active (bootable)" if self.bootable else "Inactive (non-bootable)",
+            "starting_chs": self.starting_chs.hex(),
+            "partition_type": self.partition_type_name,
+            "ending_chs": self.ending_chs.hex(),
+            "starting_lba": self.starting_lba,
+            "total_sectors": self.total_sectors,
+        }
+
+
+class GptHeaderRecord(namedtuple("GptHeaderRecord", "signature revision header_size header_crc32 current_lba backup_lba first_usable_lba "
+                                                    "last_usable_lba disk_guid partition_entry_lba num_partition_entries "
+                                                    "partition_entry_size partition_array_crc32")):
+    """
+    The first 92 bytes of a GPT header.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(cls, header_bytes):
+        if len(header_bytes) < 92:
+            raise ValueError("GPT header must be at least 92 bytes long")
+        return cls._make(GPT_HEADER_STRUCT.unpack_from(header_bytes))
+
+    @property
+    def disk_guid_str(self):
+        return format_guid(self.disk_guid)
+
+    def to_dict(self):
+        """
+        Returns the same dictionary as parse_gpt_header().
+        """
+        return {
+            "Signature": str(self.signature, "ascii", errors="ignore").strip(),
+            "Revision": self.revision,
+            "Header Size": self.header_size,
+            "CRC32 Header": self.header_crc32,
+            "Current LBA": self.current_lba,
+            "Backup LBA": self.backup_lba,
+            "First Usable LBA": self.first_usable_lba,
+            "Last Usable LBA": self.last_usable_lba,
+            "Disk GUID": self.disk_guid_str,
+            "Partition Entry LBA": self.partition_entry_lba,
+            "Number of Partition Entries": self.num_partition_entries,
+            "Partition Entry Size": self.partition_entry_size,
+            "CRC32 Partition Array (Little-endian)": f"0x{self.partition_array_crc32:08x}",
+        }
+
+
+class GptPartitionRecord(namedtuple("GptPartitionRecord", "type_guid unique_guid starting_lba ending_lba attributes name_bytes")):
+    """
+    One GPT partition entry (the first 128 bytes).
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(cls, entry_bytes):
+        if len(entry_bytes) < 128:
+            raise ValueError("GPT Partition Entry must be at least 128 bytes long")
+        return cls._make(GPT_ENTRY_STRUCT.unpack_from(entry_bytes))
+
+    @property
+    def is_used(self):
+        return self.type_guid != bytes(16)
+
+    @property
+    def name(self):
+        return str(self.name_bytes, "utf-16le").split("\x00", 1)[0]
+
+    @property
+    def partition_type_name(self):
+        return get_gpt_partition_type(self.type_guid)
+
+    def size_bytes(self, sector_size=512):
+        return (self.ending_lba - self.starting_lba + 1) * sector_size
+
+    def to_dict(self, sector_size=512):
+        """
+        Returns the same dictionary as parse_gpt_partition_entry().
+        """
+        return {
+            "Partition Type GUID": format_guid(self.type_guid),
+            "Partition Type": self.partition_type_name,
+            "Unique Partition GUID": format_guid(self.unique_guid),
+            "Starting LBA": self.starting_lba,
+            "Ending LBA": self.ending_lba,
+            "Partition Size (bytes)": self.size_bytes(sector_size),
+            "Attribute Flags (Raw)": f"0x{self.attributes:016x}",
+            "GPT Attributes (Bits 0-2)": f"0x{self.attributes & 0x07:03x}",
+            "Reserved (Bits 3-47)": f"0x{(self.attributes >> 3) & 0xFFFFFFFFFFFF:012x}",
+            "Type-Specific Attributes (Bits 48-63)": f"0x{(self.attributes >> 48) & 0xFFFF:04x}",
+            "Partition Name": str(self.name_bytes, "utf-16le").rstrip("\x00"),
+        }
+
+
+class Fat32DirectoryRecord(namedtuple("Fat32DirectoryRecord", "name attributes creation_time creation_date access_date "
+                                                              "modification_time modification_date starting_cluster file_size "
+                                                              "long_name", defaults=(None,))):
+    """
+    One 32-byte FAT32 short directory entry, plus its reassembled long name.
+
+    `name` holds the raw 11 bytes of the 8.3 name, including the 0xE5 deletion marker.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_bytes(cls, entry_bytes):
+        return cls.from_fields(FAT_DIRENT_STRUCT.unpack_from(entry_bytes))
+
+    @classmethod
+    def from_fields(cls, fields):
+        (name, attributes, _, _, creation_time, creation_date, access_date, cluster_high, modification_time,
+         modification_date, cluster_low, file_size) = fields
+        return cls(name, attributes, creation_time, creation_date, access_date, modification_time, modification_date,
+                   (cluster_high << 16) | cluster_low, file_size)
+
+    @classmethod
+    def iter_from_buffer(cls, buffer, offset=0, count=None):
+        """
+        Decodes consecutive 32-byte entries (e.g. a whole directory cluster) with one iter_unpack() pass.
+        """
+        return map(cls.from_fields, iter_records(FAT_DIRENT_STRUCT, buffer, count, offset))
+
+    @property
+    def short_filename(self):
+        return str(self.name, "ascii", errors="ignore").strip()
+
+    @property
+    def deleted(self):
+        return self.name[0] == 0xE5
+
+    @property
+    def end_of_directory(self):
+        return self.name[0] == 0x00
+
+    @property
+    def is_directory(self):
+        return bool(self.attributes & 0x10)
+
+    @property
+    def is_volume_label(self):
+        return bool(self.attributes & 0x08)
+
+    def to_dict(self):
+        """
+        Returns the same dictionary as parse_fat32_directory_entry(), with "Long Filename" added.
+        """
+        return {
+            "Short Filename": self.short_filename,
+            "File Attributes": self.attributes,
+            "Creation Time": self.creation_time,
+            "Creation Date": self.creation_date,
+            "Access Date": self.access_date,
+            "Modification Time": self.modification_time,
+            "Modification Date": self.modification_date,
+            "Starting Cluster": self.starting_cluster,
+            "File Size": self.file_size,
+            "Deleted": self.deleted,
+            "End Of Directory": self.end_of_directory,
+            "Long Filename": self.long_name,
+        }
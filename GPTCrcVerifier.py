@@ -0,0 +1,155 @@
+import argparse
+import binascii
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from DiskImageScanner import GPT_SIGNATURE, open_image
+from DiskStructures import GPT_HEADER_STRUCT
+
+CRC_CHUNK_SIZE = 1024 * 1024  # Bytes fed to crc32() per call
+
+
+def crc32_chunked(buffer_view, running_crc=0, chunk_size=CRC_CHUNK_SIZE):
+    """
+    Computes a CRC32 incrementally over memoryview chunks, without copying the buffer.
+
+    :param buffer_view: A memoryview (e.g. a slice of an mmapped image).
+    :param running_crc: CRC32 of the preceding data, if any.
+    :param chunk_size: Number of bytes fed to crc32() per call.
+    :return: The CRC32 value.
+    """
+    for offset in range(0, len(buffer_view), chunk_size):
+        running_crc = binascii.crc32(buffer_view[offset:offset + chunk_size], running_crc)
+    return running_crc & 0xFFFFFFFF
+
+
+def verify_gpt_header_at(image_view, header_lba, sector_size=512):
+    """
+    Verifies the header CRC32 and the partition entry array CRC32 of one GPT copy.
+
+    :param image_view: A memoryview over the image.
+    :param header_lba: LBA of the GPT header (1 for the primary, usually the last LBA for the backup).
+    :param sector_size: Bytes per sector (512 or 4096).
+    :return: A dictionary of stored and calculated values, or None if there is no "EFI PART" signature.
+    """
+    header_offset = header_lba * sector_size
+    header_view = image_view[header_offset:header_offset + sector_size]
+    if len(header_view) < 92 or header_view[0:8] != GPT_SIGNATURE:
+        return None
+
+    # The CRC covers "Header Size" bytes; anything outside 92..sector size is corrupt
+    (_, _, header_size, stored_header_crc, _, backup_lba, _, _, _, entry_lba, num_entries, entry_size,
+     stored_array_crc) = GPT_HEADER_STRUCT.unpack_from(header_view)
+
+    calculated_header_crc = None
+    if 92 <= header_size <= sector_size:
+        # Feed 0x00 in place of the CRC32 field (0x10 to 0x13)
+        running_crc = binascii.crc32(header_view[0x00:0x10])
+        running_crc = binascii.crc32(b"\x00\x00\x00\x00", running_crc)
+        calculated_header_crc = crc32_chunked(header_view[0x14:header_size], running_crc)
+
+    # A hostile header can point the array past the end of the image
+    array_offset = entry_lba * sector_size
+    array_length = num_entries * entry_size
+    calculated_array_crc = None
+    if array_offset + array_length <= len(image_view):
+        calculated_array_crc = crc32_chunked(image_view[array_offset:array_offset + array_length])
+
+    return {
+        "Header LBA": header_lba,
+        "Backup LBA": backup_lba,
+        "Header CRC32 (Stored)": f"0x{stored_header_crc:08x}",
+        "Header CRC32 (Calculated)": None if calculated_header_crc is None else f"0x{calculated_header_crc:08x}",
+        "Header CRC32 Valid": calculated_header_crc == stored_header_crc,
+        "Partition Array CRC32 (Stored)": f"0x{stored_array_crc:08x}",
+        "Partition Array CRC32 (Calculated)": None if calculated_array_crc is None else f"0x{calculated_array_crc:08x}",
+        "Partition Array CRC32 Valid": calculated_array_crc == stored_array_crc,
+    }
+
+
+def verify_gpt(image_view, sector_size=512):
+    """
+    Verifies the primary GPT (LBA 1) and the backup GPT of an image.
+
+    The backup is looked up at the primary header's "Backup LBA", or at the
+    last LBA of the image when the primary header is missing.
+
+    :param image_view: A memoryview over the image.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :return: A dictionary with the "primary" and "backup" results (None when absent).
+    """
+    primary = verify_gpt_header_at(image_view, 1, sector_size)
+
+    last_lba = len(image_view) // sector_size - 1
+    backup_lba = primary["Backup LBA"] if primary is not None else last_lba
+    if backup_lba > last_lba:
+        backup_lba = last_lba
+    backup = verify_gpt_header_at(image_view, backup_lba, sector_size)
+
+    return {"primary": primary, "backup": backup}
+
+
+def verify_gpt_image(image_path, sector_size=512):
+    """
+    Opens an image and verifies both of its GPT copies.
+
+    :return: See verify_gpt(), plus the image path and an "error" field.
+    """
+    result = {"image": image_path, "error": None}
+    try:
+        with open_image(image_path) as image_view:
+            result.update(verify_gpt(image_view, sector_size))
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+    return result
+
+
+def verify_gpt_images(image_paths, sector_size=512, max_workers=None):
+    """
+    Verifies the GPT copies of many images concurrently.
+
+    :param image_paths: Paths of the images.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param max_workers: Number of worker threads.
+    :return: Yields one result per image, in completion order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(verify_gpt_image, image_path, sector_size) for image_path in image_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    from ImageTriage import expand_image_paths
+
+    parser = argparse.ArgumentParser(description="Verify the header and partition array CRC32 of the primary and backup GPT.")
+    parser.add_argument("images", nargs="+", help="Image paths or glob patterns")
+    parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker threads")
+    args = parser.parse_args(argv)
+
+    all_valid = True
+    for result in verify_gpt_images(expand_image_paths(args.images), args.sector_size, args.jobs):
+        print(f"\n{result['image']}:")
+        if result["error"]:
+            print(f"  Error: {result['error']}")
+            all_valid = False
+            continue
+
+        for copy in ("primary", "backup"):
+            verification = result[copy]
+            if verification is None:
+                print(f"  {copy.capitalize()} GPT: not found")
+                all_valid = False
+                continue
+
+            print(f"  {copy.capitalize()} GPT at LBA {verification['Header LBA']}:")
+            for key, value in verification.items():
+                print(f"    {key}: {value}")
+            all_valid &= verification["Header CRC32 Valid"] and verification["Partition Array CRC32 Valid"]
+
+    return 0 if all_valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import numpy as np
+
+from GuidFormatter import format_guid, format_guid_array, get_gpt_partition_type
+
+
+def gpt_entry_dtype(entry_size=128):
+    """
+    Builds the NumPy structured dtype of one GPT partition entry.
+
+    :param entry_size: Size of each entry from the GPT header (128 or larger).
+    :return: A dtype whose itemsize matches the on-disk entry size.
+    """
+    if entry_size < 128:
+        raise ValueError(f"Invalid GPT partition entry size: {entry_size}")
+
+    return np.dtype({
+        "names": ["type_guid", "unique_guid", "start_lba", "end_lba", "attributes", "name"],
+        "formats": [("u1", 16), ("u1", 16), "<u8", "<u8", "<u8", ("<u2", 36)],
+        "offsets": [0x00, 0x10, 0x20, 0x28, 0x30, 0x38],
+        "itemsize": entry_size,
+    })
+
+
+def decode_gpt_entry_array(array_bytes, num_entries, entry_size=128, sector_size=512):
+    """
+    Decodes a whole GPT partition entry array in one pass.
+
+    The array is viewed in place (no copy of the raw bytes), empty entries are
+    dropped with a single mask and the partition sizes are computed as one
+    array operation. Sizes follow parse_gpt_partition_entry() exactly: an ending
+    LBA before the starting LBA gives a negative size, and LBAs too large for
+    int64 arithmetic are sized with Python integers.
+
+    :param array_bytes: Buffer holding the entry array (bytes, mmap or memoryview).
+    :param num_entries: Number of entries declared in the GPT header.
+    :param entry_size: Size of each entry declared in the GPT header.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :return: A tuple (entries, indexes, sizes) of the used entries, their slot
+             numbers in the array and their sizes in bytes (int64, or object
+             when a size does not fit in int64).
+    """
+    dtype = gpt_entry_dtype(entry_size)
+
+    # Hostile headers can declare more entries than the buffer holds
+    num_entries = min(num_entries, len(array_bytes) // entry_size)
+    all_entries = np.frombuffer(array_bytes, dtype=dtype, count=num_entries)
+
+    # An all-zero partition type GUID marks an unused slot
+    used = all_entries["type_guid"].any(axis=1)
+    indexes = np.flatnonzero(used)
+    entries = all_entries[indexes]
+
+    # Below this bound (end - start + 1) * sector_size cannot overflow int64
+    start_lba = entries["start_lba"]
+    end_lba = entries["end_lba"]
+    lba_limit = np.uint64(2 ** 62 // sector_size)
+    exact = (start_lba < lba_limit) & (end_lba < lba_limit)
+
+    sizes = (np.where(exact, end_lba, 0).astype(np.int64) - np.where(exact, start_lba, 0).astype(np.int64) + 1) * sector_size
+    if not exact.all():
+        sizes = sizes.astype(object)
+        for row in np.flatnonzero(~exact):
+            sizes[row] = (int(end_lba[row]) - int(start_lba[row]) + 1) * sector_size
+
+    return entries, indexes, sizes
+
+
+def gpt_entry_to_dict(entry, size, type_guid_str=None, unique_guid_str=None):
+    """
+    Builds the same dictionary as parse_gpt_partition_entry() for one decoded entry.
+
+    :param entry: One record of the array returned by decode_gpt_entry_array().
+    :param size: The matching partition size in bytes.
+    :param type_guid_str: The partition type GUID, when already formatted (see format_guid_array()).
+    :param unique_guid_str: The unique partition GUID, when already formatted.
+    :return: A dictionary of formatted fields.
+    """
+    type_guid = entry["type_guid"].tobytes()
+    if type_guid_str is None:
+        type_guid_str = format_guid(type_guid)
+    if unique_guid_str is None:
+        unique_guid_str = format_guid(entry["unique_guid"].tobytes())
+
+    type_name = get_gpt_partition_type(type_guid)
+
+    attribute_flags = int(entry["attributes"])
+
+    # Breakdown attribute flags the same way as the single-entry parser
+    gpt_attributes = attribute_flags & 0x07  # Bits 0-2
+    reserved_bits = (attribute_flags >> 3) & 0xFFFFFFFFFFFF  # Bits 3-47 (should be zero)
+    type_specific = (attribute_flags >> 48) & 0xFFFF  # Bits 48-63
+
+    return {
+        "Partition Type GUID": type_guid_str,
+        "Partition Type": type_name,
+        "Unique Partition GUID": unique_guid_str,
+        "Starting LBA": int(entry["start_lba"]),
+        "Ending LBA": int(entry["end_lba"]),
+        "Partition Size (bytes)": int(size),
+        "Attribute Flags (Raw)": f"0x{attribute_flags:016x}",
+        "GPT Attributes (Bits 0-2)": f"0x{gpt_attributes:03x}",
+        "Reserved (Bits 3-47)": f"0x{reserved_bits:012x}",
+        "Type-Specific Attributes (Bits 48-63)": f"0x{type_specific:04x}",
+        "Partition Name": entry["name"].tobytes().decode("utf-16le").rstrip("\x00")
+    }
+
+
+def iter_gpt_entry_dicts(entries, sizes):
+    """
+    Lazily yields one dictionary per decoded entry.
+
+    The GUIDs of all entries are formatted up front in two vectorized calls.
+
+    :param entries: Entries returned by decode_gpt_entry_array().
+    :param sizes: Sizes returned by decode_gpt_entry_array().
+    """
+    type_guids = format_guid_array(entries["type_guid"])
+    unique_guids = format_guid_array(entries["unique_guid"])
+    for entry, size, type_guid_str, unique_guid_str in zip(entries, sizes, type_guids, unique_guids):
+        yield gpt_entry_to_dict(entry, size, type_guid_str, unique_guid_str)
+
+
+# Example usage:
+if __name__ == "__main__":
+    # Input: raw GPT partition entry array (any multiple of the entry size)
+    array_bytes = bytes.fromhex(input("Enter the GPT Partition Entry Array in hex format: ").strip())
+
+    entry_size_input = input("Enter the partition entry size (default is 128): ").strip()
+    entry_size = int(entry_size_input) if entry_size_input.isdigit() else 128
+
+    sector_size_input = input("Enter sector size in bytes (default is 512): ").strip()
+    sector_size = int(sector_size_input) if sector_size_input.isdigit() else 512
+
+    entries, indexes, sizes = decode_gpt_entry_array(array_bytes, len(array_bytes) // entry_size, entry_size, sector_size)
+
+    print(f"\n{len(entries)} used partition entries found")
+    for index, parsed_entry in zip(indexes, iter_gpt_entry_dicts(entries, sizes)):
+        print(f"\nPartition Entry {index}:")
+        for key, value in parsed_entry.items():
+            print(f"  {key}: {value}")
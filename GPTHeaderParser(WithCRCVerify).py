@@ -1,5 +1,7 @@
 import binascii
-import struct
+
+from DiskStructures import GPT_HEADER_STRUCT
+from GuidFormatter import format_guid
 
 # CRC32 Verification Function
 def calculate_gpt_crc32(header_bytes):
@@ -7,15 +9,16 @@ def calculate_gpt_crc32(header_bytes):
     if len(header_bytes) < 92:
         raise ValueError("GPT header must be at least 92 bytes long")
 
-    # Backup the current CRC32 value from offset 0x10 to 0x13
-    original_crc32 = header_bytes[0x10:0x14]
+    # Work on a view so that no part of the header is copied
+    header_view = memoryview(header_bytes)
 
-    # Replace the CRC32 field (0x10 to 0x13) with 0x00 for calculation
-    header_bytes_zeroed = bytearray(header_bytes)
-    header_bytes_zeroed[0x10:0x14] = b'\x00\x00\x00\x00'
+    # Backup the current CRC32 value from offset 0x10 to 0x13
+    original_crc32 = header_view[0x10:0x14]
 
-    # Calculate the CRC32 checksum on the modified header
-    calculated_crc32 = binascii.crc32(header_bytes_zeroed) & 0xFFFFFFFF
+    # Calculate the CRC32 checksum incrementally, feeding 0x00 in place of the CRC32 field (0x10 to 0x13)
+    calculated_crc32 = binascii.crc32(header_view[0x00:0x10])
+    calculated_crc32 = binascii.crc32(b'\x00\x00\x00\x00', calculated_crc32)
+    calculated_crc32 = binascii.crc32(header_view[0x14:], calculated_crc32) & 0xFFFFFFFF
 
     # Convert the original CRC32 (from the header) into a hex value
     original_crc32_value = int.from_bytes(original_crc32, byteorder='little')
@@ -29,46 +32,17 @@ def parse_gpt_header(header_bytes):
     if len(header_bytes) < 92:
         raise ValueError("GPT header must be at least 92 bytes long")
 
-    # 1. Signature (offset 0x00-0x07, 8 bytes)
-    signature = header_bytes[0x00:0x08].decode('ascii', errors='ignore').strip()
-
-    # 2. Revision (offset 0x08-0x0b, 4 bytes, little-endian)
-    revision = struct.unpack('<I', header_bytes[0x08:0x0c])[0]
-
-    # 3. Header size (offset 0x0c-0x0d, 2 bytes, little-endian)
-    header_size = struct.unpack('<H', header_bytes[0x0c:0x0e])[0]
-
-    # 4. CRC32 of the GPT header (offset 0x10-0x13, 4 bytes)
-    crc32_header = struct.unpack('<I', header_bytes[0x10:0x14])[0]
-
-    # 5. Current LBA (offset 0x18-0x1f, 8 bytes, little-endian)
-    current_lba = struct.unpack('<Q', header_bytes[0x18:0x20])[0]
-
-    # 6. Backup LBA (offset 0x20-0x27, 8 bytes, little-endian)
-    backup_lba = struct.unpack('<Q', header_bytes[0x20:0x28])[0]
+    # Decode all fields in one pass (see GPT_HEADER_STRUCT for the offsets):
+    # signature, revision, header size, header CRC32, current LBA, backup LBA, first and
+    # last usable LBA, disk GUID, partition entry LBA, number and size of the partition
+    # entries, and the CRC32 of the partition entry array
+    (signature_bytes, revision, header_size, crc32_header, current_lba, backup_lba, first_usable_lba, last_usable_lba,
+     disk_guid, partition_entry_lba, num_partition_entries, partition_entry_size,
+     crc32_partition_array) = GPT_HEADER_STRUCT.unpack_from(header_bytes)
 
-    # 7. First usable LBA (offset 0x28-0x2f, 8 bytes, little-endian)
-    first_usable_lba = struct.unpack('<Q', header_bytes[0x28:0x30])[0]
-
-    # 8. Last usable LBA (offset 0x30-0x37, 8 bytes, little-endian)
-    last_usable_lba = struct.unpack('<Q', header_bytes[0x30:0x38])[0]
-
-    # 9. Disk GUID (offset 0x38-0x47, 16 bytes, little-endian)
-    disk_guid = header_bytes[0x38:0x48]
+    signature = str(signature_bytes, 'ascii', errors='ignore').strip()
     guid_str = format_guid(disk_guid)
 
-    # 10. Starting LBA of the partition entry array (offset 0x48-0x4f, 8 bytes, little-endian)
-    partition_entry_lba = struct.unpack('<Q', header_bytes[0x48:0x50])[0]
-
-    # 11. Number of partition entries (offset 0x50-0x53, 4 bytes, little-endian)
-    num_partition_entries = struct.unpack('<I', header_bytes[0x50:0x54])[0]
-
-    # 12. Size of each partition entry (offset 0x54-0x57, 4 bytes, little-endian)
-    partition_entry_size = struct.unpack('<I', header_bytes[0x54:0x58])[0]
-
-    # 13. CRC32 of the partition entry array (offset 0x58-0x5b, 4 bytes, little-endian)
-    crc32_partition_array = struct.unpack('<I', header_bytes[0x58:0x5c])[0]
-
     return {
         "Signature": signature,
         "Revision": revision,
@@ -85,18 +59,6 @@ def parse_gpt_header(header_bytes):
         "CRC32 Partition Array (Little-endian)": f"0x{crc32_partition_array:08x}"
     }
 
-def format_guid(guid_bytes):
-    # GPT GUID is stored in little-endian for some parts, so we need to convert the format
-    guid_parts = [
-        struct.unpack("<I", guid_bytes[0:4])[0],  # First part (4 bytes) is little-endian
-        struct.unpack("<H", guid_bytes[4:6])[0],  # Second part (2 bytes) is little-endian
-        struct.unpack("<H", guid_bytes[6:8])[0],  # Third part (2 bytes) is little-endian
-        binascii.hexlify(guid_bytes[8:10]).decode('ascii'),  # Fourth part (2 bytes) is big-endian
-        binascii.hexlify(guid_bytes[10:16]).decode('ascii')  # Fifth part (6 bytes) is big-endian
-    ]
-    # Format the GUID in the standard form
-    return f"{guid_parts[0]:08x}-{guid_parts[1]:04x}-{guid_parts[2]:04x}-{guid_parts[3]}-{guid_parts[4]}"
-
 # Main function to calculate CRC32 and parse GPT header
 if __name__ == "__main__":
     # Input: raw GPT header (you can replace this with your actual binary input)
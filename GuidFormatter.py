@@ -0,0 +1,164 @@
+from functools import lru_cache
+
+from DiskStructures import GUID_STRUCT
+
+# Byte order that turns the on-disk (mixed-endian) GUID into the order it is written in
+GUID_DISPLAY_ORDER = (3, 2, 1, 0, 5, 4, 7, 6, 8, 9, 10, 11, 12, 13, 14, 15)
+
+# Columns of the 36-character string that hold hex digits (the others hold the dashes)
+_HEX_COLUMNS = tuple(column for column in range(36) if column not in (8, 13, 18, 23))
+
+# Well-known GPT partition type GUIDs
+_PARTITION_TYPE_NAMES = {
+    "00000000-0000-0000-0000-000000000000": "Unused entry",
+    "024dee41-33e7-11d3-9d69-0008c781f39f": "MBR partition scheme",
+    "c12a7328-f81f-11d2-ba4b-00a0c93ec93b": "EFI System",
+    "21686148-6449-6e6f-744e-656564454649": "BIOS boot",
+    "d3bfe2de-3daf-11df-ba40-e3a556d89593": "Intel Fast Flash",
+    "f4019732-066e-4e12-8273-346c5641494f": "Sony boot",
+    "bfbfafe7-a34f-448a-9a5b-6213eb736c22": "Lenovo boot",
+    "e3c9e316-0b5c-4db8-817d-f92df00215ae": "Microsoft Reserved",
+    "ebd0a0a2-b9e5-4433-87c0-68b6b72699c7": "Microsoft Basic Data",
+    "5808c8aa-7e8f-42e0-85d2-e1e90434cfb3": "Microsoft LDM metadata",
+    "af9b60a0-1431-4f62-bc68-3311714a69ad": "Microsoft LDM data",
+    "de94bba4-06d1-4d40-a16a-bfd50179d6ac": "Windows Recovery Environment",
+    "37affc90-ef7d-4e96-91c3-2d7ae055b174": "IBM GPFS",
+    "e75caf8f-f680-4cee-afa3-b001e56efc2d": "Storage Spaces",
+    "558d43c5-a1ac-43c0-aac8-d1472b2923d1": "Storage Replica",
+    "75894c1e-3aeb-11d3-b7c1-7b03a0000000": "HP-UX data",
+    "e2a1e728-32e3-11d6-a682-7b03a0000000": "HP-UX service",
+    "0fc63daf-8483-4772-8e79-3d69d8477de4": "Linux filesystem",
+    "a19d880f-05fc-4d3b-a006-743f0f84911e": "Linux RAID",
+    "44479540-f297-41b2-9af7-d131d5f0458a": "Linux root (x86)",
+    "4f68bce3-e8cd-4db1-96e7-fbcaf984b709": "Linux root (x86-64)",
+    "69dad710-2ce4-4e3c-b16c-21a1d49abed3": "Linux root (ARM)",
+    "b921b045-1df0-41c3-af44-4c6f280d3fae": "Linux root (ARM64)",
+    "bc13c2ff-59e6-4262-a352-b275fd6f7172": "Linux extended boot",
+    "0657fd6d-a4ab-43c4-84e5-0933c84b4f4f": "Linux swap",
+    "e6d6d379-f507-44c2-a23c-238f2a3df928": "Linux LVM",
+    "933ac7e1-2eb4-4f13-b844-0e14e2aef915": "Linux /home",
+    "3b8f8425-20e0-4f3b-907f-1a25a76f98e8": "Linux /srv",
+    "7ffec5c9-2d00-49b7-8941-3ea10a5586b7": "Linux dm-crypt",
+    "ca7d7ccb-63ed-4c53-861c-1742536059cc": "Linux LUKS",
+    "8da63339-0007-60c0-c436-083ac8230908": "Linux reserved",
+    "83bd6b9d-7f41-11dc-be0b-001560b84f0f": "FreeBSD boot",
+    "516e7cb4-6ecf-11d6-8ff8-00022d09712b": "FreeBSD data",
+    "516e7cb5-6ecf-11d6-8ff8-00022d09712b": "FreeBSD swap",
+    "516e7cb6-6ecf-11d6-8ff8-00022d09712b": "FreeBSD UFS",
+    "516e7cb8-6ecf-11d6-8ff8-00022d09712b": "FreeBSD Vinum",
+    "516e7cba-6ecf-11d6-8ff8-00022d09712b": "FreeBSD ZFS",
+    "824cc7a0-36a8-11e3-890a-952519ad3f61": "OpenBSD data",
+    "49f48d32-b10e-11dc-b99b-0019d1879648": "NetBSD swap",
+    "49f48d5a-b10e-11dc-b99b-0019d1879648": "NetBSD FFS",
+    "49f48d82-b10e-11dc-b99b-0019d1879648": "NetBSD LFS",
+    "49f48daa-b10e-11dc-b99b-0019d1879648": "NetBSD RAID",
+    "2db519c4-b10f-11dc-b99b-0019d1879648": "NetBSD concatenated",
+    "2db519ec-b10f-11dc-b99b-0019d1879648": "NetBSD encrypted",
+    "48465300-0000-11aa-aa11-00306543ecac": "Apple HFS/HFS+",
+    "7c3457ef-0000-11aa-aa11-00306543ecac": "Apple APFS",
+    "55465300-0000-11aa-aa11-00306543ecac": "Apple UFS",
+    "52414944-0000-11aa-aa11-00306543ecac": "Apple RAID",
+    "52414944-5f4f-11aa-aa11-00306543ecac": "Apple RAID offline",
+    "426f6f74-0000-11aa-aa11-00306543ecac": "Apple boot",
+    "4c616265-6c00-11aa-aa11-00306543ecac": "Apple label",
+    "5265636f-7665-11aa-aa11-00306543ecac": "Apple TV recovery",
+    "53746f72-6167-11aa-aa11-00306543ecac": "Apple Core Storage",
+    "6a82cb45-1dd2-11b2-99a6-080020736631": "Solaris boot",
+    "6a85cf4d-1dd2-11b2-99a6-080020736631": "Solaris root",
+    "6a87c46f-1dd2-11b2-99a6-080020736631": "Solaris swap",
+    "6a8b642b-1dd2-11b2-99a6-080020736631": "Solaris backup",
+    "6a898cc3-1dd2-11b2-99a6-080020736631": "Solaris /usr / Apple ZFS",
+    "6a8ef2e9-1dd2-11b2-99a6-080020736631": "Solaris /var",
+    "6a90ba39-1dd2-11b2-99a6-080020736631": "Solaris /home",
+    "fe3a2a5d-4f32-41a7-b725-accc3285a309": "ChromeOS kernel",
+    "3cb8e202-3b7e-47dd-8a3c-7ff2a13cfcec": "ChromeOS rootfs",
+    "2e0a753d-9e48-43b0-8337-b15192cb1b5e": "ChromeOS reserved",
+    "aa31e02a-400f-11db-9590-000c2911d1b8": "VMware VMFS",
+    "9198effc-31c0-11db-8f78-000c2911d1b8": "VMware reserved",
+    "9d275380-40ad-11db-bf97-000c2911d1b8": "VMware kcore crash",
+    "cef5a9ad-73bc-4601-89f3-cdeeeee321a1": "QNX6 Power-safe",
+    "c91818f9-8025-47af-89d2-f030d7000c2c": "Plan 9",
+    "42465331-3ba3-10f1-802a-4861696b7521": "Haiku BFS",
+}
+
+
+def parse_guid(guid_string):
+    """
+    Converts a GUID string back to its 16 on-disk bytes (the inverse of format_guid()).
+    """
+    guid_bytes = bytes.fromhex(guid_string.replace("-", ""))
+    return guid_bytes[3::-1] + guid_bytes[5:3:-1] + guid_bytes[7:5:-1] + guid_bytes[8:]
+
+
+# Keyed on the raw 16 on-disk bytes, so that a lookup never needs the formatted string
+GPT_PARTITION_TYPES = {parse_guid(guid): name for guid, name in _PARTITION_TYPE_NAMES.items()}
+
+
+def format_guid(guid_bytes):
+    """
+    Formats a 16-byte on-disk GUID (bytes or memoryview) in its standard string form.
+    """
+    # The first three groups are little-endian, the last two are stored as written
+    data1, data2, data3, data4, data5 = GUID_STRUCT.unpack_from(guid_bytes)
+    return f"{data1:08x}-{data2:04x}-{data3:04x}-{data4.hex()}-{data5.hex()}"
+
+
+def guid_to_uuid(guid_bytes):
+    """
+    Returns the on-disk GUID as a uuid.UUID.
+    """
+    import uuid
+    return uuid.UUID(bytes_le=bytes(guid_bytes))
+
+
+@lru_cache(maxsize=None)
+def _guid_tables():
+    # NumPy is only imported by the batch formatter, so that the parsers start fast
+    import numpy as np
+    return np, np.array(GUID_DISPLAY_ORDER), np.array(_HEX_COLUMNS), np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def format_guid_array(guids):
+    """
+    Formats many on-disk GUIDs at once.
+
+    The bytes of every GUID are put in display order with one NumPy gather and
+    turned into ASCII hex digits through a lookup table; the whole result is
+    decoded as one string and only cut into GUIDs at the end.
+
+    :param guids: An (n, 16) uint8 array, or any buffer of n * 16 bytes.
+    :return: A list of n GUID strings.
+    """
+    np, display_order, hex_columns, hex_digits = _guid_tables()
+
+    guid_array = np.frombuffer(guids, dtype=np.uint8) if not isinstance(guids, np.ndarray) else guids
+    guid_array = guid_array.reshape(-1, 16)
+
+    ordered = guid_array[:, display_order]
+
+    characters = np.full((len(ordered), 36), ord("-"), dtype=np.uint8)
+    characters[:, hex_columns[0::2]] = hex_digits[ordered >> 4]
+    characters[:, hex_columns[1::2]] = hex_digits[ordered & 0x0F]
+
+    text = characters.tobytes().decode("ascii")
+    return [text[offset:offset + 36] for offset in range(0, len(text), 36)]
+
+
+def get_gpt_partition_type(guid_bytes):
+    """
+    Resolves a raw partition type GUID to a name, like get_partition_type() does for MBR type codes.
+
+    :param guid_bytes: The 16 on-disk bytes (bytes or memoryview).
+    :return: The name, or "Unknown (<GUID>)".
+    """
+    name = GPT_PARTITION_TYPES.get(bytes(guid_bytes))
+    if name is None:
+        return f"Unknown ({format_guid(guid_bytes)})"
+    return name
+
+
+# Example usage
+if __name__ == "__main__":
+    guid_input = bytes.fromhex(input("Enter a 16-byte GUID in on-disk (hex) format: ").strip())
+    print(f"GUID: {format_guid(guid_input)}")
+    print(f"Partition type: {get_gpt_partition_type(guid_input)}")
@@ -14,11 +14,11 @@ def convert_bytes_to_decimal(byte_data):
     """
     Converts the first few bytes of the file to a decimal number (which represents the LBA or sector count).
     """
-    # Convert the byte data to a hexadecimal string
-    hex_string = byte_data.hex()
+    if not byte_data:
+        raise ValueError("No bytes to convert.")
 
-    # Convert hex string to decimal
-    decimal_value = int(hex_string, 16)
+    # Read the bytes as one big-endian integer, without going through a hex string
+    decimal_value = int.from_bytes(byte_data, byteorder='big')
     return decimal_value
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from SplitImage import SplitImage, is_split_image
+
+DEFAULT_ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+HASH_CHUNK_SIZE = 8 * 1024 * 1024  # Bytes read per readinto() call
+
+
+def hash_image(image_path, offset=0, length=None, algorithms=DEFAULT_ALGORITHMS, chunk_size=HASH_CHUNK_SIZE, progress=None):
+    """
+    Hashes an image (or a byte range of it) with several algorithms in a single pass.
+
+    Each chunk is read once into one of two reusable buffers. While the next
+    chunk is being read into the other buffer, every digest is updated from the
+    current one on its own worker thread (hashlib releases the GIL on large
+    buffers), so reading and all the digests run side by side.
+
+    :param image_path: Path to the image (or block device), or to the first segment of a split image.
+    :param offset: Byte offset where hashing starts (e.g. a partition start).
+    :param length: Number of bytes to hash (default is up to the end of the image).
+    :param algorithms: hashlib algorithm names.
+    :param chunk_size: Bytes read per call.
+    :param progress: Optional callable(bytes_done, bytes_total) called after each chunk.
+    :return: A dictionary with one hex digest per algorithm, the byte count, the elapsed time and the throughput in MB/s.
+    :raises ValueError: If the image ends before `length` bytes could be read.
+    """
+    digests = {name: hashlib.new(name) for name in algorithms}
+    buffers = [bytearray(chunk_size), bytearray(chunk_size)]
+
+    start_time = time.perf_counter()
+    bytes_done = 0
+
+    # Split images are read with one scatter read per segment instead of a file position
+    split_image = SplitImage.from_first_segment(image_path) if is_split_image(image_path) else None
+
+    with split_image or open(image_path, "rb", buffering=0) as image_file, ThreadPoolExecutor(max_workers=len(digests)) as executor:
+        if length is None:
+            if split_image is not None:
+                image_size = len(split_image)
+            else:
+                image_size = os.fstat(image_file.fileno()).st_size
+                if image_size == 0:
+                    # Block devices report a size of 0; ask for their end instead
+                    image_size = os.lseek(image_file.fileno(), 0, os.SEEK_END)
+            length = max(image_size - offset, 0)
+        if split_image is None:
+            image_file.seek(offset)
+
+        pending = []
+        current = 0
+        while bytes_done < length:
+            chunk_view = memoryview(buffers[current])[:min(chunk_size, length - bytes_done)]
+            if split_image is not None:
+                bytes_read = split_image.readinto(offset + bytes_done, chunk_view)
+            else:
+                bytes_read = image_file.readinto(chunk_view)
+            if not bytes_read:
+                # A digest of part of the range would pass for the digest of all of it
+                raise ValueError(f"Short read: {image_path} ends after {offset + bytes_done} bytes, "
+                                 f"{length - bytes_done} bytes short of the requested range")
+            chunk_view = chunk_view[:bytes_read]
+
+            # The digests must see the chunks in order, so the previous chunk has to be finished first
+            wait(pending)
+            pending = [executor.submit(digest.update, chunk_view) for digest in digests.values()]
+
+            bytes_done += bytes_read
+            current ^= 1
+            if progress is not None:
+                progress(bytes_done, length)
+
+        wait(pending)
+        for future in pending:
+            future.result()
+
+    elapsed = time.perf_counter() - start_time
+    result = {name: digest.hexdigest() for name, digest in digests.items()}
+    result["bytes_hashed"] = bytes_done
+    result["elapsed_seconds"] = elapsed
+    result["mb_per_second"] = bytes_done / (1024 * 1024) / elapsed if elapsed else 0.0
+    return result
+
+
+def partition_byte_ranges(layout):
+    """
+    Lists the byte range of every partition found by the MBR/GPT parsers.
+
+    Protective (0xEE) and extended container entries are skipped.
+
+    :param layout: The layout returned by parse_partition_layout().
+    :return: A list of (label, byte offset, byte length) tuples.
+    """
+    sector_size = layout["sector_size"]
+
+    ranges = []
+    for entry in layout["mbr_partitions"]:
+        if entry["partition_type_code"] in (0x05, 0x0F, 0x85, 0xEE):
+            continue
+        ranges.append((f"MBR partition {entry['index']}", entry["starting_lba"] * sector_size, entry["total_sectors"] * sector_size))
+    for entry in layout["logical_partitions"]:
+        ranges.append((f"Logical partition at LBA {entry['starting_lba']}", entry["starting_lba"] * sector_size, entry["total_sectors"] * sector_size))
+    for entry in layout["gpt_partitions"]:
+        ranges.append((f"GPT partition {entry['Index']}", entry["Starting LBA"] * sector_size, entry["Partition Size (bytes)"]))
+    return ranges
+
+
+def hash_partitions(image_path, sector_size=512, algorithms=DEFAULT_ALGORITHMS, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Hashes every partition of an image separately.
+
+    :return: A list of (label, byte offset, byte length, result) tuples, see hash_image() for the result.
+    """
+    from DiskImageScanner import scan_partition_table
+
+    results = []
+    for label, offset, length in partition_byte_ranges(scan_partition_table(image_path, sector_size)):
+        results.append((label, offset, length, hash_image(image_path, offset, length, algorithms, chunk_size)))
+    return results
+
+
+def print_hash_result(result, algorithms):
+    for name in algorithms:
+        print(f"  {name.upper()}: {result[name]}")
+    print(f"  {result['bytes_hashed']} bytes in {result['elapsed_seconds']:.2f}s ({result['mb_per_second']:.1f} MB/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash a whole image, or each of its partitions, with several algorithms in one pass.")
+    parser.add_argument("image", help="Path to the raw image")
+    parser.add_argument("-a", "--algorithms", default=",".join(DEFAULT_ALGORITHMS), help="Comma separated hashlib algorithms (default is md5,sha1,sha256,sha512)")
+    parser.add_argument("--partitions", action="store_true", help="Hash each partition instead of the whole image")
+    parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    parser.add_argument("--chunk-size", type=int, default=HASH_CHUNK_SIZE, help="Bytes read per call (default is 8 MiB)")
+    args = parser.parse_args(argv)
+
+    algorithms = [name.strip().lower() for name in args.algorithms.split(",")]
+
+    if args.partitions:
+        try:
+            for label, offset, length, result in hash_partitions(args.image, args.sector_size, algorithms, args.chunk_size):
+                print(f"\n{label} (offset {offset}, {length} bytes):")
+                print_hash_result(result, algorithms)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    else:
+        def report_progress(bytes_done, bytes_total):
+            print(f"\r{bytes_done * 100 // max(bytes_total, 1)}% hashed", end="", file=sys.stderr)
+
+        result = hash_image(args.image, algorithms=algorithms, chunk_size=args.chunk_size, progress=report_progress)
+        print(file=sys.stderr)
+        print(f"{args.image}:")
+        print_hash_result(result, algorithms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from DiskImageScanner import open_image, parse_partition_layout
+from Fat32DirectoryWalker import FAT32_FILESYSTEM_TYPE, open_fat32_volume, walk_fat32_volume
+
+# One parse cache per worker process, so that its in-memory LRU carries over from image to image
+_worker_parse_cache = None
+
+
+def get_worker_parse_cache(parse_cache_path):
+    global _worker_parse_cache
+    if _worker_parse_cache is None:
+        from ParseCache import ParseCache
+        _worker_parse_cache = ParseCache(disk_path=parse_cache_path)
+    return _worker_parse_cache
+
+
+def find_fat32_volumes(image_view, layout):
+    """
+    Returns the starting LBA of every partition that holds a FAT32 boot sector.
+
+    :param image_view: A memoryview over the image.
+    :param layout: The layout returned by parse_partition_layout().
+    """
+    sector_size = layout["sector_size"]
+    start_lbas = [entry["Starting LBA"] for entry in layout["gpt_partitions"]]
+    if not layout["is_protective_mbr"]:
+        start_lbas += [entry["starting_lba"] for entry in layout["mbr_partitions"]]
+        start_lbas += [entry["starting_lba"] for entry in layout["logical_partitions"]]
+
+    volumes = []
+    for start_lba in start_lbas:
+        offset = start_lba * sector_size
+        if image_view[offset + 0x52:offset + 0x5A] == FAT32_FILESYSTEM_TYPE:
+            volumes.append(start_lba)
+    return volumes
+
+
+def triage_image(image_path, sector_size=512, list_files=True, parse_cache_path=None):
+    """
+    Parses the partition table and every FAT32 volume of one image.
+
+    Never raises: a failure is reported in the "error" field so that one bad
+    image does not stop a batch.
+
+    :param image_path: Path to the raw image file.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param list_files: Include every file of the FAT32 volumes, not only the counts.
+    :param parse_cache_path: Optional SQLite store of a ParseCache shared between runs.
+    :return: A JSON-serializable dictionary.
+    """
+    start_time = time.perf_counter()
+    result = {"image": image_path, "error": None}
+
+    try:
+        # A locked or corrupt cache store fails this image like any other error, not the batch
+        parse_cache = get_worker_parse_cache(parse_cache_path) if parse_cache_path else None
+
+        with open_image(image_path) as image_view:
+            layout = parse_partition_layout(image_view, sector_size, parse_cache)
+            result["image_size"] = layout["image_size"]
+            result["partition_layout"] = layout
+
+            result["fat32_volumes"] = []
+            for start_lba in find_fat32_volumes(image_view, layout):
+                volume = open_fat32_volume(image_view, start_lba * sector_size)
+
+                file_count = 0
+                files = []
+                for entry_path, entry in walk_fat32_volume(image_view, volume, parse_cache=parse_cache):
+                    file_count += 1
+                    if list_files:
+                        files.append({
+                            "path": entry_path,
+                            "attributes": entry.attributes,
+                            "starting_cluster": entry.starting_cluster,
+                            "file_size": entry.file_size,
+                        })
+
+                result["fat32_volumes"].append({
+                    "starting_lba": start_lba,
+                    "volume": volume,
+                    "file_count": file_count,
+                    "files": files if list_files else None,
+                })
+
+        if parse_cache is not None:
+            # Commit what this image added, so that other workers and later runs can use it
+            parse_cache.flush()
+            result["parse_cache"] = parse_cache.stats()
+    except (OSError, ValueError, struct.error, IndexError, sqlite3.Error) as e:
+        # Truncated or corrupt structures are reported like unreadable images, not raised
+        result["error"] = str(e)
+
+    result["elapsed_seconds"] = round(time.perf_counter() - start_time, 6)
+    return result
+
+
+def expand_image_paths(patterns):
+    """
+    Expands glob patterns (e.g. "case42/*.dd") into a sorted list of image paths.
+    """
+    image_paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        image_paths.extend(matches if matches else [pattern])
+    return image_paths
+
+
+def triage_images(image_paths, output_file, jobs=None, sector_size=512, list_files=True, parse_cache_path=None):
+    """
+    Triages images in parallel, one image per worker process, and streams the
+    results to a JSON Lines file in completion order.
+
+    :param image_paths: Paths of the images to process.
+    :param output_file: A text file opened for writing.
+    :param jobs: Number of worker processes (default is the number of CPUs).
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param list_files: Include every file of the FAT32 volumes, not only the counts.
+    :param parse_cache_path: Optional SQLite store of a ParseCache shared between runs.
+    :return: The number of images that failed.
+    """
+    total = len(image_paths)
+    failed = 0
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(triage_image, image_path, sector_size, list_files, parse_cache_path) for image_path in image_paths]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            output_file.write(json.dumps(result) + "\n")
+            output_file.flush()
+
+            status = f"error: {result['error']}" if result["error"] else "ok"
+            if result["error"]:
+                failed += 1
+            print(f"[{done}/{total}] {result['image']} ({result['elapsed_seconds']:.2f}s, {status})", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start_time
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Processed {total} image(s) in {elapsed:.2f}s ({rate:.2f} images/s, {failed} failed)", file=sys.stderr)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Non-interactive MBR/GPT/FAT32 triage of many raw disk images.")
+    parser.add_argument("images", nargs="+", help="Image paths or glob patterns (e.g. 'case42/*.dd')")
+    parser.add_argument("-o", "--output", help="JSON Lines output file (default is stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Number of worker processes (default is the number of CPUs)")
+    parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    parser.add_argument("--no-files", action="store_true", help="Only count the files of each FAT32 volume")
+    parser.add_argument("--parse-cache", help="SQLite parse cache shared between runs (skips decoding structures seen before)")
+    args = parser.parse_args(argv)
+
+    image_paths = expand_image_paths(args.images)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            failed = triage_images(image_paths, output_file, args.jobs, args.sector_size, not args.no_files, args.parse_cache)
+    else:
+        failed = triage_images(image_paths, sys.stdout, args.jobs, args.sector_size, not args.no_files, args.parse_cache)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,12 @@
-def lba_to_cluster(lba, sector_size=512, cluster_size=4096, cluster_start=2):
+def lba_to_cluster(lba, sector_size=512, cluster_size=4096, cluster_start=2, profile=None):
+    # A VolumeProfile, when given, makes `lba` an absolute disk LBA, the inverse of cluster_to_lba(profile=...)
+    if profile is not None:
+        if not profile.has_fat32:
+            raise ValueError("The profile has no FAT32 volume, so it has no data region.")
+        if lba < profile.first_data_sector:
+            raise ValueError("LBA is before the data region (first data sector).")
+        return (lba - profile.first_data_sector) // profile.sectors_per_cluster + cluster_start
+
     # Calculate how many sectors are in each cluster
     sectors_per_cluster = cluster_size // sector_size
     
@@ -7,11 +15,12 @@ def lba_to_cluster(lba, sector_size=512, cluster_size=4096, cluster_start=2):
 
     return cluster_number
 
-# Accept user input for the LBA value
-lba_input = int(input("Enter the LBA value: "))  # This will prompt the user for the LBA value
+if __name__ == "__main__":
+    # Accept user input for the LBA value
+    lba_input = int(input("Enter the LBA value: "))  # This will prompt the user for the LBA value
 
-# Call the conversion function
-cluster_number = lba_to_cluster(lba_input)
+    # Call the conversion function
+    cluster_number = lba_to_cluster(lba_input)
 
-# Output the result
-print(f"The cluster number for LBA {lba_input} is: {cluster_number}")
+    # Output the result
+    print(f"The cluster number for LBA {lba_input} is: {cluster_number}")
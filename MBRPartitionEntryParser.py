@@ -1,26 +1,23 @@
-def parse_mbr_partition_entry(hex_string):
-    # Convert the hex string to bytes
-    partition_entry = bytes.fromhex(hex_string)
+from DiskStructures import MBR_ENTRY_STRUCT
 
-    # Byte 0: Boot indicator
-    boot_indicator = partition_entry[0]
-    boot_status = "Active (bootable)" if boot_indicator == 0x80 else "Inactive (non-bootable)"
+def parse_mbr_partition_entry(hex_string):
+    # Convert the hex string to bytes (raw bytes or a memoryview of an image are used as-is)
+    if isinstance(hex_string, str):
+        partition_entry = bytes.fromhex(hex_string)
+    else:
+        partition_entry = hex_string
 
-    # Byte 1-3: Starting CHS address (not commonly used anymore)
-    starting_chs = partition_entry[1:4].hex()
+    # Byte 0: boot indicator, bytes 1-3: starting CHS address, byte 4: partition type,
+    # bytes 5-7: ending CHS address, bytes 8-11: starting LBA, bytes 12-15: total sectors
+    (boot_indicator, starting_chs_bytes, partition_type_code, ending_chs_bytes, starting_lba,
+     total_sectors) = MBR_ENTRY_STRUCT.unpack_from(partition_entry)
 
-    # Byte 4: Partition type
-    partition_type_code = partition_entry[4]
+    boot_status = "Active (bootable)" if boot_indicator == 0x80 else "Inactive (non-bootable)"
     partition_type = get_partition_type(partition_type_code)
 
-    # Byte 5-7: Ending CHS address (not commonly used anymore)
-    ending_chs = partition_entry[5:8].hex()
-
-    # Byte 8-11: Starting LBA (little-endian, so reverse)
-    starting_lba = int.from_bytes(partition_entry[8:12], byteorder='little')
-
-    # Byte 12-15: Total sectors in partition (little-endian, so reverse)
-    total_sectors = int.from_bytes(partition_entry[12:16], byteorder='little')
+    # The CHS addresses are not commonly used anymore
+    starting_chs = starting_chs_bytes.hex()
+    ending_chs = ending_chs_bytes.hex()
 
     # Output the parsed information
     return {
@@ -134,10 +131,11 @@ def get_partition_type(partition_type_code):
     return partition_types.get(partition_type_code, f"Unknown (0x{partition_type_code:02x})")
 
 # Example usage
-print("First MBR Partition Entry is at offset 0x01be to 0x01cd")
-hex_input = input("Enter a 16-byte hex string (MBR partition entry): ")  # Example: "8000830008000000ee360800"
-parsed_entry = parse_mbr_partition_entry(hex_input)
+if __name__ == "__main__":
+    print("First MBR Partition Entry is at offset 0x01be to 0x01cd")
+    hex_input = input("Enter a 16-byte hex string (MBR partition entry): ")  # Example: "8000830008000000ee360800"
+    parsed_entry = parse_mbr_partition_entry(hex_input)
 
-# Display the parsed information
-for key, value in parsed_entry.items():
-    print(f"{key}: {value}")
+    # Display the parsed information
+    for key, value in parsed_entry.items():
+        print(f"{key}: {value}")
@@ -1,3 +1,12 @@
+SIZE_UNITS = {
+    'B': 1,
+    'KB': 1024,
+    'MB': 1024 ** 2,
+    'GB': 1024 ** 3,
+    'TB': 1024 ** 4,
+}
+
+
 def convert_size_to_all(value, from_unit):
     """
     Convert a given value in one unit to all other units of data: bytes (B), kilobytes (KB), megabytes (MB), gigabytes (GB), and terabytes (TB).
@@ -10,13 +19,7 @@ def convert_size_to_all(value, from_unit):
     - A dictionary containing the converted values for all units.
     """
     
-    units = {
-        'B': 1,
-        'KB': 1024,
-        'MB': 1024 ** 2,
-        'GB': 1024 ** 3,
-        'TB': 1024 ** 4,
-    }
+    units = SIZE_UNITS
     
     # Ensure the input unit is valid
     if from_unit not in units:
@@ -30,18 +33,19 @@ def convert_size_to_all(value, from_unit):
     
     return converted_values
 
-# Prompt user for input
-try:
-    input_value = float(input("Enter the value to convert: "))
-    from_unit = input("Enter the unit you are converting from (B, KB, MB, GB, TB): ").upper()
+if __name__ == "__main__":
+    # Prompt user for input
+    try:
+        input_value = float(input("Enter the value to convert: "))
+        from_unit = input("Enter the unit you are converting from (B, KB, MB, GB, TB): ").upper()
 
-    # Perform the conversion to all units
-    conversions = convert_size_to_all(input_value, from_unit)
+        # Perform the conversion to all units
+        conversions = convert_size_to_all(input_value, from_unit)
 
-    # Display the results
-    print(f"{input_value} {from_unit} is equivalent to:")
-    for unit, converted_value in conversions.items():
-        print(f"{converted_value:.2f} {unit}")
+        # Display the results
+        print(f"{input_value} {from_unit} is equivalent to:")
+        for unit, converted_value in conversions.items():
+            print(f"{converted_value:.2f} {unit}")
 
-except ValueError as e:
-    print(f"Error: {e}")
+    except ValueError as e:
+        print(f"Error: {e}")
@@ -0,0 +1,220 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import date
+
+from DiskImageScanner import open_image, parse_partition_layout
+from Fat32DirectoryWalker import open_fat32_volume, walk_fat32_volume
+from Fat32TimestampDecoder import decode_fat32_timestamps
+from ImageTriage import find_fat32_volumes
+
+INSERT_BATCH_SIZE = 50000  # Directory entries per executemany() call
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    image_hash TEXT PRIMARY KEY,
+    image_path TEXT NOT NULL,
+    image_size INTEGER NOT NULL,
+    indexed_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS partitions (
+    image_hash TEXT NOT NULL REFERENCES images (image_hash),
+    scheme TEXT NOT NULL,
+    partition_index INTEGER,
+    partition_type TEXT,
+    starting_lba INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS directory_entries (
+    image_hash TEXT NOT NULL REFERENCES images (image_hash),
+    volume_lba INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    short_name TEXT NOT NULL,
+    long_name TEXT,
+    attributes INTEGER NOT NULL,
+    is_directory INTEGER NOT NULL,
+    deleted INTEGER NOT NULL,
+    starting_cluster INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    created INTEGER,
+    modified INTEGER,
+    accessed INTEGER
+);
+CREATE INDEX IF NOT EXISTS directory_entries_modified ON directory_entries (image_hash, modified, file_size);
+CREATE INDEX IF NOT EXISTS directory_entries_size ON directory_entries (image_hash, file_size);
+CREATE INDEX IF NOT EXISTS directory_entries_path ON directory_entries (image_hash, path);
+"""
+
+
+def open_index(index_path):
+    """
+    Opens (or creates) the SQLite metadata index in WAL mode.
+    """
+    connection = sqlite3.connect(index_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(INDEX_SCHEMA)
+    return connection
+
+
+def _partition_rows(image_hash, layout):
+    sector_size = layout["sector_size"]
+
+    for entry in layout["mbr_partitions"]:
+        yield (image_hash, "mbr", entry["index"], entry["partition_type"], entry["starting_lba"], entry["total_sectors"] * sector_size, None)
+    for entry in layout["logical_partitions"]:
+        yield (image_hash, "logical", None, entry["partition_type"], entry["starting_lba"], entry["total_sectors"] * sector_size, None)
+    for entry in layout["gpt_partitions"]:
+        yield (image_hash, "gpt", entry["Index"], entry["Partition Type GUID"], entry["Starting LBA"], entry["Partition Size (bytes)"], entry["Partition Name"])
+
+
+def _insert_entry_batch(connection, image_hash, volume_lba, batch):
+    # Decode the timestamps of the whole batch at once
+    paths, entries = zip(*batch)
+    created, created_valid = decode_fat32_timestamps([entry.creation_date for entry in entries], [entry.creation_time for entry in entries])
+    modified, modified_valid = decode_fat32_timestamps([entry.modification_date for entry in entries], [entry.modification_time for entry in entries])
+    accessed, accessed_valid = decode_fat32_timestamps([entry.access_date for entry in entries])
+
+    rows = []
+    for index, (path, entry) in enumerate(batch):
+        rows.append((
+            image_hash, volume_lba, path, entry.short_filename, entry.long_name, entry.attributes,
+            entry.is_directory, entry.deleted, entry.starting_cluster, entry.file_size,
+            int(created[index]) if created_valid[index] else None,
+            int(modified[index]) if modified_valid[index] else None,
+            int(accessed[index]) if accessed_valid[index] else None,
+        ))
+    connection.executemany("INSERT INTO directory_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def index_image(index_path, image_path, image_hash=None, sector_size=512, reindex=False):
+    """
+    Parses an image once and stores every partition and FAT32 directory entry in the index.
+
+    Everything is written in a single transaction with large executemany()
+    batches. Later queries on the same evidence only read the index.
+
+    :param index_path: Path to the SQLite index.
+    :param image_path: Path to the raw image.
+    :param image_hash: Key of the image (default is its SHA-256, computed with ImageHasher).
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param reindex: Replace an existing index of the same image instead of keeping it.
+    :return: A tuple (image_hash, number of directory entries indexed); the count is None if the image was already indexed.
+    """
+    if image_hash is None:
+        from ImageHasher import hash_image
+        image_hash = hash_image(image_path, algorithms=("sha256",))["sha256"]
+
+    connection = open_index(index_path)
+    try:
+        already_indexed = connection.execute("SELECT 1 FROM images WHERE image_hash = ?", (image_hash,)).fetchone()
+        if already_indexed and not reindex:
+            return image_hash, None
+
+        entry_count = 0
+        with connection:
+            for table in ("directory_entries", "partitions", "images"):
+                connection.execute(f"DELETE FROM {table} WHERE image_hash = ?", (image_hash,))
+
+            with open_image(image_path) as image_view:
+                layout = parse_partition_layout(image_view, sector_size)
+                connection.execute("INSERT INTO images VALUES (?, ?, ?, ?)",
+                                   (image_hash, os.path.abspath(image_path), layout["image_size"], int(time.time())))
+                connection.executemany("INSERT INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?)", _partition_rows(image_hash, layout))
+
+                for volume_lba in find_fat32_volumes(image_view, layout):
+                    volume = open_fat32_volume(image_view, volume_lba * sector_size)
+
+                    batch = []
+                    for entry_path, entry in walk_fat32_volume(image_view, volume, include_deleted=True):
+                        batch.append((entry_path, entry))
+                        if len(batch) >= INSERT_BATCH_SIZE:
+                            _insert_entry_batch(connection, image_hash, volume_lba, batch)
+                            entry_count += len(batch)
+                            batch = []
+                    if batch:
+                        _insert_entry_batch(connection, image_hash, volume_lba, batch)
+                        entry_count += len(batch)
+        return image_hash, entry_count
+    finally:
+        connection.close()
+
+
+def find_files(connection, image_hash, modified_on=None, min_size=None, path_like=None, include_deleted=True):
+    """
+    Queries indexed directory entries without touching the image.
+
+    :param connection: Connection returned by open_index().
+    :param image_hash: Key of the image.
+    :param modified_on: Optional datetime.date; only entries last written on that day.
+    :param min_size: Optional minimum file size in bytes.
+    :param path_like: Optional SQL LIKE pattern on the path (e.g. "%.docx").
+    :param include_deleted: Also return deleted entries.
+    :return: A list of (path, file_size, modified, deleted) rows; modified is in epoch seconds.
+    """
+    query = "SELECT path, file_size, modified, deleted FROM directory_entries WHERE image_hash = ?"
+    parameters = [image_hash]
+
+    if modified_on is not None:
+        day_start = (modified_on - date(1970, 1, 1)).days * 86400
+        query += " AND modified >= ? AND modified < ?"
+        parameters += [day_start, day_start + 86400]
+    if min_size is not None:
+        query += " AND file_size > ?"
+        parameters.append(min_size)
+    if path_like is not None:
+        query += " AND path LIKE ?"
+        parameters.append(path_like)
+    if not include_deleted:
+        query += " AND deleted = 0"
+
+    return connection.execute(query + " ORDER BY path", parameters).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index parsed partition and FAT32 metadata in SQLite and query it.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Parse an image into the index")
+    index_parser.add_argument("index", help="Path to the SQLite index")
+    index_parser.add_argument("image", help="Path to the raw image")
+    index_parser.add_argument("--hash", dest="image_hash", help="Known image hash (skips hashing the image)")
+    index_parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    index_parser.add_argument("--reindex", action="store_true", help="Replace an existing index of the same image")
+
+    query_parser = subparsers.add_parser("query", help="Query the index")
+    query_parser.add_argument("index", help="Path to the SQLite index")
+    query_parser.add_argument("image_hash", help="Key of the image")
+    query_parser.add_argument("--modified-on", type=date.fromisoformat, help="Last written on this day (YYYY-MM-DD)")
+    query_parser.add_argument("--min-size", type=int, help="Larger than this many bytes")
+    query_parser.add_argument("--path-like", help="SQL LIKE pattern on the path")
+    query_parser.add_argument("--no-deleted", action="store_true", help="Leave out deleted entries")
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        image_hash, entry_count = index_image(args.index, args.image, args.image_hash, args.sector_size, args.reindex)
+        if entry_count is None:
+            print(f"{args.image} is already indexed as {image_hash}")
+        else:
+            print(f"Indexed {entry_count} directory entries of {args.image} as {image_hash}")
+        return
+
+    connection = open_index(args.index)
+    try:
+        start_time = time.perf_counter()
+        rows = find_files(connection, args.image_hash, args.modified_on, args.min_size, args.path_like, not args.no_deleted)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        connection.close()
+
+    for path, file_size, modified, deleted in rows:
+        modified_str = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(modified)) if modified is not None else "invalid"
+        print(f"{path}  {file_size} bytes  modified {modified_str}{'  (deleted)' if deleted else ''}")
+    print(f"{len(rows)} match(es) in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import hashlib
+import importlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from ForensicRecords import Fat32DirectoryRecord
+from GPTPartitionEntryParser import parse_gpt_partition_entry
+from MBRPartitionEntryParser import parse_mbr_partition_entry
+from WeirdFat32DirectoryEntryParser import parse_fat32_directory_entry
+
+# The header parser's file name is not a valid identifier, so it has to be loaded by name
+parse_gpt_header = importlib.import_module("GPTHeaderParser(WithCRCVerify)").parse_gpt_header
+
+DEFAULT_MEMORY_ENTRIES = 65536
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+DISK_COMMIT_INTERVAL = 1000  # New rows and last-used updates batched in memory before one short write transaction
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_cache (
+    key BLOB PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache (last_used);
+"""
+
+
+def _copy(value):
+    # Records are immutable and can be shared; dictionaries are copied
+    return dict(value) if isinstance(value, dict) else value
+
+
+def _encode_bytes(value):
+    # Raw byte fields of records are stored as hex
+    if isinstance(value, bytes):
+        return {"hex": value.hex()}
+    raise TypeError(f"Cannot store {type(value).__name__} in the parse cache")
+
+
+def _decode(parser, encoded):
+    value = json.loads(encoded)
+    record_type = getattr(parser, "__self__", None)
+    if isinstance(record_type, type) and issubclass(record_type, tuple):
+        # A record stored as a JSON array by its from_bytes() parser
+        return record_type._make(bytes.fromhex(field["hex"]) if isinstance(field, dict) else field for field in value)
+    return value
+
+
+class ParseCache:
+    """
+    Content-addressed cache in front of the on-disk structure parsers.
+
+    Results are keyed on a BLAKE2b hash of the raw bytes (plus the parser name
+    and its extra arguments), so the same boot sector, GPT header or directory
+    entry found in clones, snapshots or re-acquisitions is only decoded once.
+    An in-process LRU sits in front of an optional SQLite store that is shared
+    between runs and trimmed to a maximum size, least recently used first.
+    Results are stored as JSON, never pickled, since the store may be shared
+    between analysts.
+
+    Several processes can share one store: lookups only read, while new rows
+    and last-used times are batched in memory and written in one short
+    BEGIN IMMEDIATE transaction per batch, so a writer never holds the lock
+    for longer than that.
+    """
+
+    def __init__(self, max_memory_entries=DEFAULT_MEMORY_ENTRIES, disk_path=None, max_disk_bytes=DEFAULT_DISK_BYTES):
+        """
+        :param max_memory_entries: Size of the in-process LRU.
+        :param disk_path: Optional path of the SQLite store.
+        :param max_disk_bytes: Size the store is trimmed to.
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._disk = None
+        self._pending_rows = {}  # key -> (encoded value, size, last used) of rows not written yet
+        self._pending_touches = {}  # key -> last used time of stored rows that were hit
+        if disk_path is not None:
+            # Autocommit mode: transactions are only opened explicitly, around each batch
+            self._disk = sqlite3.connect(disk_path, timeout=30, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.executescript(DISK_SCHEMA)
+            self._refresh_disk_bytes()
+
+    def get_or_parse(self, parser, raw, *args):
+        """
+        Returns parser(raw, *args), from the cache when the same bytes were parsed before.
+
+        :param parser: One of the parse_* functions, or the from_bytes() of a ForensicRecords record.
+        :param raw: The raw bytes of the structure (bytes or memoryview).
+        :return: A fresh copy of the parsed dictionary, which the caller may modify, or the
+                 (immutable) record.
+        """
+        digest = hashlib.blake2b(raw, digest_size=16)
+        digest.update(f"{parser.__module__}.{parser.__qualname__}{args!r}".encode())
+        key = digest.digest()
+
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return _copy(value)
+
+        if self._disk is not None:
+            row = self._disk.execute("SELECT value FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._pending_touches[key] = time.time()
+                self._count_disk_write()
+                value = _decode(parser, row[0])
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, value)
+                return _copy(value)
+
+        self.misses += 1
+        value = parser(raw, *args)
+        self._remember(key, value)
+
+        if self._disk is not None:
+            encoded = json.dumps(value, default=_encode_bytes)
+            self._pending_rows[key] = (encoded, len(encoded), time.time())
+            self._count_disk_write()
+        return _copy(value)
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _count_disk_write(self):
+        if len(self._pending_rows) + len(self._pending_touches) >= DISK_COMMIT_INTERVAL:
+            self._write_pending()
+
+    @contextmanager
+    def _write_transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so that two processes never both
+        # start reading and then fail to upgrade; the lock is held for one batch only
+        self._disk.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._disk.execute("ROLLBACK")
+            raise
+        self._disk.execute("COMMIT")
+
+    def _write_pending(self):
+        if self._pending_rows or self._pending_touches:
+            with self._write_transaction():
+                for key, (encoded, size, last_used) in self._pending_rows.items():
+                    # Keys are content hashes, so a row another process wrote meanwhile already holds this value
+                    cursor = self._disk.execute("INSERT OR IGNORE INTO parse_cache VALUES (?, ?, ?, ?)", (key, encoded, size, last_used))
+                    if cursor.rowcount == 1:
+                        self._disk_bytes += size
+                self._disk.executemany("UPDATE parse_cache SET last_used = ? WHERE key = ?",
+                                       [(last_used, key) for key, last_used in self._pending_touches.items()])
+            self._pending_rows.clear()
+            self._pending_touches.clear()
+
+        if self._disk_bytes > self.max_disk_bytes:
+            # The running count misses rows written or evicted by other processes
+            self._refresh_disk_bytes()
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _refresh_disk_bytes(self):
+        self._disk_bytes = self._disk.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+
+    def _evict_disk(self):
+        # Trim to 90% of the limit so that eviction does not run on every write
+        target = self.max_disk_bytes * 9 // 10
+        while self._disk_bytes > target:
+            rows = self._disk.execute("SELECT key, size FROM parse_cache ORDER BY last_used LIMIT 1000").fetchall()
+            if not rows:
+                break
+
+            evicted = []
+            for key, size in rows:
+                evicted.append((key,))
+                self._disk_bytes -= size
+                if self._disk_bytes <= target:
+                    break
+            with self._write_transaction():
+                self._disk.executemany("DELETE FROM parse_cache WHERE key = ?", evicted)
+        self._refresh_disk_bytes()
+
+    def parse_gpt_header(self, header_bytes):
+        return self.get_or_parse(parse_gpt_header, header_bytes)
+
+    def parse_gpt_partition_entry(self, entry_bytes, sector_size=512):
+        return self.get_or_parse(parse_gpt_partition_entry, entry_bytes, sector_size)
+
+    def parse_mbr_partition_entry(self, partition_entry):
+        return self.get_or_parse(parse_mbr_partition_entry, partition_entry)
+
+    def parse_fat32_directory_entry(self, entry_bytes):
+        return self.get_or_parse(parse_fat32_directory_entry, entry_bytes)
+
+    def parse_fat32_directory_record(self, entry_bytes):
+        return self.get_or_parse(Fat32DirectoryRecord.from_bytes, entry_bytes)
+
+    def stats(self):
+        """
+        Returns the hit/miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes if self._disk is not None else None,
+        }
+
+    def flush(self):
+        """
+        Writes the batched rows and last-used times to the disk store and recounts its size,
+        which other processes may have changed.
+        """
+        if self._disk is not None:
+            self._write_pending()
+            self._refresh_disk_bytes()
+
+    def close(self):
+        """
+        Writes the batched rows and closes the disk store.
+        """
+        if self._disk is not None:
+            self._write_pending()
+            self._disk.close()
+            self._disk = None
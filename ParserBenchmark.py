@@ -0,0 +1,382 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from AddressConverter import convert_addresses
+from ClusterToLBA import cluster_to_lba
+from DiskImageScanner import open_image, parse_partition_layout
+from FAT32DirectoryStructureBreakdown import decode_fat32_date
+from ForensicRecords import Fat32DirectoryRecord
+from Fat32DirectoryWalker import open_fat32_volume, walk_fat32_volume
+from Fat32TableIndex import Fat32Table
+from Fat32TimestampDecoder import decode_fat32_timestamps
+from GPTEntryArrayDecoder import decode_gpt_entry_array
+from GPTPartitionEntryParser import parse_gpt_partition_entry
+from GuidFormatter import format_guid, format_guid_array, get_gpt_partition_type
+from MBRPartitionEntryParser import parse_mbr_partition_entry
+from SyntheticImageGenerator import PARTITION_START_LBA, build_image
+from WeirdFat32DirectoryEntryParser import parse_fat32_directory_entry
+
+parse_gpt_header = importlib.import_module("GPTHeaderParser(WithCRCVerify)").parse_gpt_header
+
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.10  # Slowdown (fraction of the baseline rate) reported as a regression
+SCALAR_ITERATIONS = 100000
+ARRAY_LENGTH = 1000000
+
+
+# Each benchmark takes the fixture images and returns a function to time. The
+# function returns (items processed, bytes processed) for one run.
+
+def bench_decode_fat32_date(images):
+    dates = [(index % 0x8000) | 0x21 for index in range(SCALAR_ITERATIONS)]
+
+    def run():
+        for date_value in dates:
+            decode_fat32_date(date_value)
+        return len(dates), len(dates) * 2
+    return run
+
+
+def bench_decode_fat32_timestamps(images):
+    rng = np.random.default_rng(0)
+    dates = rng.integers(0, 0x10000, ARRAY_LENGTH, dtype=np.uint16)
+    times = rng.integers(0, 0x10000, ARRAY_LENGTH, dtype=np.uint16)
+
+    def run():
+        decode_fat32_timestamps(dates, times)
+        return ARRAY_LENGTH, dates.nbytes + times.nbytes
+    return run
+
+
+def bench_format_guid(images):
+    guids = [os.urandom(16) for _ in range(SCALAR_ITERATIONS)]
+
+    def run():
+        for guid_bytes in guids:
+            format_guid(guid_bytes)
+        return len(guids), len(guids) * 16
+    return run
+
+
+def bench_format_guid_array(images):
+    guids = np.frombuffer(os.urandom(16 * SCALAR_ITERATIONS), dtype=np.uint8).reshape(-1, 16)
+
+    def run():
+        format_guid_array(guids)
+        return len(guids), guids.nbytes
+    return run
+
+
+def bench_get_gpt_partition_type(images):
+    array_bytes = _read_gpt_entry_array(images["gpt"])
+    type_guids = [array_bytes[offset:offset + 16] for offset in range(0, len(array_bytes), 128)]
+
+    def run():
+        for _ in range(10):
+            for type_guid in type_guids:
+                get_gpt_partition_type(type_guid)
+        return len(type_guids) * 10, len(type_guids) * 160
+    return run
+
+
+def bench_parse_gpt_header(images):
+    with open(images["gpt"], "rb") as image_file:
+        image_file.seek(512)
+        header_bytes = image_file.read(512)
+
+    def run():
+        for _ in range(SCALAR_ITERATIONS // 10):
+            parse_gpt_header(header_bytes)
+        return SCALAR_ITERATIONS // 10, SCALAR_ITERATIONS // 10 * 92
+    return run
+
+
+def _gpt_entry_count(image_path):
+    with open(image_path, "rb") as image_file:
+        image_file.seek(512 + 0x50)
+        return int.from_bytes(image_file.read(4), "little")
+
+
+def _read_gpt_entry_array(image_path):
+    with open(image_path, "rb") as image_file:
+        image_file.seek(1024)
+        return image_file.read(_gpt_entry_count(image_path) * 128)
+
+
+def bench_parse_gpt_partition_entry(images):
+    array_bytes = _read_gpt_entry_array(images["gpt"])
+    entries = [array_bytes[offset:offset + 128] for offset in range(0, len(array_bytes), 128)]
+
+    def run():
+        for entry_bytes in entries:
+            parse_gpt_partition_entry(entry_bytes)
+        return len(entries), len(array_bytes)
+    return run
+
+
+def bench_decode_gpt_entry_array(images):
+    array_bytes = _read_gpt_entry_array(images["gpt"])
+    num_entries = len(array_bytes) // 128
+
+    def run():
+        decode_gpt_entry_array(array_bytes, num_entries)
+        return num_entries, len(array_bytes)
+    return run
+
+
+def bench_parse_mbr_partition_entry(images):
+    with open(images["mbr"], "rb") as image_file:
+        mbr = image_file.read(512)
+    entry_bytes = mbr[0x1BE:0x1CE]
+
+    def run():
+        for _ in range(SCALAR_ITERATIONS):
+            parse_mbr_partition_entry(entry_bytes)
+        return SCALAR_ITERATIONS, SCALAR_ITERATIONS * 16
+    return run
+
+
+def bench_parse_partition_layout(images):
+    def run():
+        with open_image(images["gpt"]) as image_view:
+            layout = parse_partition_layout(image_view)
+        return len(layout["gpt_partitions"]), 1024 + _gpt_entry_count(images["gpt"]) * 128
+    return run
+
+
+def _first_directory_cluster(images):
+    with open_image(images["mbr"]) as image_view:
+        volume = open_fat32_volume(image_view, PARTITION_START_LBA * 512)
+        first_directory = next(entry for _, entry in walk_fat32_volume(image_view, volume) if entry.is_directory)
+        offset = volume["volume_offset"] + (volume["first_data_sector"] + (first_directory.starting_cluster - 2)
+                                            * volume["sectors_per_cluster"]) * volume["bytes_per_sector"]
+        return bytes(image_view[offset:offset + volume["cluster_size"]])
+
+
+def bench_parse_fat32_directory_entry(images):
+    directory_bytes = _first_directory_cluster(images)
+    entries = [directory_bytes[offset:offset + 32] for offset in range(0, len(directory_bytes), 32)]
+
+    def run():
+        for _ in range(10):
+            for entry_bytes in entries:
+                parse_fat32_directory_entry(entry_bytes)
+        return len(entries) * 10, len(directory_bytes) * 10
+    return run
+
+
+def bench_fat32_directory_record(images):
+    directory_bytes = _first_directory_cluster(images)
+    entries = [directory_bytes[offset:offset + 32] for offset in range(0, len(directory_bytes), 32)]
+
+    def run():
+        for _ in range(10):
+            for entry_bytes in entries:
+                Fat32DirectoryRecord.from_bytes(entry_bytes)
+        return len(entries) * 10, len(directory_bytes) * 10
+    return run
+
+
+def bench_walk_fat32_volume(images):
+    def run():
+        count = 0
+        with open_image(images["mbr"]) as image_view:
+            volume = open_fat32_volume(image_view, PARTITION_START_LBA * 512)
+            for _ in walk_fat32_volume(image_view, volume, include_deleted=True):
+                count += 1
+        return count, count * 32
+    return run
+
+
+def bench_fat32_chain_resolution(images):
+    with open_image(images["mbr"]) as image_view:
+        volume = open_fat32_volume(image_view, PARTITION_START_LBA * 512)
+        starts = [entry.starting_cluster for _, entry in walk_fat32_volume(image_view, volume) if entry.starting_cluster >= 2]
+
+    def run():
+        clusters = 0
+        with open_image(images["mbr"]) as image_view:
+            fat_table = Fat32Table(image_view, open_fat32_volume(image_view, PARTITION_START_LBA * 512))
+            try:
+                for start_cluster in starts:
+                    clusters += sum(length for _, length in fat_table.extents(start_cluster))
+            finally:
+                fat_table.close()
+        return clusters, clusters * 4
+    return run
+
+
+def bench_cluster_to_lba(images):
+    def run():
+        for cluster_number in range(2, SCALAR_ITERATIONS + 2):
+            cluster_to_lba(cluster_number, 2048, 8)
+        return SCALAR_ITERATIONS, SCALAR_ITERATIONS * 4
+    return run
+
+
+def bench_convert_addresses(images):
+    clusters = np.arange(2, ARRAY_LENGTH + 2, dtype=np.int64)
+
+    def run():
+        convert_addresses(clusters, "cluster", "byte", first_data_sector=2048)
+        return ARRAY_LENGTH, clusters.nbytes
+    return run
+
+
+BENCHMARKS = {
+    "decode_fat32_date": bench_decode_fat32_date,
+    "decode_fat32_timestamps": bench_decode_fat32_timestamps,
+    "format_guid": bench_format_guid,
+    "format_guid_array": bench_format_guid_array,
+    "get_gpt_partition_type": bench_get_gpt_partition_type,
+    "parse_gpt_header": bench_parse_gpt_header,
+    "parse_gpt_partition_entry": bench_parse_gpt_partition_entry,
+    "decode_gpt_entry_array": bench_decode_gpt_entry_array,
+    "parse_mbr_partition_entry": bench_parse_mbr_partition_entry,
+    "parse_partition_layout": bench_parse_partition_layout,
+    "parse_fat32_directory_entry": bench_parse_fat32_directory_entry,
+    "fat32_directory_record": bench_fat32_directory_record,
+    "walk_fat32_volume": bench_walk_fat32_volume,
+    "fat32_chain_resolution": bench_fat32_chain_resolution,
+    "cluster_to_lba": bench_cluster_to_lba,
+    "convert_addresses": bench_convert_addresses,
+}
+
+
+def build_fixtures(fixture_dir, num_files=20000, fragmentation=0.2, gpt_entries=1024):
+    """
+    Builds the synthetic images the benchmarks run on (reused if they already exist).
+
+    :return: A dictionary with the paths of the "mbr" and "gpt" images.
+    """
+    images = {
+        "mbr": os.path.join(fixture_dir, f"bench-mbr-{num_files}-{fragmentation}.img"),
+        "gpt": os.path.join(fixture_dir, f"bench-gpt-{gpt_entries}.img"),
+    }
+    if not os.path.exists(images["mbr"]):
+        build_image(images["mbr"], "mbr", num_files, file_size=16384, fragmentation=fragmentation, deleted_ratio=0.05)
+    if not os.path.exists(images["gpt"]):
+        build_image(images["gpt"], "gpt", 100, gpt_entries=gpt_entries, extra_partitions=gpt_entries - 1)
+    return images
+
+
+def run_benchmark(name, images, repeats=DEFAULT_REPEATS):
+    """
+    Times one benchmark and reports its best rate.
+
+    Meant to run in a fresh worker process, so that the peak RSS belongs to
+    this benchmark alone.
+
+    :return: A result dictionary (items/sec, MB/s, best and mean seconds, peak RSS in KiB).
+    """
+    run = BENCHMARKS[name](images)
+    run()  # Warm-up (page cache, lazy tables)
+
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        items, byte_count = run()
+        timings.append(time.perf_counter() - start_time)
+
+    best = min(timings)
+    return {
+        "items": items,
+        "bytes": byte_count,
+        "best_seconds": best,
+        "mean_seconds": sum(timings) / len(timings),
+        "items_per_second": items / best,
+        "mb_per_second": byte_count / best / 1e6,
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1),
+    }
+
+
+def run_benchmarks(images, names=None, repeats=DEFAULT_REPEATS):
+    """
+    Runs the benchmarks, each in its own process.
+
+    :return: A dictionary of results keyed on benchmark name.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[name] = executor.submit(run_benchmark, name, images, repeats).result()
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares throughput with a stored baseline.
+
+    :return: A list of (name, current items/sec, baseline items/sec, ratio, regressed) tuples.
+    """
+    comparison = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = result["items_per_second"] / previous["items_per_second"]
+        comparison.append((name, result["items_per_second"], previous["items_per_second"], ratio, ratio < 1 - threshold))
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the parsers and conversion functions on synthetic images.")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default is all: {', '.join(BENCHMARKS)})")
+    parser.add_argument("--fixture-dir", default=os.path.join(tempfile.gettempdir(), "parser-benchmark"),
+                        help="Directory of the synthetic images (reused between runs)")
+    parser.add_argument("--files", type=int, default=20000, help="Files in the FAT32 fixture (default is 20000)")
+    parser.add_argument("--fragmentation", type=float, default=0.2, help="Fragmentation of the FAT32 fixture (default is 0.2)")
+    parser.add_argument("--gpt-entries", type=int, default=1024, help="Entries in the GPT fixture (default is 1024)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help=f"Timed runs per benchmark (default is {DEFAULT_REPEATS})")
+    parser.add_argument("--save-baseline", metavar="JSON", help="Store the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="Compare the results with a stored baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown reported as a regression (default is 0.10, i.e. 10%%)")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    os.makedirs(args.fixture_dir, exist_ok=True)
+    images = build_fixtures(args.fixture_dir, args.files, args.fragmentation, args.gpt_entries)
+    results = run_benchmarks(images, args.benchmarks, args.repeats)
+
+    print(f"{'benchmark':<30} {'items/s':>14} {'MB/s':>10} {'best ms':>10} {'peak RSS MiB':>13}")
+    for name, result in results.items():
+        print(f"{name:<30} {result['items_per_second']:>14,.0f} {result['mb_per_second']:>10.1f} "
+              f"{result['best_seconds'] * 1000:>10.2f} {result['peak_rss_kib'] / 1024:>13.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "created": int(time.time()),
+                       "results": results}, baseline_file, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = 0
+        print(f"\n{'benchmark':<30} {'items/s':>14} {'baseline':>14} {'change':>8}")
+        for name, current, previous, ratio, regressed in compare_to_baseline(results, baseline, args.threshold):
+            regressions += regressed
+            print(f"{name:<30} {current:>14,.0f} {previous:>14,.0f} {(ratio - 1) * 100:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+        if regressions:
+            print(f"{regressions} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
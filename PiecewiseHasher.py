@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from ImageHasher import partition_byte_ranges
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024  # One digest per 1 MiB block
+CHECKPOINT_BLOCKS = 256  # Blocks hashed between two commits of the manifest
+VERIFY_BATCH_BLOCKS = 64  # Blocks handed to one verification worker at a time
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    id INTEGER PRIMARY KEY,
+    image TEXT NOT NULL,
+    label TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    byte_length INTEGER NOT NULL,
+    block_size INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (image, label, byte_offset, byte_length, block_size, algorithm)
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    partition_id INTEGER NOT NULL REFERENCES partitions (id),
+    block_index INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    PRIMARY KEY (partition_id, block_index)
+) WITHOUT ROWID;
+"""
+
+
+def open_manifest(manifest_path):
+    """
+    Opens (or creates) a SQLite piecewise hash manifest.
+    """
+    connection = sqlite3.connect(manifest_path)
+    connection.executescript(MANIFEST_SCHEMA)
+    return connection
+
+
+def hash_partition_blocks(connection, image_path, label, byte_offset, byte_length,
+                          block_size=DEFAULT_BLOCK_SIZE, algorithm="sha256", checkpoint_blocks=CHECKPOINT_BLOCKS):
+    """
+    Hashes one byte range of an image block by block into the manifest.
+
+    The manifest is committed every `checkpoint_blocks` blocks; calling this
+    again after an interruption continues after the last committed block.
+
+    :param connection: Connection returned by open_manifest().
+    :param image_path: Path to the image.
+    :param label: Name of the range (e.g. "GPT partition 1").
+    :param byte_offset: Start of the range in the image.
+    :param byte_length: Length of the range in bytes.
+    :param block_size: Bytes per block.
+    :param algorithm: hashlib algorithm name.
+    :param checkpoint_blocks: Blocks hashed between two commits.
+    :return: The number of blocks hashed by this call.
+    """
+    image = os.path.abspath(image_path)
+    connection.execute(
+        "INSERT OR IGNORE INTO partitions (image, label, byte_offset, byte_length, block_size, algorithm) VALUES (?, ?, ?, ?, ?, ?)",
+        (image, label, byte_offset, byte_length, block_size, algorithm))
+    partition_id, complete = connection.execute(
+        "SELECT id, complete FROM partitions WHERE image = ? AND label = ? AND byte_offset = ? AND byte_length = ? AND block_size = ? AND algorithm = ?",
+        (image, label, byte_offset, byte_length, block_size, algorithm)).fetchone()
+    connection.commit()
+    if complete:
+        return 0
+
+    # Resume after the last block that made it into the manifest
+    last_block = connection.execute("SELECT MAX(block_index) FROM blocks WHERE partition_id = ?", (partition_id,)).fetchone()[0]
+    block_index = 0 if last_block is None else last_block + 1
+    num_blocks = (byte_length + block_size - 1) // block_size
+
+    buffer = bytearray(block_size)
+    pending_rows = []
+    hashed = 0
+
+    with open(image_path, "rb", buffering=0) as image_file:
+        image_file.seek(byte_offset + block_index * block_size)
+
+        while block_index < num_blocks:
+            block_length = min(block_size, byte_length - block_index * block_size)
+            block_view = memoryview(buffer)[:block_length]
+            bytes_read = image_file.readinto(block_view)
+            if bytes_read != block_length:
+                raise ValueError(f"{label}: image ends inside block {block_index}")
+
+            pending_rows.append((partition_id, block_index, hashlib.new(algorithm, block_view).digest()))
+            block_index += 1
+            hashed += 1
+
+            if len(pending_rows) >= checkpoint_blocks:
+                connection.executemany("INSERT INTO blocks (partition_id, block_index, digest) VALUES (?, ?, ?)", pending_rows)
+                connection.commit()
+                pending_rows = []
+
+    connection.executemany("INSERT INTO blocks (partition_id, block_index, digest) VALUES (?, ?, ?)", pending_rows)
+    connection.execute("UPDATE partitions SET complete = 1 WHERE id = ?", (partition_id,))
+    connection.commit()
+    return hashed
+
+
+def piecewise_hash_image(image_path, manifest_path, sector_size=512, block_size=DEFAULT_BLOCK_SIZE, algorithm="sha256"):
+    """
+    Hashes every partition found by the MBR/GPT parsers block by block.
+
+    Images without a partition table are hashed as a single range. Running it
+    again with the same manifest resumes any unfinished partition.
+
+    :return: A list of (label, blocks hashed by this call) tuples.
+    """
+    from DiskImageScanner import scan_partition_table
+
+    ranges = partition_byte_ranges(scan_partition_table(image_path, sector_size))
+    if not ranges:
+        ranges = [("Whole image", 0, os.path.getsize(image_path))]
+
+    connection = open_manifest(manifest_path)
+    try:
+        return [(label, hash_partition_blocks(connection, image_path, label, offset, length, block_size, algorithm))
+                for label, offset, length in ranges]
+    finally:
+        connection.close()
+
+
+def _verify_block_batch(image_path, byte_offset, byte_length, block_size, algorithm, expected):
+    # Each worker uses its own descriptor and pread(), so no file position is shared
+    mismatches = []
+    file_descriptor = os.open(image_path, os.O_RDONLY)
+    try:
+        for block_index, digest in expected:
+            block_start = block_index * block_size
+            block_length = min(block_size, byte_length - block_start)
+            data = os.pread(file_descriptor, block_length, byte_offset + block_start)
+            if len(data) != block_length or hashlib.new(algorithm, data).digest() != digest:
+                mismatches.append(block_index)
+    finally:
+        os.close(file_descriptor)
+    return mismatches
+
+
+def verify_piecewise_manifest(manifest_path, image_path=None, byte_ranges=None, max_workers=None):
+    """
+    Re-hashes the blocks recorded in a manifest in parallel and reports the ones that differ.
+
+    :param manifest_path: Path to the manifest.
+    :param image_path: Image to verify (default is the image recorded in the manifest).
+    :param byte_ranges: Optional list of (byte offset, length) ranges of the image that may have
+                        changed; only the blocks overlapping them are checked.
+    :param max_workers: Number of worker threads.
+    :return: A list of (label, block index, image byte offset) tuples for every mismatching block.
+    """
+    connection = open_manifest(manifest_path)
+    try:
+        partitions = connection.execute("SELECT id, image, label, byte_offset, byte_length, block_size, algorithm FROM partitions").fetchall()
+
+        mismatches = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for partition_id, image, label, byte_offset, byte_length, block_size, algorithm in partitions:
+                rows = connection.execute("SELECT block_index, digest FROM blocks WHERE partition_id = ? ORDER BY block_index", (partition_id,))
+
+                if byte_ranges is not None:
+                    def overlaps_change(row):
+                        block_start = byte_offset + row[0] * block_size
+                        return any(start < block_start + block_size and block_start < start + length for start, length in byte_ranges)
+                    rows = filter(overlaps_change, rows)
+
+                rows = list(rows)
+                futures = [executor.submit(_verify_block_batch, image_path or image, byte_offset, byte_length, block_size, algorithm,
+                                           rows[start:start + VERIFY_BATCH_BLOCKS])
+                           for start in range(0, len(rows), VERIFY_BATCH_BLOCKS)]
+
+                for future in futures:
+                    for block_index in future.result():
+                        mismatches.append((label, block_index, byte_offset + block_index * block_size))
+        return mismatches
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Block-level (piecewise) hashing of each partition with a resumable SQLite manifest.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    hash_parser = subparsers.add_parser("hash", help="Hash (or resume hashing) an image into a manifest")
+    hash_parser.add_argument("image", help="Path to the raw image")
+    hash_parser.add_argument("manifest", help="Path to the SQLite manifest")
+    hash_parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Bytes per block (default is 1 MiB)")
+    hash_parser.add_argument("--algorithm", default="sha256", help="hashlib algorithm (default is sha256)")
+    hash_parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+
+    verify_parser = subparsers.add_parser("verify", help="Re-hash the blocks of a manifest and list the mismatches")
+    verify_parser.add_argument("manifest", help="Path to the SQLite manifest")
+    verify_parser.add_argument("--image", help="Image to verify (default is the image recorded in the manifest)")
+    verify_parser.add_argument("--range", action="append", dest="ranges", metavar="OFFSET:LENGTH",
+                               help="Only check blocks overlapping this byte range (repeatable)")
+    verify_parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker threads")
+    args = parser.parse_args(argv)
+
+    if args.command == "hash":
+        for label, hashed in piecewise_hash_image(args.image, args.manifest, args.sector_size, args.block_size, args.algorithm):
+            print(f"{label}: {hashed} block(s) hashed")
+        return 0
+
+    byte_ranges = None
+    if args.ranges:
+        byte_ranges = [tuple(int(part, 0) for part in byte_range.split(":")) for byte_range in args.ranges]
+
+    mismatches = verify_piecewise_manifest(args.manifest, args.image, byte_ranges, args.jobs)
+    for label, block_index, offset in mismatches:
+        print(f"{label}: block {block_index} (offset {offset}) does not match")
+    print(f"{len(mismatches)} mismatching block(s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
-def sector_to_cluster(sector_number, first_data_sector, sectors_per_cluster):
+def sector_to_cluster(sector_number, first_data_sector=None, sectors_per_cluster=None, profile=None):
     """
     Convert sector number to cluster number.
     
     :param sector_number: The sector number you want to convert.
     :param first_data_sector: The first sector of the data region (after the reserved sectors).
     :param sectors_per_cluster: Number of sectors per cluster.
+    :param profile: Optional VolumeProfile; when given, its first data sector and sectors per cluster are used.
     
     :return: Corresponding cluster number.
     """
+    if profile is not None:
+        if not profile.has_fat32:
+            raise ValueError("The profile has no FAT32 volume, so it has no data region.")
+        first_data_sector, sectors_per_cluster = profile.first_data_sector, profile.sectors_per_cluster
+
     if sector_number < first_data_sector:
         raise ValueError("Sector number is before the data region (first data sector).")
 
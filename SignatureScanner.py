@@ -0,0 +1,159 @@
+import argparse
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from DiskImageScanner import GPT_SIGNATURE, MBR_BOOT_SIGNATURE, MBR_PARTITION_ENTRY_SIZE, MBR_PARTITION_TABLE_OFFSET, parse_gpt_header
+from Fat32DirectoryWalker import parse_fat32_boot_sector
+from MBRPartitionEntryParser import parse_mbr_partition_entry
+
+SCAN_WINDOW_SIZE = 64 * 1024 * 1024  # Bytes mapped at a time; a multiple of mmap.ALLOCATIONGRANULARITY
+FAT32_FILESYSTEM_TYPE = b"FAT32   "  # BPB offset 0x52
+
+# One pass over each window finds both signatures; alignment is checked afterwards
+SIGNATURE_PATTERN = re.compile(re.escape(GPT_SIGNATURE) + b"|" + re.escape(MBR_BOOT_SIGNATURE))
+
+
+def classify_boot_sector(sector_view, byte_offset):
+    """
+    Decides whether a sector ending in 0x55AA is a FAT32 boot sector or an MBR/EBR.
+
+    :param sector_view: The sector (memoryview).
+    :param byte_offset: Byte offset of the sector in the image.
+    :return: A (type, parsed) tuple, or None if the sector is neither.
+    """
+    if sector_view[0x52:0x5A] == FAT32_FILESYSTEM_TYPE:
+        try:
+            return "fat32_boot_sector", parse_fat32_boot_sector(sector_view, byte_offset)
+        except ValueError:
+            return None
+
+    # An MBR (or EBR) only holds entries with a 0x00/0x80 boot indicator, and at least one is used
+    entries = []
+    for index in range(4):
+        offset = MBR_PARTITION_TABLE_OFFSET + index * MBR_PARTITION_ENTRY_SIZE
+        entry_view = sector_view[offset:offset + MBR_PARTITION_ENTRY_SIZE]
+        if entry_view[0] not in (0x00, 0x80):
+            return None
+        if entry_view[4] != 0x00:
+            entry = parse_mbr_partition_entry(entry_view)
+            entry["index"] = index
+            entry["partition_type_code"] = entry_view[4]
+            entries.append(entry)
+
+    if not entries:
+        return None
+    return "mbr", entries
+
+
+def scan_byte_range(image_path, range_start, range_end, sector_size=512, window_size=SCAN_WINDOW_SIZE):
+    """
+    Scans part of an image for GPT headers, MBR/EBR sectors and FAT32 boot sectors.
+
+    The range is mapped in large aligned windows and searched with one regular
+    expression per window; only the matches that sit at the right place inside a
+    sector are parsed.
+
+    :param image_path: Path to the raw image.
+    :param range_start: First byte of the range (a multiple of window_size).
+    :param range_end: End of the range (exclusive).
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param window_size: Bytes mapped at a time.
+    :return: A list of hits, each a dictionary with the type, byte offset, LBA and parsed structure.
+    """
+    hits = []
+    with open(image_path, "rb") as image_file:
+        image_size = os.fstat(image_file.fileno()).st_size
+        range_end = min(range_end, image_size)
+
+        for window_start in range(range_start, range_end, window_size):
+            window_length = min(window_size, image_size - window_start)
+            with mmap.mmap(image_file.fileno(), window_length, access=mmap.ACCESS_READ, offset=window_start) as window_map:
+                window_view = memoryview(window_map)
+                try:
+                    for match in SIGNATURE_PATTERN.finditer(window_map):
+                        position = match.start()
+                        if match.group() == GPT_SIGNATURE:
+                            sector_start = position
+                        else:
+                            sector_start = position - 510
+                        if sector_start % sector_size or sector_start < 0 or window_start + sector_start >= range_end:
+                            continue
+
+                        sector_view = window_view[sector_start:sector_start + sector_size]
+                        if len(sector_view) < 512:
+                            continue
+                        byte_offset = window_start + sector_start
+
+                        if match.group() == GPT_SIGNATURE:
+                            hit = ("gpt_header", parse_gpt_header(sector_view))
+                        else:
+                            hit = classify_boot_sector(sector_view, byte_offset)
+                        del sector_view
+
+                        if hit is not None:
+                            hits.append({
+                                "type": hit[0],
+                                "byte_offset": byte_offset,
+                                "lba": byte_offset // sector_size,
+                                "parsed": hit[1],
+                            })
+                finally:
+                    window_view.release()
+    return hits
+
+
+def scan_image(image_path, sector_size=512, jobs=None, window_size=SCAN_WINDOW_SIZE):
+    """
+    Sweeps a whole image for lost partition tables and FAT32 boot sectors across several processes.
+
+    :param image_path: Path to the raw image.
+    :param sector_size: Bytes per sector (512 or 4096).
+    :param jobs: Number of worker processes (default is the number of CPUs).
+    :param window_size: Bytes mapped at a time.
+    :return: All hits, sorted by byte offset.
+    """
+    if window_size % mmap.ALLOCATIONGRANULARITY or window_size % sector_size:
+        raise ValueError(f"Window size must be a multiple of {mmap.ALLOCATIONGRANULARITY} and of the sector size")
+
+    image_size = os.path.getsize(image_path)
+    jobs = jobs or os.cpu_count()
+
+    # Split into whole windows, several ranges per worker to even out the load
+    num_windows = max((image_size + window_size - 1) // window_size, 1)
+    windows_per_range = max(num_windows // (jobs * 4), 1)
+    range_size = windows_per_range * window_size
+
+    hits = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(scan_byte_range, image_path, range_start, range_start + range_size, sector_size, window_size)
+                   for range_start in range(0, image_size, range_size)]
+        for future in as_completed(futures):
+            hits.extend(future.result())
+
+    hits.sort(key=lambda hit: hit["byte_offset"])
+    return hits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan a whole image for GPT headers, MBR/EBR sectors and FAT32 boot sectors.")
+    parser.add_argument("image", help="Path to the raw image")
+    parser.add_argument("--sector-size", type=int, default=512, help="Bytes per sector (default is 512)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes (default is the number of CPUs)")
+    parser.add_argument("--window-size", type=int, default=SCAN_WINDOW_SIZE, help="Bytes mapped at a time (default is 64 MiB)")
+    args = parser.parse_args(argv)
+
+    hits = scan_image(args.image, args.sector_size, args.jobs, args.window_size)
+    for hit in hits:
+        print(f"\n{hit['type']} at LBA {hit['lba']} (offset 0x{hit['byte_offset']:x}):")
+        parsed = hit["parsed"]
+        for item in (parsed if isinstance(parsed, list) else [parsed]):
+            for key, value in item.items():
+                print(f"  {key}: {value}")
+    print(f"\n{len(hits)} signature(s) found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import mmap
+import os
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+
+from SectorToByte import calculate_byte_offset
+
+SEGMENT_NAME = re.compile(r"^(?P<base>.+\.)(?P<number>\d{3})$")  # image.001, image.002, ... (also image.000)
+DEFAULT_MAX_OPEN_SEGMENTS = 8  # Segments kept mapped at the same time
+
+
+def is_split_image(image_path):
+    """
+    Tells whether a path names a segment of a split raw image (e.g. "disk.001").
+    """
+    return SEGMENT_NAME.match(os.path.basename(image_path)) is not None
+
+
+def find_segments(first_segment_path):
+    """
+    Lists the segments of a split raw image, starting from the given one.
+
+    Segments are numbered with three digits and found by counting up until the
+    next number does not exist (disk.001, disk.002, ...).
+
+    :param first_segment_path: Path to the first segment.
+    :return: The list of segment paths, in order.
+    """
+    match = SEGMENT_NAME.match(first_segment_path)
+    if match is None:
+        raise ValueError(f"Not a numbered segment: {first_segment_path}")
+
+    base = match.group("base")
+    number = int(match.group("number"))
+    segment_paths = []
+    while os.path.exists(f"{base}{number:03d}"):
+        segment_paths.append(f"{base}{number:03d}")
+        number += 1
+
+    if not segment_paths:
+        raise FileNotFoundError(first_segment_path)
+    return segment_paths
+
+
+class SplitImage:
+    """
+    Virtual, read-only view over the segments of a split raw image.
+
+    Global offsets are mapped to a segment and a local offset by bisecting the
+    sorted segment start offsets. Each segment is memory-mapped on first use and
+    kept in a bounded LRU pool. It behaves like the memoryview returned by
+    open_image() for len(), indexing and slicing: a slice inside one segment is a
+    zero-copy memoryview of that segment, and a slice that crosses segment
+    boundaries is filled with one scatter read (preadv) per segment it touches.
+    """
+
+    def __init__(self, segment_paths, max_open_segments=DEFAULT_MAX_OPEN_SEGMENTS):
+        """
+        :param segment_paths: Paths of the segments, in order.
+        :param max_open_segments: Number of segments kept mapped (and open) at the same time.
+        """
+        if max_open_segments < 1:
+            raise ValueError("At least one segment must be allowed open")
+
+        self.segment_paths = list(segment_paths)
+        self.max_open_segments = max_open_segments
+
+        self.segment_starts = []
+        self.segment_sizes = []
+        size = 0
+        for segment_path in self.segment_paths:
+            segment_size = os.path.getsize(segment_path)
+            if segment_size == 0:
+                raise ValueError(f"Cannot map {segment_path}: the segment is empty")
+            self.segment_starts.append(size)
+            self.segment_sizes.append(segment_size)
+            size += segment_size
+        self.size = size
+
+        # Segment index -> (file descriptor, mmap, memoryview), least recently used first
+        self._pool = OrderedDict()
+
+    @classmethod
+    def from_first_segment(cls, first_segment_path, max_open_segments=DEFAULT_MAX_OPEN_SEGMENTS):
+        """
+        Opens a split image from the path of its first segment (e.g. "disk.001").
+        """
+        return cls(find_segments(first_segment_path), max_open_segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        while self._pool:
+            self._release(*self._pool.popitem(last=False))
+
+    @staticmethod
+    def _release(_, pool_entry):
+        file_descriptor, segment_map, segment_view = pool_entry
+        # Slices still held by a caller keep the map alive until they are garbage collected
+        try:
+            segment_view.release()
+            segment_map.close()
+        except BufferError:
+            pass
+        os.close(file_descriptor)
+
+    def _segment(self, index):
+        pool_entry = self._pool.get(index)
+        if pool_entry is not None:
+            self._pool.move_to_end(index)
+            return pool_entry
+
+        while len(self._pool) >= self.max_open_segments:
+            self._release(*self._pool.popitem(last=False))
+
+        file_descriptor = os.open(self.segment_paths[index], os.O_RDONLY)
+        try:
+            segment_map = mmap.mmap(file_descriptor, 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            os.close(file_descriptor)
+            raise
+        pool_entry = self._pool[index] = (file_descriptor, segment_map, memoryview(segment_map))
+        return pool_entry
+
+    def segment_view(self, index):
+        """
+        Returns the memoryview of one whole segment (mapped on demand).
+        """
+        return self._segment(index)[2]
+
+    def segment_fd(self, index):
+        """
+        Returns an open file descriptor of one segment, valid until the segment leaves the pool.
+        """
+        return self._segment(index)[0]
+
+    def __len__(self):
+        return self.size
+
+    def locate(self, offset):
+        """
+        Maps a global byte offset to its segment.
+
+        :return: A tuple (segment index, offset inside the segment).
+        """
+        if not 0 <= offset < self.size:
+            raise IndexError(f"Offset {offset} is outside the image ({self.size} bytes)")
+        index = bisect_right(self.segment_starts, offset) - 1
+        return index, offset - self.segment_starts[index]
+
+    def locate_lba(self, lba, sector_size=512):
+        """
+        Maps an LBA to the segment file that holds it.
+
+        :return: A tuple (segment path, byte offset inside the segment).
+        """
+        index, local_offset = self.locate(calculate_byte_offset(lba, sector_size))
+        return self.segment_paths[index], local_offset
+
+    def segment_ranges(self, offset, length):
+        """
+        Splits a global byte range at the segment boundaries.
+
+        :return: Yields (segment index, offset inside the segment, length) tuples, in order.
+        """
+        length = min(length, self.size - offset)
+        if length <= 0:
+            return
+        index, local_offset = self.locate(offset)
+        while length > 0:
+            count = min(length, self.segment_sizes[index] - local_offset)
+            yield index, local_offset, count
+            length -= count
+            index += 1
+            local_offset = 0
+
+    def readinto(self, offset, buffer):
+        """
+        Reads image bytes into a writable buffer with one scatter read per segment touched.
+
+        :return: The number of bytes read (short at the end of the image).
+        """
+        buffer_view = memoryview(buffer).cast("B")
+        bytes_read = 0
+        for index, local_offset, count in self.segment_ranges(offset, len(buffer_view)):
+            count_read = os.preadv(self.segment_fd(index), [buffer_view[bytes_read:bytes_read + count]], local_offset)
+            bytes_read += count_read
+            if count_read != count:
+                break
+        return bytes_read
+
+    def read(self, offset, length):
+        """
+        Returns `length` bytes at `offset` as bytes (shorter at the end of the image).
+        """
+        return bytes(self[offset:offset + length])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                raise ValueError("Split images only support contiguous slices")
+            if stop <= start:
+                return memoryview(b"")
+
+            index, local_offset = self.locate(start)
+            if stop - start <= self.segment_sizes[index] - local_offset:
+                # The whole range is in one segment, so no copy is needed
+                return self.segment_view(index)[local_offset:local_offset + stop - start]
+
+            buffer = bytearray(stop - start)
+            bytes_read = self.readinto(start, buffer)
+            return memoryview(buffer)[:bytes_read]
+
+        if key < 0:
+            key += self.size
+        index, local_offset = self.locate(key)
+        return self.segment_view(index)[local_offset]
+
+
+# Example usage
+if __name__ == "__main__":
+    first_segment = input("Enter the path to the first segment (e.g. disk.001): ").strip()
+    lba = int(input("Enter an LBA to locate: ").strip())
+
+    with SplitImage.from_first_segment(first_segment) as split_image:
+        print(f"{len(split_image.segment_paths)} segment(s), {len(split_image)} bytes")
+        segment_path, local_offset = split_image.locate_lba(lba)
+        print(f"LBA {lba} is at byte {local_offset} of {segment_path}")
@@ -0,0 +1,295 @@
+import argparse
+import binascii
+import os
+import random
+import struct
+import uuid
+
+from Fat32DirectoryWalker import short_name_checksum
+
+PARTITION_START_LBA = 2048
+MICROSOFT_BASIC_DATA_GUID = uuid.UUID("ebd0a0a2-b9e5-4433-87c0-68b6b72699c7").bytes_le
+LINUX_FILESYSTEM_GUID = uuid.UUID("0fc63daf-8483-4772-8e79-3d69d8477de4").bytes_le
+FAT32_LBA_PARTITION_TYPE = 0x0C  # W95 FAT32 (LBA)
+GPT_PROTECTIVE_TYPE = 0xEE
+
+
+def _directory_entry(short_name, attributes, first_cluster, file_size, date_value, time_value):
+    return struct.pack("<11sBBBHHHHHHHI", short_name, attributes, 0, 0, time_value, date_value, date_value,
+                       first_cluster >> 16, time_value, date_value, first_cluster & 0xFFFF, file_size)
+
+
+def _long_name_entries(long_name, short_name):
+    # Pad with one NUL and then 0xFFFF up to a multiple of 13 characters
+    characters = long_name.encode("utf-16le")
+    if len(characters) % 26:
+        characters += b"\x00\x00"
+        characters += b"\xff" * (-len(characters) % 26)
+
+    checksum = short_name_checksum(short_name)
+    fragments = [characters[offset:offset + 26] for offset in range(0, len(characters), 26)]
+
+    entries = []
+    for sequence, fragment in enumerate(fragments, start=1):
+        if sequence == len(fragments):
+            sequence |= 0x40
+        entries.append(struct.pack("<B10sBBB12sH4s", sequence, fragment[0:10], 0x0F, 0, checksum, fragment[10:22], 0, fragment[22:26]))
+
+    # On disk the last fragment comes first
+    return b"".join(reversed(entries))
+
+
+class _ClusterAllocator:
+    def __init__(self, cluster_count, fragmentation, rng):
+        self.fat = [0] * (cluster_count + 2)
+        self.fat[0] = 0x0FFFFFF8
+        self.fat[1] = 0x0FFFFFFF
+        self.next_cluster = 2
+        self.fragmentation = fragmentation
+        self.rng = rng
+
+    def allocate(self, count, fragmented=True):
+        clusters = []
+        for index in range(count):
+            # Leave a gap before some clusters to fragment the chain
+            if index and fragmented and self.rng.random() < self.fragmentation:
+                self.next_cluster += self.rng.randint(1, 4)
+            if self.next_cluster >= len(self.fat):
+                raise ValueError("Synthetic volume is too small for the requested layout")
+            clusters.append(self.next_cluster)
+            self.next_cluster += 1
+
+        for cluster, next_cluster in zip(clusters, clusters[1:]):
+            self.fat[cluster] = next_cluster
+        self.fat[clusters[-1]] = 0x0FFFFFFF
+        return clusters
+
+
+def write_fat32_volume(image_file, volume_offset, num_files, file_size=4096, files_per_directory=1000,
+                       fragmentation=0.0, long_names=True, deleted_ratio=0.0, sectors_per_cluster=8,
+                       bytes_per_sector=512, seed=0):
+    """
+    Writes a synthetic FAT32 volume into an open image file.
+
+    The root directory holds one subdirectory per `files_per_directory` files.
+    Only the metadata and the first bytes of each file are written, so the
+    rest of the image stays sparse.
+
+    :param image_file: Image file opened for writing (binary).
+    :param volume_offset: Byte offset of the volume in the image.
+    :param num_files: Number of files.
+    :param file_size: Size of each file in bytes.
+    :param files_per_directory: Files per subdirectory.
+    :param fragmentation: Probability (0-1) that a cluster of a file is not adjacent to the previous one.
+    :param long_names: Give every file a VFAT long name.
+    :param deleted_ratio: Fraction (0-1) of the files that are marked deleted.
+    :param sectors_per_cluster: Sectors per cluster.
+    :param bytes_per_sector: Bytes per sector.
+    :param seed: Seed of the random generator (the same seed gives the same image).
+    :return: The number of sectors of the volume.
+    """
+    rng = random.Random(seed)
+    cluster_size = bytes_per_sector * sectors_per_cluster
+    num_directories = max((num_files + files_per_directory - 1) // files_per_directory, 1)
+
+    # Size the volume from the clusters it needs, with room for the fragmentation gaps
+    entries_per_file = 4 if long_names else 1
+    clusters_per_file = max((file_size + cluster_size - 1) // cluster_size, 1)
+    directory_clusters = (32 * (files_per_directory * entries_per_file + 2) + cluster_size - 1) // cluster_size
+    root_clusters = (32 * num_directories + cluster_size - 1) // cluster_size
+    needed_clusters = num_files * clusters_per_file + num_directories * directory_clusters + root_clusters
+    cluster_count = int(needed_clusters * (1 + 2.5 * fragmentation)) + 64
+
+    reserved_sectors = 32
+    sectors_per_fat = ((cluster_count + 2) * 4 + bytes_per_sector - 1) // bytes_per_sector
+    first_data_sector = reserved_sectors + 2 * sectors_per_fat
+    total_sectors = first_data_sector + cluster_count * sectors_per_cluster
+
+    def cluster_offset(cluster_number):
+        return volume_offset + (first_data_sector + (cluster_number - 2) * sectors_per_cluster) * bytes_per_sector
+
+    def write_clusters(clusters, data):
+        for index, cluster_number in enumerate(clusters):
+            chunk = data[index * cluster_size:(index + 1) * cluster_size]
+            if chunk:
+                os.pwrite(image_file.fileno(), chunk, cluster_offset(cluster_number))
+
+    allocator = _ClusterAllocator(cluster_count, fragmentation, rng)
+    root_chain = allocator.allocate(root_clusters, fragmented=False)
+
+    root_entries = []
+    file_index = 0
+    for directory_index in range(num_directories):
+        directory_chain = allocator.allocate(directory_clusters, fragmented=False)
+        directory_name = f"DIR{directory_index:05d}".ljust(11).encode("ascii")
+        root_entries.append(_directory_entry(directory_name, 0x10, directory_chain[0], 0, 0x5A21, 0x6B5A))
+
+        entries = [
+            _directory_entry(b".          ", 0x10, directory_chain[0], 0, 0x5A21, 0x6B5A),
+            _directory_entry(b"..         ", 0x10, 0, 0, 0x5A21, 0x6B5A),
+        ]
+        for _ in range(min(files_per_directory, num_files - file_index)):
+            file_chain = allocator.allocate(clusters_per_file) if file_size else [0]
+            short_name = f"F{file_index:07d}TXT".encode("ascii")
+
+            # Random but valid dates (1990-2039) and times
+            date_value = (rng.randint(10, 59) << 9) | (rng.randint(1, 12) << 5) | rng.randint(1, 28)
+            time_value = (rng.randint(0, 23) << 11) | (rng.randint(0, 59) << 5) | rng.randint(0, 29)
+
+            entry = _directory_entry(short_name, 0x20, file_chain[0], file_size, date_value, time_value)
+            if long_names:
+                entry = _long_name_entries(f"file {file_index:07d} synthetic document.txt", short_name) + entry
+
+            if file_size:
+                write_clusters(file_chain[:1], f"FILE{file_index:08d}".encode("ascii"))
+
+            if rng.random() < deleted_ratio:
+                # Deleting marks every entry of the file with 0xE5 and frees its chain
+                entry = bytearray(entry)
+                for offset in range(0, len(entry), 32):
+                    entry[offset] = 0xE5
+                entry = bytes(entry)
+                if file_size:
+                    for cluster_number in file_chain:
+                        allocator.fat[cluster_number] = 0
+
+            entries.append(entry)
+            file_index += 1
+
+        write_clusters(directory_chain, b"".join(entries))
+
+    write_clusters(root_chain, b"".join(root_entries))
+
+    # Boot sector (with its backup at sector 6)
+    boot_sector = bytearray(512)
+    boot_sector[0:11] = b"\xeb\x58\x90MSWIN4.1"
+    struct.pack_into("<HBHBHHBHHHII", boot_sector, 0x0B, bytes_per_sector, sectors_per_cluster, reserved_sectors, 2, 0, 0,
+                     0xF8, 0, 63, 255, volume_offset // bytes_per_sector, total_sectors)
+    struct.pack_into("<IHHIHH", boot_sector, 0x24, sectors_per_fat, 0, 0, root_chain[0], 1, 6)
+    boot_sector[0x42] = 0x29
+    boot_sector[0x47:0x52] = b"SYNTHETIC  "
+    boot_sector[0x52:0x5A] = b"FAT32   "
+    boot_sector[510:512] = b"\x55\xaa"
+    os.pwrite(image_file.fileno(), bytes(boot_sector), volume_offset)
+    os.pwrite(image_file.fileno(), bytes(boot_sector), volume_offset + 6 * bytes_per_sector)
+
+    # Both FAT copies
+    fat_bytes = struct.pack(f"<{len(allocator.fat)}I", *allocator.fat)
+    for fat_number in range(2):
+        os.pwrite(image_file.fileno(), fat_bytes, volume_offset + (reserved_sectors + fat_number * sectors_per_fat) * bytes_per_sector)
+
+    return total_sectors
+
+
+def write_mbr(image_file, partitions):
+    """
+    Writes an MBR with up to four primary partitions.
+
+    :param partitions: List of (partition type, starting LBA, total sectors, bootable) tuples.
+    """
+    mbr = bytearray(512)
+    for index, (partition_type, start_lba, total_sectors, bootable) in enumerate(partitions):
+        struct.pack_into("<B3sB3sII", mbr, 0x1BE + index * 16, 0x80 if bootable else 0x00, b"\xfe\xff\xff",
+                         partition_type, b"\xfe\xff\xff", start_lba, min(total_sectors, 0xFFFFFFFF))
+    mbr[510:512] = b"\x55\xaa"
+    os.pwrite(image_file.fileno(), bytes(mbr), 0)
+
+
+def _random_guid(rng):
+    # A version 4 GUID drawn from the seeded generator, so that images stay reproducible
+    return uuid.UUID(bytes=rng.randbytes(16), version=4).bytes_le
+
+
+def write_gpt(image_file, total_sectors, partitions, num_entries=128, sector_size=512, rng=None):
+    """
+    Writes a protective MBR, the primary GPT and the backup GPT, with valid CRC32s.
+
+    :param total_sectors: Size of the image in sectors.
+    :param partitions: List of (type GUID bytes, starting LBA, ending LBA, name) tuples.
+    :param num_entries: Number of slots in the partition entry array.
+    :param rng: random.Random used for the disk and partition GUIDs (default is an unseeded one).
+    """
+    rng = rng if rng is not None else random.Random()
+    write_mbr(image_file, [(GPT_PROTECTIVE_TYPE, 1, total_sectors - 1, False)])
+
+    entry_array = bytearray(num_entries * 128)
+    for index, (type_guid, start_lba, end_lba, name) in enumerate(partitions):
+        struct.pack_into("<16s16sQQQ72s", entry_array, index * 128, type_guid, _random_guid(rng),
+                         start_lba, end_lba, 0, name.encode("utf-16le"))
+    array_crc = binascii.crc32(entry_array) & 0xFFFFFFFF
+    array_sectors = (len(entry_array) + sector_size - 1) // sector_size
+
+    disk_guid = _random_guid(rng)
+    last_lba = total_sectors - 1
+    first_usable_lba = 2 + array_sectors
+    last_usable_lba = last_lba - array_sectors - 1
+
+    def gpt_header(current_lba, backup_lba, entry_lba):
+        header = bytearray(struct.pack("<8sIIIIQQQQ16sQIII", b"EFI PART", 0x00010000, 92, 0, 0, current_lba, backup_lba,
+                                       first_usable_lba, last_usable_lba, disk_guid, entry_lba, num_entries, 128, array_crc))
+        struct.pack_into("<I", header, 0x10, binascii.crc32(header) & 0xFFFFFFFF)
+        return bytes(header)
+
+    backup_array_lba = last_lba - array_sectors
+    os.pwrite(image_file.fileno(), gpt_header(1, last_lba, 2), sector_size)
+    os.pwrite(image_file.fileno(), bytes(entry_array), 2 * sector_size)
+    os.pwrite(image_file.fileno(), bytes(entry_array), backup_array_lba * sector_size)
+    os.pwrite(image_file.fileno(), gpt_header(last_lba, 1, backup_array_lba), last_lba * sector_size)
+
+
+def build_image(image_path, scheme="mbr", num_files=1000, file_size=4096, files_per_directory=1000,
+                fragmentation=0.0, long_names=True, deleted_ratio=0.0, gpt_entries=128, extra_partitions=0, seed=0):
+    """
+    Builds a synthetic raw image with one FAT32 partition at LBA 2048.
+
+    :param image_path: Path of the image to create (overwritten).
+    :param scheme: "mbr" or "gpt".
+    :param gpt_entries: Number of slots in the GPT partition entry array.
+    :param extra_partitions: Additional (empty) GPT partitions after the FAT32 one, to fill the entry array.
+    :return: The size of the image in bytes.
+
+    See write_fat32_volume() for the other parameters.
+    """
+    with open(image_path, "wb") as image_file:
+        volume_sectors = write_fat32_volume(image_file, PARTITION_START_LBA * 512, num_files, file_size, files_per_directory,
+                                            fragmentation, long_names, deleted_ratio, seed=seed)
+        volume_end = PARTITION_START_LBA + volume_sectors
+
+        # Extra partitions are 2048 sectors each and hold no data
+        total_sectors = volume_end + extra_partitions * 2048 + PARTITION_START_LBA
+
+        if scheme == "gpt":
+            partitions = [(MICROSOFT_BASIC_DATA_GUID, PARTITION_START_LBA, volume_end - 1, "Synthetic FAT32")]
+            for index in range(extra_partitions):
+                start_lba = volume_end + index * 2048
+                partitions.append((LINUX_FILESYSTEM_GUID, start_lba, start_lba + 2047, f"Extra {index}"))
+            write_gpt(image_file, total_sectors, partitions, max(gpt_entries, len(partitions)), rng=random.Random(seed))
+        else:
+            write_mbr(image_file, [(FAT32_LBA_PARTITION_TYPE, PARTITION_START_LBA, volume_sectors, True)])
+
+        image_file.truncate(total_sectors * 512)
+    return total_sectors * 512
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a synthetic MBR or GPT disk image with a FAT32 partition.")
+    parser.add_argument("image", help="Path of the image to create")
+    parser.add_argument("--scheme", choices=("mbr", "gpt"), default="mbr", help="Partitioning scheme (default is mbr)")
+    parser.add_argument("--files", type=int, default=1000, help="Number of files (default is 1000)")
+    parser.add_argument("--file-size", type=int, default=4096, help="Size of each file in bytes (default is 4096)")
+    parser.add_argument("--files-per-directory", type=int, default=1000, help="Files per subdirectory (default is 1000)")
+    parser.add_argument("--fragmentation", type=float, default=0.0, help="Probability that a cluster is not adjacent to the previous one")
+    parser.add_argument("--short-names", action="store_true", help="Do not create VFAT long names")
+    parser.add_argument("--deleted-ratio", type=float, default=0.0, help="Fraction of the files marked deleted")
+    parser.add_argument("--gpt-entries", type=int, default=128, help="Slots in the GPT partition entry array (default is 128)")
+    parser.add_argument("--extra-partitions", type=int, default=0, help="Additional empty GPT partitions")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default is 0)")
+    args = parser.parse_args(argv)
+
+    image_size = build_image(args.image, args.scheme, args.files, args.file_size, args.files_per_directory, args.fragmentation,
+                             not args.short_names, args.deleted_ratio, args.gpt_entries, args.extra_partitions, args.seed)
+    print(f"Wrote {args.image} ({image_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import argparse
+import fcntl
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+from DiskImageScanner import GPT_SIGNATURE, MBR_BOOT_SIGNATURE, open_image, parse_partition_layout
+from DiskStructures import GPT_HEADER_STRUCT
+from Fat32DirectoryWalker import FAT32_FILESYSTEM_TYPE, open_fat32_volume
+
+PROBED_SECTOR_SIZES = (512, 4096)  # Logical sector sizes tried when looking for the GPT header at LBA 1
+DEFAULT_SECTOR_SIZE = 512
+DEFAULT_HPC = 255  # Heads per cylinder used when the BPB does not record a geometry
+DEFAULT_SPT = 63  # Sectors per track used when the BPB does not record a geometry
+
+
+class VolumeProfile(namedtuple("VolumeProfile", "sector_size partition_scheme partition_start_lba bytes_per_sector sectors_per_cluster "
+                                                "cluster_size first_data_sector root_cluster cluster_count hpc spt",
+                               defaults=(None,) * 7 + (DEFAULT_HPC, DEFAULT_SPT))):
+    """
+    Sector size, FAT32 layout and CHS geometry of an image, detected once and reused.
+
+    `first_data_sector` is the LBA of the FAT32 data region on the disk (the
+    partition start included), in units of `bytes_per_sector`. The FAT32 fields
+    are None when no FAT32 volume was found. The conversion functions
+    (cluster_to_lba(), lba_to_cluster(), sector_to_cluster(), chs_to_lba() and
+    convert_addresses()) take their parameters from a profile passed as `profile`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def has_fat32(self):
+        return self.first_data_sector is not None
+
+    def to_dict(self):
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**{field: values.get(field) for field in cls._fields if field in values})
+
+
+def detect_sector_size(image_view):
+    """
+    Finds the logical sector size by probing for the GPT header at LBA 1 of each candidate size.
+
+    A signature alone is not enough: the header must also record itself at LBA 1.
+    Without a GPT, an unpartitioned FAT32 volume gives its BPB bytes per sector.
+
+    :return: A tuple (sector size, partition scheme) where the scheme is "gpt", "mbr" or "none".
+    """
+    for sector_size in PROBED_SECTOR_SIZES:
+        header_view = image_view[sector_size:sector_size + GPT_HEADER_STRUCT.size]
+        if len(header_view) == GPT_HEADER_STRUCT.size and header_view[0:8] == GPT_SIGNATURE:
+            current_lba = GPT_HEADER_STRUCT.unpack_from(header_view)[4]
+            if current_lba == 1:
+                return sector_size, "gpt"
+
+    if image_view[0x52:0x5A] == FAT32_FILESYSTEM_TYPE:
+        bytes_per_sector = int.from_bytes(image_view[0x0B:0x0D], "little")
+        return (bytes_per_sector if bytes_per_sector in PROBED_SECTOR_SIZES else DEFAULT_SECTOR_SIZE), "none"
+
+    if image_view[510:512] == MBR_BOOT_SIGNATURE:
+        return DEFAULT_SECTOR_SIZE, "mbr"
+    return DEFAULT_SECTOR_SIZE, "none"
+
+
+def detect_volume_profile(image_view, partition_start_lba=None):
+    """
+    Detects the sector size and the layout of the first FAT32 volume of an image.
+
+    :param image_view: A memoryview over the image.
+    :param partition_start_lba: LBA of the FAT32 volume to profile (default is the
+                                first FAT32 partition, or LBA 0 for an unpartitioned volume).
+    :return: A VolumeProfile.
+    """
+    sector_size, partition_scheme = detect_sector_size(image_view)
+
+    if partition_start_lba is None:
+        if image_view[0x52:0x5A] == FAT32_FILESYSTEM_TYPE:
+            partition_start_lba = 0
+        elif partition_scheme != "none":
+            # ImageTriage brings in the process pool machinery, which a cached lookup never needs
+            from ImageTriage import find_fat32_volumes
+            volumes = find_fat32_volumes(image_view, parse_partition_layout(image_view, sector_size))
+            partition_start_lba = volumes[0] if volumes else None
+
+    if partition_start_lba is None:
+        return VolumeProfile(sector_size, partition_scheme)
+
+    volume = open_fat32_volume(image_view, partition_start_lba * sector_size)
+    bytes_per_sector = volume["bytes_per_sector"]
+
+    return VolumeProfile(
+        sector_size=sector_size,
+        partition_scheme=partition_scheme,
+        partition_start_lba=partition_start_lba,
+        bytes_per_sector=bytes_per_sector,
+        sectors_per_cluster=volume["sectors_per_cluster"],
+        cluster_size=volume["cluster_size"],
+        first_data_sector=partition_start_lba * sector_size // bytes_per_sector + volume["first_data_sector"],
+        root_cluster=volume["root_cluster"],
+        cluster_count=volume["cluster_count"],
+        hpc=volume["num_heads"] or DEFAULT_HPC,
+        spt=volume["sectors_per_track"] or DEFAULT_SPT,
+    )
+
+
+def _image_identity(image_path):
+    # A profile is only reused while the image has the same size and modification time
+    image_stat = os.stat(image_path)
+    return os.path.abspath(image_path), image_stat.st_size, image_stat.st_mtime_ns
+
+
+def load_volume_profiles(profile_path):
+    """
+    Reads a profile store (a JSON file of profiles keyed by image path).
+
+    :return: The stored entries, or an empty dictionary if the file does not exist.
+    """
+    try:
+        with open(profile_path, "r", encoding="utf-8") as profile_file:
+            return json.load(profile_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_volume_profiles(profile_path, profiles):
+    """
+    Merges entries into a profile store.
+
+    Concurrent runs take an exclusive lock on "<store>.lock", re-read the store
+    and write the merged result to a unique temporary file that replaces it, so
+    neither an interrupted run nor a concurrent one loses entries.
+
+    :param profile_path: Path of the JSON profile store.
+    :param profiles: Entries to add or replace, keyed like the store.
+    """
+    store_directory, store_name = os.path.split(os.path.abspath(profile_path))
+    with open(f"{profile_path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+        merged = load_volume_profiles(profile_path)
+        merged.update(profiles)
+
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=store_directory, prefix=f"{store_name}.",
+                                         suffix=".tmp", delete=False) as temporary_file:
+            json.dump(merged, temporary_file, indent=2, sort_keys=True)
+        try:
+            os.replace(temporary_file.name, profile_path)
+        except BaseException:
+            os.unlink(temporary_file.name)
+            raise
+
+
+def get_volume_profile(image_path, profile_path=None, partition_start_lba=None):
+    """
+    Returns the profile of an image, detecting it only when the store has no up-to-date copy.
+
+    :param image_path: Path to the raw image (or the first segment of a split image).
+    :param profile_path: Optional JSON profile store shared between runs.
+    :param partition_start_lba: LBA of the FAT32 volume to profile (default is the first one found).
+    :return: A VolumeProfile.
+    """
+    image_key, image_size, image_mtime = _image_identity(image_path)
+    profile_key = image_key if partition_start_lba is None else f"{image_key}@{partition_start_lba}"
+
+    profiles = load_volume_profiles(profile_path) if profile_path else {}
+    stored = profiles.get(profile_key)
+    if stored is not None and stored["image_size"] == image_size and stored["image_mtime_ns"] == image_mtime:
+        return VolumeProfile.from_dict(stored["profile"])
+
+    with open_image(image_path) as image_view:
+        profile = detect_volume_profile(image_view, partition_start_lba)
+
+    if profile_path:
+        save_volume_profiles(profile_path, {profile_key: {"image_size": image_size, "image_mtime_ns": image_mtime,
+                                                          "profile": profile.to_dict()}})
+    return profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect the sector size, FAT32 layout and geometry of images.")
+    parser.add_argument("images", nargs="+", help="Raw images to profile")
+    parser.add_argument("--profiles", metavar="PATH", help="JSON profile store reused between runs")
+    parser.add_argument("--start-lba", type=int, help="Starting LBA of the FAT32 partition (default is the first one found)")
+    args = parser.parse_args(argv)
+
+    for image_path in args.images:
+        profile = get_volume_profile(image_path, args.profiles, args.start_lba)
+        print(json.dumps({"image": image_path, **profile.to_dict()}))
+
+
+if __name__ == "__main__":
+    main()
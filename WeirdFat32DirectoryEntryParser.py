@@ -1,4 +1,4 @@
-import struct
+from DiskStructures import FAT_DIRENT_STRUCT
 
 def hex_to_ascii(hex_data):
     # Converts a hexadecimal string to its ASCII equivalent
@@ -6,36 +6,32 @@ def hex_to_ascii(hex_data):
     return ascii_str
 
 def parse_fat32_directory_entry(entry_bytes):
-    # 1. Short filename (8.3 format) - 11 bytes
-    short_filename = entry_bytes[0:11].decode('ascii', errors='ignore').strip()
+    # 1. Short filename (0x00), attributes (0x0B), reserved bytes (0x0C-0x0D), creation time (0x0E),
+    # creation date (0x10), access date (0x12), cluster high word (0x14), modification time (0x16),
+    # modification date (0x18), cluster low word (0x1A) and file size (0x1C) in one pass
+    (short_name_bytes, file_attributes, _, _, creation_time, creation_date, access_date, starting_cluster_high,
+     modification_time, modification_date, starting_cluster_low, file_size) = FAT_DIRENT_STRUCT.unpack_from(entry_bytes)
+    short_filename = str(short_name_bytes, 'ascii', errors='ignore').strip()
     
-    # 2. File attributes - 1 byte
-    file_attributes = entry_bytes[11]
-    
-    # 3. Reserved space - 10 bytes (not important for now)
-    reserved = entry_bytes[12:22]
-    
-    # 4. Creation time, access time, and modification time (each 2 bytes)
-    creation_time = struct.unpack('<H', entry_bytes[14:16])[0]  # 0x0E - 0x0F
-    access_date = struct.unpack('<H', entry_bytes[18:20])[0]  # 0x12 - 0x13
-    modification_time = struct.unpack('<H', entry_bytes[22:24])[0]  # 0x16 - 0x17
-    
-    # 5. Starting cluster - 2 bytes (high word) + 2 bytes (low word)
-    starting_cluster_high = struct.unpack('<H', entry_bytes[20:22])[0]  # 0x14 - 0x15
-    starting_cluster_low = struct.unpack('<H', entry_bytes[26:28])[0]  # 0x1A - 0x1B
+    # 2. Starting cluster - 2 bytes (high word) + 2 bytes (low word)
     starting_cluster = (starting_cluster_high << 16) | starting_cluster_low
     
-    # 6. File size - 4 bytes
-    file_size = struct.unpack('<I', entry_bytes[28:32])[0]
+    # 3. Status markers in the first byte: 0xE5 = deleted, 0x00 = end of directory (no further entries)
+    deleted = entry_bytes[0] == 0xE5
+    end_of_directory = entry_bytes[0] == 0x00
     
     return {
         "Short Filename": short_filename,
         "File Attributes": file_attributes,
         "Creation Time": creation_time,
+        "Creation Date": creation_date,
         "Access Date": access_date,
         "Modification Time": modification_time,
+        "Modification Date": modification_date,
         "Starting Cluster": starting_cluster,
-        "File Size": file_size
+        "File Size": file_size,
+        "Deleted": deleted,
+        "End Of Directory": end_of_directory
     }
 
 def parse_fat32_directory(hex_chunk):